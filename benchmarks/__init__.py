@@ -0,0 +1,10 @@
+"""
+Reproducible benchmarks for the public site.
+
+    python -m benchmarks.run --trabajos 500 --gunicorn --out bench.json
+
+Runs against a throw-away SQLite file (benchmarks.settings), or against a
+dedicated BENCH_DATABASE_URL (never the site's DATABASE_URL: the catalog is
+replaced). See benchmarks/run.py for all options;
+benchmarks/templates.py compares template loading/fragment caching variants.
+"""
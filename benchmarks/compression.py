@@ -0,0 +1,83 @@
+# benchmarks/compression.py
+"""
+Transferred bytes and compression time of the catalog pages per
+Content-Encoding (portal.middleware.CompressionMiddleware).
+
+    python -m benchmarks.compression [--documents 40] [--repeat 20]
+
+Seeds a catalog with document-heavy trabajos, then fetches the home, area and
+trabajo pages once per encoding offered by this install (identity, gzip, and
+br / zstd when their packages are importable). Per page and encoding: body
+bytes, ratio to identity and mean response time. Prints one JSON document.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+
+def measure(client, path: str, encoding: str, repeat: int) -> dict:
+    timings, size = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path, HTTP_ACCEPT_ENCODING=encoding)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path}: HTTP {response.status_code}")
+        if response.get("Content-Encoding", "identity") != encoding:
+            raise RuntimeError(f"{path}: expected {encoding}, got {response.get('Content-Encoding')}")
+        size = len(body)
+    return {"bytes": size, "mean_ms": round(statistics.mean(timings), 3)}
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=40, help="documents per trabajo")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    import django
+
+    django.setup()
+
+    from django.core.management import call_command
+    from django.test import Client
+    from django.urls import reverse
+
+    from benchmarks.seed import seed_catalog
+    from catalogo.models import Trabajo
+    from portal.compression import available_encodings
+
+    call_command("migrate", verbosity=0)
+    seed_catalog(areas=3, trabajos_per_area=20, highlights=3, documents=args.documents)
+    trabajo = Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED).select_related("area").first()
+    paths = {
+        "home": reverse("home"),
+        "area": trabajo.area.get_absolute_url(),
+        "trabajo": trabajo.get_absolute_url(),
+    }
+
+    client = Client()
+    results = {}
+    for page, path in paths.items():
+        client.get(path)  # warm the page cache
+        row = {encoding: measure(client, path, encoding, args.repeat)
+               for encoding in ("identity", *available_encodings())}
+        for encoding, stats in row.items():
+            stats["ratio"] = round(stats["bytes"] / row["identity"]["bytes"], 3)
+        results[page] = row
+
+    report = {"meta": {"paths": paths, "documents": args.documents, "repeat": args.repeat}, "pages": results}
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# benchmarks/connections.py
+"""
+Connection-setup overhead under concurrency: per-request connections vs
+persistent (CONN_MAX_AGE + health checks) vs a psycopg pool (Postgres only).
+
+    python -m benchmarks.connections [--threads 8] [--requests 400]
+    BENCH_DATABASE_URL=postgres://.../bench python -m benchmarks.connections
+
+Every thread plays the request cycle Django runs around a view:
+close_if_unusable_or_obsolete() (request_started), one catalog query,
+close_if_unusable_or_obsolete() (request_finished). Each variant gets its own
+ConnectionHandler built from settings.DATABASES["default"], so the settings
+under test are exactly the ones in portal/settings.py with one knob changed.
+Prints one JSON document (same shape as benchmarks.run summaries) with the
+number of physical connections opened per variant.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+QUERY = 'SELECT id, name, slug FROM catalogo_area ORDER BY "order", name'
+
+
+def variants(default: dict) -> dict[str, dict]:
+    base = {key: value for key, value in default.items() if key != "TEST"}
+    options = {key: value for key, value in base.get("OPTIONS", {}).items() if key != "pool"}
+    out = {
+        "per_request": {**base, "OPTIONS": options, "CONN_MAX_AGE": 0},
+        "persistent": {**base, "OPTIONS": options, "CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True},
+    }
+    if base["ENGINE"] == "django.db.backends.postgresql":
+        out["pool"] = {**base, "OPTIONS": {**options, "pool": {"min_size": 1, "max_size": 4}}, "CONN_MAX_AGE": 0}
+    return out
+
+
+def measure(settings_dict: dict, threads: int, requests: int) -> dict:
+    from django.db.backends.signals import connection_created
+    from django.db.utils import ConnectionHandler
+
+    from benchmarks.run import summarize
+
+    handler = ConnectionHandler({"default": settings_dict})
+    latencies: list[float] = []
+    connects = 0
+    lock = threading.Lock()
+
+    def count(sender, connection, **kwargs):
+        nonlocal connects
+        if connection.settings_dict is handler["default"].settings_dict:
+            with lock:
+                connects += 1
+
+    def worker():
+        conn = handler["default"]  # thread-local wrapper
+        mine = []
+        try:
+            for _ in range(requests):
+                t0 = time.perf_counter()
+                conn.close_if_unusable_or_obsolete()
+                with conn.cursor() as cursor:
+                    cursor.execute(QUERY)
+                    cursor.fetchall()
+                conn.close_if_unusable_or_obsolete()
+                mine.append(time.perf_counter() - t0)
+        finally:
+            conn.close()
+        with lock:
+            latencies.extend(mine)
+
+    connection_created.connect(count, weak=False)
+    try:
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        connection_created.disconnect(count)
+        if hasattr(handler["default"], "close_pool"):
+            handler["default"].close_pool()
+
+    summary = summarize(latencies, elapsed)
+    summary["connections_opened"] = connects
+    return summary
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400, help="Requests per thread.")
+    parser.add_argument("--areas", type=int, default=12)
+    args = parser.parse_args(argv)
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+
+    from benchmarks.seed import seed_catalog
+
+    call_command("migrate", verbosity=0)
+    catalog = seed_catalog(areas=args.areas, trabajos_per_area=1, highlights=0, documents=0)
+    connections.close_all()
+
+    default = settings.DATABASES["default"]
+    results = {name: measure(variant, args.threads, args.requests) for name, variant in variants(default).items()}
+
+    report = {
+        "meta": {"engine": default["ENGINE"], "catalog": catalog, "args": vars(args)},
+        "variants": results,
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
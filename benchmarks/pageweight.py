@@ -0,0 +1,129 @@
+# benchmarks/pageweight.py
+"""
+Page weight of the home and trabajo pages with the source stylesheets vs the
+collectstatic bundles + inlined critical CSS (core/staticbuild.py).
+
+    python -m benchmarks.pageweight
+
+Runs collectstatic into a temporary STATIC_ROOT with the production storage,
+then fetches each page and every local asset it references through WhiteNoise
+(Accept-Encoding: br, gzip). Per variant and page: render-blocking local
+stylesheet requests, local asset requests, HTML/inline-CSS/asset bytes as
+transferred, and the Cache-Control of the assets. Prints one JSON document.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+PRODUCTION_STATIC = {"BACKEND": "core.staticbuild.BundledStaticFilesStorage"}
+LINK_RE = re.compile(r"<link\b[^>]*>", re.I)
+SCRIPT_RE = re.compile(r"<script\b[^>]*\bsrc=\"([^\"]+)\"", re.I)
+STYLE_RE = re.compile(r"<style>(.*?)</style>", re.S)
+
+
+def _attr(tag: str, name: str) -> str:
+    match = re.search(rf'\b{name}="([^"]*)"', tag)
+    return match.group(1) if match else ""
+
+
+def page_assets(html: str) -> tuple[list[str], list[str]]:
+    """
+    (render-blocking local stylesheets, every local CSS/JS asset).
+    """
+    head = html.split("</head>", 1)[0]
+    head = re.sub(r"<noscript>.*?</noscript>", "", head, flags=re.S)
+    blocking, assets = [], []
+    for tag in LINK_RE.findall(html):
+        href = _attr(tag, "href")
+        rel = _attr(tag, "rel")
+        if not href.startswith("/static/") or rel not in ("stylesheet", "preload"):
+            continue
+        if href not in assets:
+            assets.append(href)
+        if rel == "stylesheet" and tag in head:
+            blocking.append(href)
+    assets += [src for src in SCRIPT_RE.findall(html) if src.startswith("/static/")]
+    return blocking, assets
+
+
+def measure(client, path: str) -> dict:
+    headers = {"HTTP_ACCEPT_ENCODING": "br, gzip"}
+    response = client.get(path)
+    if response.status_code != 200:
+        raise RuntimeError(f"{path}: HTTP {response.status_code}")
+    html = response.content.decode()
+    blocking, assets = page_assets(html)
+
+    asset_bytes, cache_control = 0, set()
+    for url in assets:
+        asset = client.get(url, **headers)
+        if asset.status_code != 200:
+            raise RuntimeError(f"{url}: HTTP {asset.status_code}")
+        asset_bytes += len(b"".join(asset.streaming_content)) if asset.streaming else len(asset.content)
+        cache_control.add(asset.get("Cache-Control", ""))
+
+    import brotli
+
+    return {
+        "blocking_stylesheets": len(blocking),
+        "asset_requests": len(assets),
+        "html_bytes": len(response.content),
+        "html_br_bytes": len(brotli.compress(response.content)),
+        "inline_css_bytes": sum(len(css.encode()) for css in STYLE_RE.findall(html)),
+        "asset_transfer_bytes": asset_bytes,
+        "asset_cache_control": sorted(cache_control),
+    }
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args(argv)
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test import Client
+    from django.test.utils import override_settings
+    from django.urls import reverse
+
+    from benchmarks.seed import seed_catalog
+    from catalogo.models import Trabajo
+    from core.templatetags import assets
+
+    call_command("migrate", verbosity=0)
+    seed_catalog(areas=3, trabajos_per_area=3, highlights=2, documents=2)
+    trabajo = Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED).select_related("area").first()
+    paths = {"home": reverse("home"), "trabajo": trabajo.get_absolute_url()}
+
+    static_root = tempfile.mkdtemp(prefix="pageweight-")
+    results = {}
+    try:
+        storages = {**settings.STORAGES, "staticfiles": PRODUCTION_STATIC}
+        with override_settings(STATIC_ROOT=static_root, STORAGES=storages):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            for variant, bundled in (("source_files", False), ("bundled+critical", True)):
+                with override_settings(STATIC_BUNDLES=bundled):
+                    assets._read_critical.cache_clear()
+                    client = Client()  # fresh handler: WhiteNoise indexes STATIC_ROOT at startup
+                    results[variant] = {page: measure(client, path) for page, path in paths.items()}
+    finally:
+        shutil.rmtree(static_root, ignore_errors=True)
+
+    report = {"meta": {"paths": paths}, "variants": results}
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+# benchmarks/run.py
+"""
+Latency / throughput / query-count benchmark for the public site.
+
+    python -m benchmarks.run [--areas 5] [--trabajos 100] [--requests 200]
+                             [--gunicorn] [--uvicorn] [--workers 2]
+                             [--concurrency 8] [--out bench.json]
+
+Seeds a synthetic catalog (benchmarks.seed), then drives home, area_detail,
+trabajo_detail and richtext_preview:
+- through the Django test client (latency percentiles + SQL queries/request)
+- optionally through a local gunicorn (WSGI, sync views) and/or uvicorn
+  (ASGI, async views): latency percentiles + throughput
+and prints/writes one JSON document, so runs can be diffed across commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+
+@dataclass
+class Scenario:
+    name: str
+    paths: list[str]
+    method: str = "GET"
+    body: Optional[dict] = None
+    staff: bool = False
+    _next: int = field(default=0, repr=False)
+
+    def next_path(self) -> str:
+        path = self.paths[self._next % len(self.paths)]
+        self._next += 1
+        return path
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+    }
+
+
+# ------------------------------------------------------------
+# Setup
+# ------------------------------------------------------------
+
+def prepare(args) -> dict:
+    import django
+
+    django.setup()
+
+    from django.core.management import call_command
+
+    from benchmarks.seed import seed_catalog
+
+    call_command("migrate", verbosity=0)
+    return seed_catalog(
+        areas=args.areas,
+        trabajos_per_area=args.trabajos,
+        highlights=args.highlights,
+        documents=args.documents,
+    )
+
+
+def build_scenarios(sample: int = 50) -> list[Scenario]:
+    from django.urls import reverse
+
+    from catalogo.models import Area, Trabajo
+
+    areas = [a.get_absolute_url() for a in Area.objects.order_by("order")]
+    trabajos = [
+        t.get_absolute_url()
+        for t in Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED).select_related("area")[:sample]
+    ]
+    summary = Trabajo.objects.values_list("summary", flat=True).first() or ""
+    return [
+        Scenario("home", [reverse("home")]),
+        Scenario("area_detail", areas),
+        Scenario("trabajo_detail", trabajos),
+        Scenario(
+            "richtext_preview",
+            ["/_richtext/preview/"],
+            method="POST",
+            body={"text": summary, "mode": "block"},
+            staff=True,
+        ),
+    ]
+
+
+def staff_user():
+    from django.contrib.auth import get_user_model
+
+    user, _ = get_user_model().objects.get_or_create(
+        username="bench-staff", defaults={"is_staff": True, "is_superuser": True}
+    )
+    return user
+
+
+# ------------------------------------------------------------
+# Django test client
+# ------------------------------------------------------------
+
+def run_client(scenarios: list[Scenario], requests: int, warmup: int) -> dict:
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    results = {}
+    for scenario in scenarios:
+        client = Client()
+        if scenario.staff:
+            client.force_login(staff_user())
+
+        def call():
+            path = scenario.next_path()
+            if scenario.method == "POST":
+                return client.post(path, json.dumps(scenario.body), content_type="application/json")
+            return client.get(path)
+
+        for _ in range(warmup):
+            call()
+
+        latencies, queries = [], []
+        started = time.perf_counter()
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as ctx:
+                t0 = time.perf_counter()
+                response = call()
+                latencies.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                raise RuntimeError(f"{scenario.name}: HTTP {response.status_code}")
+            queries.append(len(ctx.captured_queries))
+        summary = summarize(latencies, time.perf_counter() - started)
+        summary["queries_per_request"] = round(statistics.fmean(queries), 2)
+        results[scenario.name] = summary
+    return results
+
+
+# ------------------------------------------------------------
+# Local gunicorn
+# ------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def start_server(argv: list[str], port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(argv, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for_port(port)
+    except RuntimeError:
+        proc.kill()
+        raise
+    return proc
+
+
+def staff_headers() -> dict[str, str]:
+    """
+    Session + CSRF cookies for the staff-only preview endpoint.
+    """
+    from django.conf import settings
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.utils.crypto import get_random_string
+
+    user = staff_user()
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    csrf = get_random_string(32)
+    return {
+        "Cookie": f"{settings.SESSION_COOKIE_NAME}={session.session_key}; {settings.CSRF_COOKIE_NAME}={csrf}",
+        "X-CSRFToken": csrf,
+    }
+
+
+def drive_http(port: int, scenarios: list[Scenario], requests: int, concurrency: int, warmup: int) -> dict:
+    """
+    Keep-alive HTTP/1.1 clients, one connection per thread.
+    """
+    local = threading.local()
+    auth = staff_headers()
+
+    def call(scenario: Scenario, path: str) -> float:
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        headers = {"Host": "localhost"}
+        body = None
+        if scenario.staff:
+            headers.update(auth)
+        if scenario.method == "POST":
+            body = json.dumps(scenario.body)
+            headers["Content-Type"] = "application/json"
+        t0 = time.perf_counter()
+        try:
+            conn.request(scenario.method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            local.conn = None
+            raise
+        if response.status != 200:
+            raise RuntimeError(f"{scenario.name}: HTTP {response.status}")
+        if response.getheader("Connection", "").lower() == "close":
+            conn.close()
+            local.conn = None
+        return time.perf_counter() - t0
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for scenario in scenarios:
+            paths = [scenario.next_path() for _ in range(warmup + requests)]
+            list(pool.map(lambda p: call(scenario, p), paths[:warmup]))
+            started = time.perf_counter()
+            latencies = list(pool.map(lambda p: call(scenario, p), paths[warmup:]))
+            results[scenario.name] = summarize(latencies, time.perf_counter() - started)
+    return results
+
+
+def run_server(argv: list[str], port: int, scenarios: list[Scenario], args) -> dict:
+    proc = start_server(argv, port)
+    try:
+        return drive_http(port, scenarios, args.requests, args.concurrency, args.warmup)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def run_gunicorn(scenarios: list[Scenario], args) -> dict:
+    """
+    WSGI: gunicorn sync workers, sync views.
+    """
+    port = _free_port()
+    argv = [
+        sys.executable, "-m", "gunicorn", "portal.wsgi:application",
+        "--bind", f"127.0.0.1:{port}",
+        "--workers", str(args.workers),
+        "--worker-class", "sync",
+    ]
+    return run_server(argv, port, scenarios, args)
+
+
+def run_uvicorn(scenarios: list[Scenario], args) -> dict:
+    """
+    ASGI: uvicorn workers, async views (portal/asgi.py sets ASYNC_VIEWS).
+    """
+    port = _free_port()
+    argv = [
+        sys.executable, "-m", "uvicorn", "portal.asgi:application",
+        "--host", "127.0.0.1",
+        "--port", str(port),
+        "--workers", str(args.workers),
+        "--no-access-log",
+        "--log-level", "warning",
+    ]
+    return run_server(argv, port, scenarios, args)
+
+
+# ------------------------------------------------------------
+# Entry point
+# ------------------------------------------------------------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--areas", type=int, default=5)
+    parser.add_argument("--trabajos", type=int, default=100, help="Trabajos per area.")
+    parser.add_argument("--highlights", type=int, default=3, help="Highlights per trabajo.")
+    parser.add_argument("--documents", type=int, default=4, help="Documents per trabajo.")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario.")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--gunicorn", action="store_true", help="Also benchmark a local gunicorn (WSGI).")
+    parser.add_argument("--uvicorn", action="store_true", help="Also benchmark a local uvicorn (ASGI).")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--out", help="Write the JSON report here as well.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    catalog = prepare(args)
+    scenarios = build_scenarios()
+
+    import django
+    from django.db import connection, connections
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "catalog": catalog,
+            "args": vars(args),
+        },
+        "client": run_client(scenarios, args.requests, args.warmup),
+    }
+    # Server processes open the DB themselves; don't keep a write lock around.
+    if args.gunicorn:
+        connections.close_all()
+        report["gunicorn"] = run_gunicorn(build_scenarios(), args)
+    if args.uvicorn:
+        connections.close_all()
+        report["uvicorn"] = run_uvicorn(build_scenarios(), args)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/seed.py
+"""
+Synthetic catalog shaped like catalogo_fixture_ready.json: same fields, text
+lengths and document mix, scaled to any size.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+
+from catalogo.models import Area, Documento, Highlight, Trabajo
+
+FIXTURE = settings.BASE_DIR / "catalogo_fixture_ready.json"
+
+MARKDOWN_EXTRAS = [
+    "\n\n- **Fuente:** ENEMDU\n- *Periodo:* 2016–2021",
+    "\n\nVer [metodología](https://example.org/metodologia) para más detalle.",
+    "\n\n```\nmodelo <- lm(y ~ x)\n```",
+    "",
+]
+
+
+def _fixture_samples() -> dict[str, list]:
+    with open(FIXTURE, encoding="utf-8") as f:
+        rows = json.load(f)
+    samples: dict[str, list] = {"summary": [], "tagline": [], "doc": []}
+    for row in rows:
+        fields = row["fields"]
+        if row["model"] == "catalogo.trabajo":
+            samples["summary"].append(fields["summary"])
+            samples["tagline"].append(fields["tagline"])
+        elif row["model"] == "catalogo.documento":
+            samples["doc"].append((fields["title"], fields["doc_type"], fields["url"]))
+    return samples
+
+
+@transaction.atomic
+def seed_catalog(
+    areas: int = 5,
+    trabajos_per_area: int = 100,
+    highlights: int = 3,
+    documents: int = 4,
+    seed: int = 42,
+) -> dict[str, int]:
+    """
+    Replaces the catalog with a synthetic one; deterministic for a given seed.
+    Only under benchmarks.settings, and only over an empty or synthetic catalog.
+    """
+    if not getattr(settings, "BENCHMARK_DATABASE", False):
+        raise ImproperlyConfigured("seed_catalog replaces the catalog: run it under benchmarks.settings.")
+    if Area.objects.exclude(slug__regex=r"^area-\d+$").exists():
+        raise ImproperlyConfigured(
+            f"{settings.DATABASES['default']['NAME']} holds a real catalog; refusing to replace it."
+        )
+
+    rng = random.Random(seed)
+    samples = _fixture_samples()
+    now = timezone.now()
+
+    Area.objects.all().delete()  # a previous synthetic catalog
+    area_objs = Area.objects.bulk_create(
+        Area(name=f"Área {i}", slug=f"area-{i}", order=i, description="*Área* sintética.")
+        for i in range(areas)
+    )
+
+    trabajo_objs = Trabajo.objects.bulk_create(
+        Trabajo(
+            area=area,
+            title=f"Trabajo {area.order}-{i}",
+            slug=f"trabajo-{i}",
+            tagline=rng.choice(samples["tagline"]) if rng.random() < 0.8 else "",
+            summary=rng.choice(samples["summary"]) + rng.choice(MARKDOWN_EXTRAS),
+            description=rng.choice(samples["summary"]),
+            image_url="https://example.org/img/card.png",
+            status=Trabajo.Status.PUBLISHED if rng.random() < 0.9 else Trabajo.Status.DRAFT,
+            published_at=now - timedelta(days=rng.randint(0, 3650), seconds=rng.randint(0, 86400)),
+        )
+        for area in area_objs
+        for i in range(trabajos_per_area)
+    )
+
+    Highlight.objects.bulk_create(
+        Highlight(trabajo=t, label=f"Indicador {k}", value=f"{rng.uniform(0, 100):.1f}%", order=k)
+        for t in trabajo_objs
+        for k in range(highlights)
+    )
+    Documento.objects.bulk_create(
+        Documento(trabajo=t, title=title, doc_type=doc_type, url=url, order=k)
+        for t in trabajo_objs
+        for k, (title, doc_type, url) in enumerate(rng.choice(samples["doc"]) for _ in range(documents))
+    )
+
+    Area.objects.all().refresh_counters()
+    return {
+        "areas": len(area_objs),
+        "trabajos": len(trabajo_objs),
+        "highlights": len(trabajo_objs) * highlights,
+        "documents": len(trabajo_objs) * documents,
+    }
@@ -0,0 +1,46 @@
+# benchmarks/settings.py
+"""
+portal.settings for benchmark runs: synthetic catalog DB, rich text on,
+no collectstatic needed, instrumentation sampling off.
+
+benchmarks.seed replaces the whole catalog, so the site's databases
+(DATABASE_URL, REPLICA_DATABASE_URL) are never used: runs go to a throw-away
+SQLite file (BENCH_DB) or to a dedicated BENCH_DATABASE_URL.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from portal.settings import *  # noqa: F401,F403
+from portal.settings import DATABASE_URL, DB_CONN_MAX_AGE, MIDDLEWARE, SQLITE_OPTIONS, STORAGES, _database_from_url
+
+BENCH_DATABASE_URL = os.environ.get("BENCH_DATABASE_URL", "").strip()
+if BENCH_DATABASE_URL and BENCH_DATABASE_URL == DATABASE_URL:
+    raise ImproperlyConfigured("BENCH_DATABASE_URL must not be the site's DATABASE_URL.")
+
+if BENCH_DATABASE_URL:
+    DATABASES = {"default": _database_from_url(BENCH_DATABASE_URL)}
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("BENCH_DB", "/tmp/portal-bench.sqlite3"),
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": dict(SQLITE_OPTIONS),
+        }
+    }
+DATABASE_ROUTERS = []
+MIDDLEWARE = [m for m in MIDDLEWARE if m != "portal.middleware.ReplicaRoutingMiddleware"]
+
+# benchmarks.seed.seed_catalog refuses to run without it
+BENCHMARK_DATABASE = True
+
+ALLOWED_HOSTS = ["*"]
+STORAGES = {
+    **STORAGES,
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+ENABLE_RICHTEXT = True
+INSTRUMENTATION_SAMPLE_RATE = 0.0
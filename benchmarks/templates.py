@@ -0,0 +1,120 @@
+# benchmarks/templates.py
+"""
+Template time per request, with and without the cached loader and the
+base.html fragment caches (navbar, footer).
+
+    python -m benchmarks.templates [--areas 12] [--trabajos 20] [--requests 300]
+
+Each variant renders the same pages through the Django test client; the
+"template" bucket of portal.instrumentation gives the time spent rendering.
+Prints one JSON document (same shape as benchmarks.run summaries).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+VARIANTS = {
+    # name: (cached loader, fragment cache)
+    "baseline": (False, False),
+    "cached_loader": (True, False),
+    "cached_loader+fragments": (True, True),
+}
+
+
+def _templates_setting(cached_loader: bool) -> list[dict]:
+    from django.conf import settings
+
+    loaders = [
+        "django.template.loaders.filesystem.Loader",
+        "django.template.loaders.app_directories.Loader",
+    ]
+    if cached_loader:
+        loaders = [("django.template.loaders.cached.Loader", loaders)]
+    engine = {**settings.TEMPLATES[0], "OPTIONS": {**settings.TEMPLATES[0]["OPTIONS"], "loaders": loaders}}
+    return [engine]
+
+
+def _caches_setting(fragments: bool) -> dict:
+    from django.conf import settings
+
+    backend = (
+        {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "bench-fragments"}
+        if fragments
+        else {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    )
+    return {**settings.CACHES, "template_fragments": backend}
+
+
+def measure(paths: list[str], requests: int, warmup: int) -> dict:
+    from django.test import Client
+
+    from benchmarks.run import summarize
+    from portal.instrumentation import collecting
+
+    client = Client()
+    for i in range(warmup):
+        client.get(paths[i % len(paths)])
+
+    template_seconds, latencies = [], []
+    started = time.perf_counter()
+    for i in range(requests):
+        with collecting() as stats:
+            t0 = time.perf_counter()
+            response = client.get(paths[i % len(paths)])
+            latencies.append(time.perf_counter() - t0)
+        if response.status_code != 200:
+            raise RuntimeError(f"{paths[i % len(paths)]}: HTTP {response.status_code}")
+        timing = stats.timings.get("template")
+        template_seconds.append(timing.seconds if timing else 0.0)
+
+    summary = summarize(latencies, time.perf_counter() - started)
+    summary["template_mean_ms"] = round(statistics.fmean(template_seconds) * 1000, 3)
+    return summary
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--areas", type=int, default=12)
+    parser.add_argument("--trabajos", type=int, default=20, help="Trabajos per area.")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    import django
+
+    django.setup()
+
+    from django.core.management import call_command
+    from django.test.utils import override_settings
+    from django.urls import reverse
+
+    from benchmarks.seed import seed_catalog
+    from catalogo.models import Area
+
+    call_command("migrate", verbosity=0)
+    catalog = seed_catalog(areas=args.areas, trabajos_per_area=args.trabajos, highlights=2, documents=2)
+    paths = [
+        reverse("home"),
+        reverse("laboratorio"),
+        *[a.get_absolute_url() for a in Area.objects.order_by("order")[:5]],
+    ]
+
+    results = {}
+    for name, (cached_loader, fragments) in VARIANTS.items():
+        with override_settings(TEMPLATES=_templates_setting(cached_loader), CACHES=_caches_setting(fragments)):
+            results[name] = measure(paths, args.requests, args.warmup)
+
+    report = {"meta": {"catalog": catalog, "paths": paths, "args": vars(args)}, "variants": results}
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
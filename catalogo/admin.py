@@ -4,7 +4,8 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.urls import reverse
 
-from .models import Area, Trabajo, Documento, Highlight
+from .models import Area, Trabajo, Documento, Highlight, LinkCheck
+from .textindex import search_filter
 
 
 class HighlightInline(admin.TabularInline):
@@ -17,7 +18,8 @@ class HighlightInline(admin.TabularInline):
 class DocumentoInline(admin.TabularInline):
     model = Documento
     extra = 0
-    fields = ("order", "title", "doc_type", "file", "url")
+    fields = ("order", "title", "doc_type", "file", "url", "size", "page_count")
+    readonly_fields = ("size", "page_count")
     ordering = ("order", "id")
 
 
@@ -90,7 +92,7 @@ class TrabajoAdminForm(forms.ModelForm):
 
 @admin.register(Area)
 class AreaAdmin(admin.ModelAdmin):
-    list_display = ("name", "slug", "order", "created_at", "updated_at")
+    list_display = ("name", "slug", "order", "published_count", "last_published_at", "created_at", "updated_at")
     list_editable = ("order",)
     search_fields = ("name", "slug")
     prepopulated_fields = {"slug": ("name",)}
@@ -121,6 +123,13 @@ class TrabajoAdmin(admin.ModelAdmin):
 
     readonly_fields = ("created_at", "updated_at")
 
+    def get_search_results(self, request, queryset, search_term):
+        # Also search document titles and extracted document text
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term.strip():
+            results |= queryset.filter(search_filter(search_term.strip()))
+        return results, may_have_duplicates
+
     class Media:
         css = {
             "all": (
@@ -132,3 +141,18 @@ class TrabajoAdmin(admin.ModelAdmin):
             "catalogo/admin/admin_tooltips.js",
             "catalogo/admin/richtext_admin.js",
         )
+
+
+@admin.register(LinkCheck)
+class LinkCheckAdmin(admin.ModelAdmin):
+    # Written by `manage.py check_links`; read-only here
+    list_display = ("url", "ok", "status", "latency_ms", "failures", "error", "checked_at")
+    list_filter = ("ok",)
+    search_fields = ("url", "final_url")
+    ordering = ("ok", "-failures", "url")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
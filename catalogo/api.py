@@ -0,0 +1,279 @@
+# catalogo/api.py
+from __future__ import annotations
+
+import functools
+import hashlib
+from typing import Any, Iterable, Optional
+
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
+
+from .models import Area, Documento, Highlight, Trabajo
+from .pagination import Cursor, InvalidCursor, paginate_keyset
+from .textindex import search_filter
+
+
+# ------------------------------------------------------------
+# Read-only JSON API
+# ------------------------------------------------------------
+# Rows are serialized straight from `.values()`: no model instances are built.
+# Public field name -> ORM lookup. Fields without a lookup are computed below.
+
+AREA_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "slug": "slug",
+    "description": "description",
+    "order": "order",
+    "published_count": "published_count",
+    "last_published_at": "last_published_at",
+    "updated_at": "updated_at",
+}
+
+TRABAJO_FIELDS = {
+    "id": "id",
+    "area": "area__slug",
+    "title": "title",
+    "slug": "slug",
+    "tagline": "tagline",
+    "summary": "summary",
+    "description": "description",
+    "highlights_text": "highlights",
+    "app_url": "app_url",
+    "image": None,
+    "published_at": "published_at",
+    "is_featured": "is_featured",
+    "order": "order",
+    "updated_at": "updated_at",
+    "url": None,
+}
+
+DOCUMENTO_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "doc_type": "doc_type",
+    "file": "file",
+    "url": "url",
+    "order": "order",
+    # Stored at upload time (catalogo.filemeta): no storage calls
+    "mime_type": "mime_type",
+    "extension": "extension",
+    "size": "size",
+    "sha256": "sha256",
+    "pages": "page_count",
+}
+
+HIGHLIGHT_FIELDS = ("label", "value", "order")
+
+TRABAJO_INCLUDES = {"highlights", "documents"}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def _csv_param(request: HttpRequest, name: str) -> list[str]:
+    raw = request.GET.get(name) or ""
+    return [x.strip() for x in raw.split(",") if x.strip()]
+
+
+def _sparse_fields(request: HttpRequest, allowed: Iterable[str]) -> list[str]:
+    """
+    `?fields=a,b` -> requested public fields (all fields when omitted).
+    """
+    allowed = list(allowed)
+    requested = _csv_param(request, "fields")
+    if not requested:
+        return allowed
+    unknown = sorted(set(requested) - set(allowed))
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+    return [f for f in allowed if f in requested]
+
+
+def _limit(request: HttpRequest) -> int:
+    raw = request.GET.get("limit")
+    if not raw:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ApiError("limit must be an integer.")
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _file_url(field_name: str, model, name: Optional[str]) -> str:
+    if not name:
+        return ""
+    return model._meta.get_field(field_name).storage.url(name)
+
+
+def _json(request: HttpRequest, payload: dict[str, Any]) -> HttpResponse:
+    """
+    JSON response with a content ETag; answers 304 on a matching If-None-Match.
+    """
+    response = JsonResponse(payload, json_dumps_params={"ensure_ascii": False, "separators": (",", ":")})
+    etag = quote_etag(hashlib.md5(response.content, usedforsecurity=False).hexdigest())
+    response["ETag"] = etag
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+def _api_view(func):
+    @functools.wraps(func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return func(request, *args, **kwargs)
+        except ApiError as exc:
+            return JsonResponse({"error": str(exc)}, status=exc.status)
+        except Http404:
+            return JsonResponse({"error": "Not found."}, status=404)
+
+    return require_GET(wrapper)
+
+
+# ------------------------------------------------------------
+# Serializers (values rows -> dicts)
+# ------------------------------------------------------------
+
+def _serialize_documents(rows: Iterable[dict[str, Any]], fields: list[str]) -> list[dict[str, Any]]:
+    out = []
+    for row in rows:
+        item = {f: row[DOCUMENTO_FIELDS[f]] for f in fields}
+        if "file" in item:
+            item["file"] = _file_url("file", Documento, item["file"])
+        out.append(item)
+    return out
+
+
+def _serialize_trabajo(row: dict[str, Any], fields: list[str]) -> dict[str, Any]:
+    item: dict[str, Any] = {}
+    for f in fields:
+        if f == "image":
+            # Same precedence as Trabajo.hero_image
+            item[f] = _file_url("image", Trabajo, row["image"]) or row["image_url"] or row["thumbnail_url"]
+        elif f == "url":
+            item[f] = reverse("catalogo:trabajo_detail", args=[row["area__slug"], row["slug"]])
+        else:
+            item[f] = row[TRABAJO_FIELDS[f]]
+    return item
+
+
+def _trabajo_lookups(fields: list[str]) -> set[str]:
+    lookups = {"id", "published_at", "created_at"}  # keyset columns
+    for f in fields:
+        if f == "image":
+            lookups |= {"image", "image_url", "thumbnail_url"}
+        elif f == "url":
+            lookups |= {"area__slug", "slug"}
+        else:
+            lookups.add(TRABAJO_FIELDS[f])
+    return lookups
+
+
+# ------------------------------------------------------------
+# Views
+# ------------------------------------------------------------
+
+@_api_view
+def areas(request):
+    """
+    GET /api/catalogo/areas/?fields=...
+    """
+    fields = _sparse_fields(request, AREA_FIELDS)
+    rows = Area.objects.order_by("order", "name").values(*(AREA_FIELDS[f] for f in fields))
+    return _json(request, {"results": [{f: row[AREA_FIELDS[f]] for f in fields} for row in rows]})
+
+
+@_api_view
+def trabajos(request):
+    """
+    GET /api/catalogo/trabajos/?area=<slug>&q=<text>&fields=...&include=highlights,documents&limit=&cursor=
+
+    Published trabajos in publication order, keyset-paginated. `q` also
+    matches document titles and extracted document text (catalogo.textindex).
+    """
+    fields = _sparse_fields(request, TRABAJO_FIELDS)
+    includes = set(_csv_param(request, "include"))
+    if includes - TRABAJO_INCLUDES:
+        raise ApiError(f"Unknown include: {', '.join(sorted(includes - TRABAJO_INCLUDES))}")
+
+    limit = _limit(request)
+    cursor = None
+    if request.GET.get("cursor"):
+        try:
+            cursor = Cursor.decode(request.GET["cursor"])
+        except InvalidCursor as exc:
+            raise ApiError(str(exc))
+
+    qs = Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED)
+    area_slug = (request.GET.get("area") or "").strip()
+    if area_slug:
+        qs = qs.filter(area__slug=area_slug)
+    q = (request.GET.get("q") or "").strip()
+    if len(q) > 100:
+        raise ApiError("q must be at most 100 characters.")
+    if q:
+        qs = qs.filter(search_filter(q))
+
+    rows, next_cursor = paginate_keyset(qs.values(*_trabajo_lookups(fields)), cursor, limit)
+    results = [_serialize_trabajo(row, fields) for row in rows]
+
+    if includes and rows:
+        by_id = {row["id"]: item for row, item in zip(rows, results)}
+        if "highlights" in includes:
+            for item in results:
+                item["highlights"] = []
+            hl_rows = (
+                Highlight.objects.filter(trabajo_id__in=by_id)
+                .order_by("trabajo_id", "order", "id")
+                .values("trabajo_id", *HIGHLIGHT_FIELDS)
+            )
+            for hl in hl_rows:
+                by_id[hl["trabajo_id"]]["highlights"].append({f: hl[f] for f in HIGHLIGHT_FIELDS})
+        if "documents" in includes:
+            for item in results:
+                item["documents"] = []
+            doc_fields = list(DOCUMENTO_FIELDS)
+            doc_rows = (
+                Documento.objects.filter(trabajo_id__in=by_id)
+                .order_by("trabajo_id", "order", "id")
+                .values("trabajo_id", *DOCUMENTO_FIELDS.values())
+            )
+            for doc in doc_rows:
+                by_id[doc["trabajo_id"]]["documents"].extend(_serialize_documents([doc], doc_fields))
+
+    next_url = None
+    if next_cursor is not None:
+        params = request.GET.copy()
+        params["cursor"] = next_cursor.encode()
+        next_url = f"{request.path}?{params.urlencode()}"
+
+    return _json(request, {"results": results, "next": next_url})
+
+
+@_api_view
+def trabajo_documentos(request, area_slug, trabajo_slug):
+    """
+    GET /api/catalogo/trabajos/<area_slug>/<trabajo_slug>/documentos/?fields=...
+    """
+    fields = _sparse_fields(request, DOCUMENTO_FIELDS)
+    trabajo_id = get_object_or_404(
+        Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED).values_list("id", flat=True),
+        area__slug=area_slug,
+        slug=trabajo_slug,
+    )
+    rows = (
+        Documento.objects.filter(trabajo_id=trabajo_id)
+        .order_by("order", "id")
+        .values(*(DOCUMENTO_FIELDS[f] for f in fields))
+    )
+    return _json(request, {"results": _serialize_documents(rows, fields)})
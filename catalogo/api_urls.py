@@ -0,0 +1,11 @@
+# catalogo/api_urls.py
+from django.urls import path
+from . import api
+
+app_name = "catalogo_api"
+
+urlpatterns = [
+    path("areas/", api.areas, name="areas"),
+    path("trabajos/", api.trabajos, name="trabajos"),
+    path("trabajos/<slug:area_slug>/<slug:trabajo_slug>/documentos/", api.trabajo_documentos, name="trabajo_documentos"),
+]
@@ -7,3 +7,6 @@ class CatalogoConfig(AppConfig):
     name = "catalogo"
     verbose_name = "Catalog"
 
+    def ready(self):
+        from . import signals  # noqa: F401
+
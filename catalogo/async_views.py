@@ -0,0 +1,78 @@
+# catalogo/async_views.py
+"""
+Async twins of catalogo.views for ASGI (selected by settings.ASYNC_VIEWS).
+
+Same templates, and the same queries and context builders (shared from
+catalogo.views, so the twins can't drift apart), but:
+- rows come from the async ORM (aget / async for), fully materialized, so the
+  template never queries lazily
+- storage URLs (hero images, document files) are resolved concurrently in
+  worker threads and cached on the instances (cached_property)
+- only the final render (context processors + template) hops to a thread
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Iterable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import aget_object_or_404, render
+
+from . import previews
+from .models import Area
+from .pagination import apaginate_keyset
+from .purge import area_key, tag_response, trabajo_key
+from .views import area_cards, detail_context, documents_of, highlights_of, request_cursor, trabajo_queryset
+
+arender = sync_to_async(render)
+
+
+async def resolve_attrs(objects: Iterable, attr: str) -> None:
+    """
+    Evaluates `attr` (a cached_property) on every object concurrently,
+    off the event loop (storage backends are blocking).
+    """
+    getter = sync_to_async(getattr, thread_sensitive=False)
+    await asyncio.gather(*(getter(obj, attr) for obj in objects))
+
+
+async def _area_page(request, area_slug, template: str, eager: int):
+    area = await aget_object_or_404(Area, slug=area_slug)
+    cursor = request_cursor(request)
+    trabajos, next_cursor = await apaginate_keyset(area_cards(area), cursor, settings.CATALOG_PAGE_SIZE)
+    await resolve_attrs(trabajos, "card_image")
+    response = await arender(
+        request, template, {"area": area, "trabajos": trabajos, "next_cursor": next_cursor, "eager": eager}
+    )
+    return tag_response(response, area_key(area.pk))
+
+
+async def area_detail(request, area_slug):
+    return await _area_page(request, area_slug, "catalogo/area_detail.html", eager=3)
+
+
+async def area_trabajos(request, area_slug):
+    return await _area_page(request, area_slug, "catalogo/trabajo_cards.html", eager=0)
+
+
+async def trabajo_detail(request, area_slug, trabajo_slug):
+    trabajo = await aget_object_or_404(trabajo_queryset(), area__slug=area_slug, slug=trabajo_slug)
+    highlights = [h async for h in highlights_of(trabajo)]
+    documentos = [d async for d in documents_of(trabajo)]
+    await asyncio.gather(resolve_attrs([trabajo], "hero_image"), resolve_attrs(documentos, "file_url"))
+    context = detail_context(trabajo, highlights, documentos)
+    await previews.aattach(context["docs_stats"])
+    response = await arender(request, "catalogo/trabajo_detail.html", context)
+    return tag_response(response, area_key(trabajo.area_id), trabajo_key(trabajo.pk))
+
+
+async def trabajo_documentos(request, area_slug, trabajo_slug):
+    trabajo = await aget_object_or_404(trabajo_queryset(), area__slug=area_slug, slug=trabajo_slug)
+    documentos = [d async for d in documents_of(trabajo)]
+    await resolve_attrs(documentos, "file_url")
+    response = await arender(
+        request, "catalogo/trabajo_documentos.html", {"trabajo": trabajo, "documentos": documentos}
+    )
+    return tag_response(response, area_key(trabajo.area_id), trabajo_key(trabajo.pk))
@@ -0,0 +1,72 @@
+# catalogo/caching.py
+from __future__ import annotations
+
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.utils.translation import get_language
+
+from core.utils import observability
+
+from .models import Area, Trabajo
+
+
+# ------------------------------------------------------------
+# Catalog-versioned response cache
+# ------------------------------------------------------------
+# The version is derived from the database (row counts + latest updated_at),
+# so every worker process agrees on it and a cached document is regenerated
+# only after an admin edit, never on a timer.
+
+def catalog_version() -> str:
+    trabajos = Trabajo.objects.aggregate(n=Count("id"), m=Max("updated_at"))
+    areas = Area.objects.aggregate(n=Count("id"), m=Max("updated_at"))
+    raw = f"{trabajos['n']}:{trabajos['m']}:{areas['n']}:{areas['m']}"
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def area_version() -> str:
+    """
+    Version of the Area table alone: the navbar fragment in base.html only
+    lists areas, so trabajo edits must not invalidate it.
+    """
+    areas = Area.objects.aggregate(n=Count("id"), m=Max("updated_at"))
+    return hashlib.md5(f"{areas['n']}:{areas['m']}".encode(), usedforsecurity=False).hexdigest()
+
+
+def cache_by_catalog_version(prefix: str):
+    """
+    Caches a GET view's rendered response until the catalog changes.
+    Responses carry an ETag derived from the cache key (304 on match).
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            key_source = f"{catalog_version()}:{get_language()}:{request.get_full_path()}"
+            key = f"{prefix}:{hashlib.md5(key_source.encode(), usedforsecurity=False).hexdigest()}"
+            etag = quote_etag(key.rsplit(":", 1)[-1])
+
+            response = cache.get(key)
+            observability.inc("portal_page_cache_requests_total", cache=prefix, result="miss" if response is None else "hit")
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if hasattr(response, "render"):
+                    response.render()
+                if response.status_code == 200:
+                    response["ETag"] = etag
+                    cache.set(key, response, getattr(settings, "CATALOG_CACHE_TIMEOUT", 60 * 60 * 24))
+
+            return get_conditional_response(request, etag=response.get("ETag"), response=response)
+
+        return wrapper
+
+    return decorator
@@ -1,9 +1,17 @@
 # catalogo/context_processors.py
 from __future__ import annotations
 
+from django.utils.functional import SimpleLazyObject
+
+from .caching import area_version
 from .models import Area
 
 
 def nav_areas(request):
-    # Used by templates/base.html for the "Estadísticas" dropdown
-    return {"nav_areas": Area.objects.all().order_by("order", "name")}
+    # Used by templates/base.html for the "Estadísticas" dropdown.
+    # The navbar is fragment-cached per language + nav_version, so on a cache
+    # hit only the (lazy) version aggregate runs and nav_areas is never queried.
+    return {
+        "nav_areas": Area.objects.all().order_by("order", "name"),
+        "nav_version": SimpleLazyObject(area_version),
+    }
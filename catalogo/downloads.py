@@ -0,0 +1,196 @@
+# catalogo/downloads.py
+"""
+Downloads of locally stored Documento files (no CLOUDINARY_URL; Cloudinary
+files are redirected to their CDN URL).
+
+- validators: ETag (mtime + size) and Last-Modified, 304 on a match
+- single `Range: bytes=...` requests answer 206 (416 when unsatisfiable);
+  If-Range is honoured, multi-range requests get the whole file
+- DOCUMENT_SENDFILE hands the transfer to the front proxy with an empty body:
+  "x-accel-redirect" (nginx, internal location DOCUMENT_ACCEL_PREFIX aliased to
+  MEDIA_ROOT) or "x-sendfile" (Apache mod_xsendfile / lighttpd); the proxy
+  then handles ranges itself
+- otherwise the response is a FileResponse over the open file (positioned at
+  the range start, bounded by Content-Length), which gunicorn sends with
+  os.sendfile() through wsgi.file_wrapper: no bytes are copied through Python
+- files of draft trabajos are served to staff only, with Cache-Control: private
+"""
+
+from __future__ import annotations
+
+import io
+import mimetypes
+import os
+import re
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.utils.http import content_disposition_header, parse_etags, parse_http_date_safe, quote_etag
+from django.views.decorators.http import condition, require_safe
+
+from .models import Documento, Trabajo
+
+BLOCK_SIZE = 64 * 1024  # non-sendfile fallback (runserver, ASGI)
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileRange:
+    """
+    Read-only view of bytes [start, end] of an open file. Offsets are relative
+    to `start`; `fileno()` exposes the real file, already positioned at the
+    range start, for wsgi.file_wrapper / os.sendfile.
+    """
+
+    def __init__(self, file, start: int, end: int):
+        self.file = file
+        self.start, self.end = start, end
+        file.seek(start)
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self.end + 1 - self.file.tell()
+        if remaining <= 0:
+            return b""
+        return self.file.read(remaining if size < 0 else min(size, remaining))
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: self.start, io.SEEK_CUR: self.file.tell(), io.SEEK_END: self.end + 1}[whence]
+        return self.file.seek(base + offset) - self.start
+
+    def tell(self) -> int:
+        return self.file.tell() - self.start
+
+    def seekable(self) -> bool:
+        return True
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    (start, end) of a single satisfiable byte range; None when the header
+    should be ignored (malformed, multiple ranges). Raises ValueError when
+    the range is unsatisfiable.
+    """
+    match = _RANGE.match(header.replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:  # suffix: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("unsatisfiable range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("unsatisfiable range")
+    return start, end
+
+
+def _stat(documento: Documento) -> Optional[os.stat_result]:
+    if not hasattr(documento, "_stat"):
+        try:
+            path = documento.file.path
+        except NotImplementedError:  # remote storage (Cloudinary)
+            documento._stat = None
+        else:
+            try:
+                documento._stat = os.stat(path)
+            except FileNotFoundError:
+                raise Http404("Document file is missing.")
+    return documento._stat
+
+
+def _etag(stat: os.stat_result) -> str:
+    return quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+
+
+def _documento(request, pk: int) -> Documento:
+    # Memoized on the request: condition() calls both validator functions
+    if getattr(request, "_documento", None) is None:
+        qs = Documento.objects.exclude(file="").exclude(file=None).select_related("trabajo")
+        if not request.user.is_staff:  # drafts stay hidden, as in the API
+            qs = qs.filter(trabajo__status=Trabajo.Status.PUBLISHED)
+        request._documento = get_object_or_404(qs, pk=pk)
+    return request._documento
+
+
+def _cache(response: HttpResponse, documento: Documento) -> HttpResponse:
+    if documento.trabajo.status == Trabajo.Status.PUBLISHED:
+        patch_cache_control(response, public=True, max_age=getattr(settings, "DOCUMENT_CACHE_MAX_AGE", 3600))
+    else:  # staff preview of a draft: never in shared caches
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _validator_etag(request, pk: int) -> Optional[str]:
+    stat = _stat(_documento(request, pk))
+    return _etag(stat) if stat else None
+
+
+def _validator_last_modified(request, pk: int) -> Optional[datetime]:
+    stat = _stat(_documento(request, pk))
+    return datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc) if stat else None
+
+
+def _if_range_matches(request, stat: os.stat_result) -> bool:
+    if_range = request.META.get("HTTP_IF_RANGE", "").strip()
+    if not if_range:
+        return True
+    if if_range.startswith('"'):  # strong comparison only
+        return if_range in parse_etags(_etag(stat))
+    return parse_http_date_safe(if_range) == int(stat.st_mtime)
+
+
+@require_safe
+@condition(etag_func=_validator_etag, last_modified_func=_validator_last_modified)
+def document_download(request, pk: int) -> HttpResponse:
+    documento = _documento(request, pk)
+    stat = _stat(documento)
+    if stat is None:
+        return _cache(HttpResponseRedirect(documento.file_url), documento)
+
+    filename = os.path.basename(documento.file.name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    size = stat.st_size
+
+    byte_range = None
+    range_header = request.META.get("HTTP_RANGE", "")
+    if range_header and _if_range_matches(request, stat):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    sendfile = getattr(settings, "DOCUMENT_SENDFILE", "")
+    if sendfile:
+        response = HttpResponse(content_type=content_type)
+        if sendfile == "x-accel-redirect":
+            prefix = getattr(settings, "DOCUMENT_ACCEL_PREFIX", "/_protected/")
+            response["X-Accel-Redirect"] = quote(prefix.rstrip("/") + "/" + documento.file.name)
+        else:
+            response["X-Sendfile"] = documento.file.path
+    else:
+        start, end = byte_range or (0, size - 1)
+        response = FileResponse(FileRange(open(documento.file.path, "rb"), start, end), content_type=content_type)
+        response.block_size = BLOCK_SIZE
+        if byte_range:
+            response.status_code = 206
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["Content-Disposition"] = content_disposition_header(False, filename)
+    response["Accept-Ranges"] = "bytes"
+    return _cache(response, documento)
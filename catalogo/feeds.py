@@ -0,0 +1,48 @@
+# catalogo/feeds.py
+from __future__ import annotations
+
+from django.contrib.syndication.views import Feed
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.translation import gettext_lazy as _
+
+from .models import Trabajo
+
+
+class LatestTrabajosFeed(Feed):
+    """
+    Atom feed of the latest published trabajos.
+    """
+
+    feed_type = Atom1Feed
+    title = _("Laboratorio de Estadística")
+    subtitle = _("Publicaciones recientes")
+    limit = 50
+
+    def link(self):
+        return reverse("home")
+
+    def items(self):
+        return (
+            Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED, published_at__isnull=False)
+            .select_related("area")
+            .only("title", "slug", "tagline", "summary", "published_at", "updated_at", "area__slug", "area__name")
+            .order_by("-published_at", "-created_at")[: self.limit]
+        )
+
+    def item_title(self, item: Trabajo) -> str:
+        return item.title
+
+    def item_description(self, item: Trabajo) -> str:
+        from core.utils.richtext import render_md_text  # lazy import (markdown, nh3)
+
+        return render_md_text(item.summary or item.tagline)
+
+    def item_pubdate(self, item: Trabajo):
+        return item.published_at
+
+    def item_updateddate(self, item: Trabajo):
+        return item.updated_at
+
+    def item_categories(self, item: Trabajo):
+        return [item.area.name]
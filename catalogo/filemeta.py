@@ -0,0 +1,67 @@
+# catalogo/filemeta.py
+"""
+Document file metadata, read in one pass over the file stream:
+MIME type, extension, size and SHA-256; PDF page counts come from pypdf.
+
+Stored on Documento when a file is uploaded (Documento.save) or by
+`manage.py backfill_document_metadata`, so pages and the API never touch
+the storage backend to describe a file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+from typing import IO, Any, Optional
+
+CHUNK_SIZE = 1 << 20
+FIELDS = ("mime_type", "extension", "size", "sha256", "page_count")
+
+
+def empty() -> dict[str, Any]:
+    return {"mime_type": "", "extension": "", "size": None, "sha256": "", "page_count": None}
+
+
+def _pdf_pages(f: IO[bytes]) -> Optional[int]:
+    """
+    Page count with pypdf (requirements.txt). Unknown (None) without it or for
+    damaged files: a guess from the raw bytes misses pages stored in
+    compressed object streams, as in most modern PDFs.
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    try:
+        f.seek(0)
+        return len(PdfReader(f).pages)
+    except Exception:  # damaged or encrypted: leave it unknown
+        return None
+
+
+def extract(name: str, f: IO[bytes]) -> dict[str, Any]:
+    """
+    Metadata of the file `name` read from `f` (left at its start when seekable).
+    """
+    extension = os.path.splitext(name)[1].lower().lstrip(".")
+    mime_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    is_pdf = extension == "pdf"
+
+    digest, size = hashlib.sha256(), 0
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+        size += len(chunk)
+
+    page_count = None
+    if getattr(f, "seekable", lambda: False)():
+        if is_pdf:
+            page_count = _pdf_pages(f)
+        f.seek(0)
+    return {
+        "mime_type": mime_type[:100],
+        "extension": extension[:16],
+        "size": size,
+        "sha256": digest.hexdigest(),
+        "page_count": page_count,
+    }
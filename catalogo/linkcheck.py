@@ -0,0 +1,198 @@
+# catalogo/linkcheck.py
+"""
+Health checks of external links (Documento.url, Trabajo.app_url), run by
+`manage.py check_links`.
+
+- asyncio, one task per URL, at most `concurrency` in flight and at most
+  `per_host` connections per host (external servers aren't hammered)
+- keep-alive connections are pooled per host and reused between checks
+- HEAD first; GET when HEAD fails (many servers answer 403/405 to HEAD);
+  redirects are followed, the whole check has one time budget; it is spent
+  only while holding a host slot, so links queued behind others on the same
+  host neither time out early nor report the wait as latency
+- a minimal HTTP/1.1 client on asyncio streams: no response bodies are
+  read beyond a small limit, and no extra dependency
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ssl
+from collections import defaultdict
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Iterable, Optional
+from urllib.parse import urljoin, urlsplit
+
+USER_AGENT = "portal-linkcheck/1.0"
+REDIRECTS = {301, 302, 303, 307, 308}
+MAX_DRAIN = 64 * 1024  # GET bodies up to this size are read so the connection can be reused
+
+
+@dataclass
+class Result:
+    url: str
+    status: Optional[int] = None
+    ok: bool = False
+    latency_ms: Optional[int] = None
+    final_url: str = ""
+    error: str = ""
+
+
+@dataclass
+class Budget:
+    """
+    Time one check may spend in requests (waits for a host slot excluded).
+    """
+
+    limit: float
+    spent: float = 0.0
+
+    @property
+    def remaining(self) -> float:
+        return self.limit - self.spent
+
+
+class Client:
+    """
+    HEAD/GET over pooled keep-alive connections; `per_host` bounds the
+    connections (open or in use) to each (host, port, tls).
+    """
+
+    def __init__(self, per_host: int = 4, timeout: float = 10.0, max_redirects: int = 5):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.connections_opened = 0
+        self._idle: dict[tuple, list] = defaultdict(list)
+        self._limits: dict[tuple, asyncio.Semaphore] = {}
+        self._ssl = ssl.create_default_context()
+
+    async def check(self, url: str) -> Result:
+        result = Result(url)
+        budget = Budget(self.timeout)
+        try:
+            status, final_url = await self._follow("HEAD", url, budget)
+            if status >= 400:
+                status, final_url = await self._follow("GET", url, budget)
+            result.status, result.final_url = status, final_url
+            result.ok = status < 400
+            if not result.ok:
+                result.error = f"HTTP {status}"
+        except TimeoutError:
+            result.error = f"timeout after {self.timeout:g}s"
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as exc:
+            result.error = f"{type(exc).__name__}: {exc}"[:200]
+        result.latency_ms = round(budget.spent * 1000)
+        return result
+
+    async def aclose(self) -> None:
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+    async def _follow(self, method: str, url: str, budget: Optional[Budget] = None) -> tuple[int, str]:
+        for _ in range(self.max_redirects + 1):
+            status, headers = await self.request(method, url, budget)
+            if status not in REDIRECTS or "location" not in headers:
+                return status, url
+            url = urljoin(url, headers["location"])
+        raise ValueError("too many redirects")
+
+    async def request(self, method: str, url: str, budget: Optional[Budget] = None) -> tuple[int, dict[str, str]]:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported URL {url!r}")
+        tls = parts.scheme == "https"
+        key = (parts.hostname, parts.port or (443 if tls else 80), tls)
+        limit = self._limits.setdefault(key, asyncio.Semaphore(self.per_host))
+        async with limit:
+            # The budget runs from here: time spent waiting for the slot isn't counted
+            start = perf_counter()
+            try:
+                async with asyncio.timeout(budget.remaining if budget else None):
+                    return await self._send(key, method, parts)
+            finally:
+                if budget:
+                    budget.spent += perf_counter() - start
+
+    async def _send(self, key: tuple, method: str, parts) -> tuple[int, dict[str, str]]:
+        # Caller holds the host slot: reuse an idle connection or open one
+        idle = self._idle[key]
+        conn = idle.pop() if idle else None
+        if conn is not None:
+            try:
+                status, headers, reusable = await self._exchange(conn, method, parts)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                conn[1].close()  # the server closed the idle connection: retry once, fresh
+                conn = None
+            except BaseException:
+                conn[1].close()
+                raise
+        if conn is None:
+            conn = await self._open(key)
+            try:
+                status, headers, reusable = await self._exchange(conn, method, parts)
+            except BaseException:
+                conn[1].close()
+                raise
+        if reusable:
+            idle.append(conn)
+        else:
+            conn[1].close()
+        return status, headers
+
+    async def _open(self, key: tuple):
+        host, port, tls = key
+        self.connections_opened += 1
+        return await asyncio.open_connection(host, port, ssl=self._ssl if tls else None)
+
+    async def _exchange(self, conn, method: str, parts) -> tuple[int, dict[str, str], bool]:
+        reader, writer = conn
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        writer.write(
+            f"{method} {target} HTTP/1.1\r\nHost: {parts.netloc.rsplit('@', 1)[-1]}\r\n"
+            f"User-Agent: {USER_AGENT}\r\nAccept: */*\r\nConnection: keep-alive\r\n\r\n".encode("ascii")
+        )
+        await writer.drain()
+
+        while True:
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("connection closed before the response")
+            try:
+                status = int(status_line.split(None, 2)[1])
+            except (IndexError, ValueError):
+                raise ValueError(f"not an HTTP response: {status_line[:40]!r}") from None
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if status >= 200:  # skip 1xx interim responses
+                break
+
+        reusable = headers.get("connection", "").lower() != "close" and status_line.startswith(b"HTTP/1.1")
+        if method != "HEAD" and status not in (204, 304):
+            length = headers.get("content-length", "")
+            if length.isdigit() and int(length) <= MAX_DRAIN and "chunked" not in headers.get("transfer-encoding", ""):
+                await reader.readexactly(int(length))
+            else:
+                reusable = False  # large or unsized body: drop the connection instead of reading it
+        return status, headers, reusable
+
+
+async def check_all(
+    urls: Iterable[str], concurrency: int = 32, per_host: int = 4, timeout: float = 10.0
+) -> list[Result]:
+    client = Client(per_host=per_host, timeout=timeout)
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(url: str) -> Result:
+        async with gate:
+            return await client.check(url)
+
+    try:
+        return list(await asyncio.gather(*(one(url) for url in urls)))
+    finally:
+        await client.aclose()
@@ -0,0 +1,53 @@
+# catalogo/management/commands/backfill_document_metadata.py
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from catalogo import filemeta
+from catalogo.models import Documento
+from catalogo.purge import send_purge, trabajo_key
+
+
+def _read(doc: Documento):
+    # Worker thread: storage I/O only (the database is written by the main thread)
+    try:
+        with doc.file.storage.open(doc.file.name, "rb") as f:
+            return doc, filemeta.extract(doc.file.name, f), None
+    except Exception as exc:  # missing / unreadable file: report and go on
+        return doc, None, exc
+
+
+class Command(BaseCommand):
+    help = "Fill Documento file metadata (type, size, SHA-256, pages) for files stored before it existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Files read in parallel.")
+        parser.add_argument("--batch-size", type=int, default=200, help="Documents read and updated per slice.")
+        parser.add_argument("--all", action="store_true", help="Recompute documents that already have metadata.")
+
+    def handle(self, *args, **options):
+        qs = Documento.objects.exclude(file="").exclude(file=None).only("id", "trabajo_id", "file")
+        if not options["all"]:
+            qs = qs.filter(sha256="")
+
+        updated, failed, last, trabajos = 0, 0, 0, set()
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            # One slice of --batch-size documents in memory at a time, keyed on pk
+            while batch := list(qs.filter(pk__gt=last).order_by("pk")[: options["batch_size"]]):
+                last = batch[-1].pk
+                described = []
+                for doc, meta, exc in pool.map(_read, batch):
+                    if exc is not None:
+                        failed += 1
+                        self.stderr.write(f"{doc.file.name}: {exc}")
+                        continue
+                    for field, value in meta.items():
+                        setattr(doc, field, value)
+                    described.append(doc)
+                    trabajos.add(doc.trabajo_id)
+                updated += Documento.objects.bulk_update(described, filemeta.FIELDS)
+
+        # Bulk updates skip the model signals: purge the pages that list these documents
+        send_purge([trabajo_key(pk) for pk in sorted(trabajos)])
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(f"OK -> described {updated} document(s), {failed} unreadable"))
@@ -0,0 +1,53 @@
+# catalogo/management/commands/build_previews.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from catalogo import previews
+from catalogo.models import Documento, TablePreview
+from catalogo.purge import send_purge, trabajo_key
+
+
+class Command(BaseCommand):
+    help = "Parse CSV/XLSX statistics documents that have no stored preview yet (one per file content)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Files parsed in parallel.")
+        parser.add_argument("--watch", type=float, default=0, help="Keep running, polling every N seconds.")
+        parser.add_argument("--retry-errors", action="store_true", help="Parse again files that failed before.")
+
+    def handle(self, *args, **options):
+        if options["retry_errors"]:
+            TablePreview.objects.exclude(error="").delete()
+
+        while True:
+            built, failed = self.run_batch(options)
+            style = self.style.WARNING if failed else self.style.SUCCESS
+            self.stdout.write(style(f"OK -> built {built} preview(s), {failed} unreadable"))
+            if not options["watch"]:
+                break
+            time.sleep(options["watch"])
+
+    def run_batch(self, options) -> tuple[int, int]:
+        known = set(TablePreview.objects.values_list("sha256", flat=True))
+
+        # One document per unseen content; run `backfill_document_metadata` first for old files
+        todo: dict[str, Documento] = {}
+        for doc in Documento.objects.filter(doc_type=Documento.DocType.DATA).exclude(sha256="").order_by("id"):
+            if previews.supports(doc) and doc.sha256 not in known:
+                todo.setdefault(doc.sha256, doc)
+
+        built = failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            # Workers read and parse; rows are written from this thread
+            for sha256, data in zip(todo, pool.map(previews.read, todo.values())):
+                preview = previews.save(sha256, data)
+                failed += bool(preview.error)
+                built += not preview.error
+                if preview.error:
+                    self.stderr.write(f"{todo[sha256].file.name}: {preview.error}")
+
+        trabajos = Documento.objects.filter(sha256__in=list(todo)).values_list("trabajo_id", flat=True)
+        send_purge([trabajo_key(pk) for pk in set(trabajos)])
+        return built, failed
@@ -0,0 +1,65 @@
+# catalogo/management/commands/check_links.py
+import asyncio
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from catalogo.linkcheck import check_all
+from catalogo.models import Documento, LinkCheck, Trabajo
+
+# Redirect targets (signed URLs especially) can be longer than the column
+FINAL_URL_LENGTH = LinkCheck._meta.get_field("final_url").max_length
+
+
+def catalog_urls() -> list[str]:
+    urls = set(Documento.objects.exclude(url="").values_list("url", flat=True))
+    urls |= set(Trabajo.objects.exclude(app_url="").values_list("app_url", flat=True))
+    return sorted(urls)
+
+
+class Command(BaseCommand):
+    help = "Check every external link (Documento.url, Trabajo.app_url) and store status, latency and failures."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=32, help="Checks in flight.")
+        parser.add_argument("--per-host", type=int, default=4, help="Connections per host.")
+        parser.add_argument("--timeout", type=float, default=10.0, help="Seconds per link (redirects included).")
+        parser.add_argument("--failing", action="store_true", help="Only re-check links that failed last time.")
+
+    def handle(self, *args, **options):
+        urls = catalog_urls()
+        # Links no longer used anywhere are forgotten
+        LinkCheck.objects.exclude(url__in=urls).delete()
+        if options["failing"]:
+            urls = list(LinkCheck.objects.filter(ok=False).values_list("url", flat=True))
+
+        results = asyncio.run(
+            check_all(urls, concurrency=options["concurrency"], per_host=options["per_host"], timeout=options["timeout"])
+        )
+
+        previous = dict(LinkCheck.objects.filter(url__in=urls).values_list("url", "failures"))
+        now = timezone.now()
+        LinkCheck.objects.bulk_create(
+            [
+                LinkCheck(
+                    url=r.url,
+                    ok=r.ok,
+                    status=r.status,
+                    latency_ms=r.latency_ms,
+                    final_url=(r.final_url if r.final_url != r.url else "")[:FINAL_URL_LENGTH],
+                    error=r.error,
+                    failures=0 if r.ok else previous.get(r.url, 0) + 1,
+                    checked_at=now,
+                )
+                for r in results
+            ],
+            update_conflicts=True,
+            unique_fields=["url"],
+            update_fields=["ok", "status", "latency_ms", "final_url", "error", "failures", "checked_at"],
+        )
+
+        failed = [r for r in results if not r.ok]
+        for r in failed:
+            self.stderr.write(f"{r.url}: {r.error}")
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(f"OK -> checked {len(results)} link(s), {len(failed)} failing"))
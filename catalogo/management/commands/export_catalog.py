@@ -0,0 +1,19 @@
+# catalogo/management/commands/export_catalog.py
+from django.core.management.base import BaseCommand
+
+from catalogo.transfer import iter_export, open_stream, write_ndjson
+
+
+class Command(BaseCommand):
+    help = "Stream the whole catalog as NDJSON (natural keys; .gz compresses) for import_catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='Output file ("-" for stdout).')
+
+    def handle(self, *args, **options):
+        if options["path"] == "-":
+            write_ndjson(iter_export(), self.stdout)
+            return
+        with open_stream(options["path"], "wt") as f:
+            n = write_ndjson(iter_export(), f)
+        self.stdout.write(self.style.SUCCESS(f"OK -> exported {n} record(s) to {options['path']}"))
@@ -0,0 +1,121 @@
+# catalogo/management/commands/extract_document_text.py
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError
+
+from catalogo import textindex
+from catalogo.models import Documento, DocumentText
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract searchable text from document files (PDF, XLSX/CSV, HTML) that have none yet, "
+        "in a process pool with per-file time and memory limits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Worker processes.")
+        parser.add_argument("--timeout", type=int, default=60, help="Seconds per file.")
+        parser.add_argument("--memory-mb", type=int, default=1024, help="Address space per worker (0: no limit).")
+        parser.add_argument("--watch", type=float, default=0, help="Keep running, polling every N seconds.")
+        parser.add_argument("--retry-errors", action="store_true", help="Extract again files that failed before.")
+        parser.add_argument("--prune", action="store_true", help="Delete texts no document references anymore.")
+
+    def handle(self, *args, **options):
+        if options["retry_errors"]:
+            DocumentText.objects.exclude(error="").delete()
+        if options["prune"]:
+            used = Documento.objects.exclude(sha256="").values("sha256")
+            pruned, _ = DocumentText.objects.exclude(sha256__in=used).delete()
+            self.stdout.write(f"pruned {pruned} unreferenced text(s)")
+
+        while True:
+            done, failed = self.run_batch(options)
+            style = self.style.WARNING if failed else self.style.SUCCESS
+            self.stdout.write(style(f"OK -> extracted {done} document(s), {failed} failed"))
+            if not options["watch"]:
+                break
+            time.sleep(options["watch"])
+
+    def run_batch(self, options) -> tuple[int, int]:
+        todo = deque(textindex.pending())
+        suspects: deque[Documento] = deque()  # in flight when a worker died
+        workers = max(1, options["workers"])
+        done = failed = 0
+        while todo or suspects:
+            # After a crash, the documents that were running are retried one at a time
+            queue, limit = (suspects, 1) if suspects else (todo, workers)
+            with ProcessPoolExecutor(
+                max_workers=limit,
+                initializer=textindex.init_worker,
+                initargs=(options["memory_mb"],),
+            ) as pool:
+                ok, bad, crashed = self.run_jobs(pool, queue, limit, options["timeout"])
+            done, failed = done + ok, failed + bad
+            if len(crashed) == 1:  # it ran alone: this file killed its worker (segfault, OOM kill)
+                failed += self.record(crashed[0], {"error": "worker crashed"})
+            else:
+                suspects.extend(crashed)
+        return done, failed
+
+    def run_jobs(self, pool, queue: deque, limit: int, timeout: int) -> tuple[int, int, list[Documento]]:
+        """
+        Extracts queued documents with at most `limit` in flight; remote files
+        are copied to a temporary file only when submitted. Stops submitting
+        once the pool breaks and returns the documents lost with it.
+        """
+        done = failed = 0
+        running: dict[Future, tuple[Documento, str, bool]] = {}
+        crashed: list[Documento] = []
+        while running or (queue and not crashed):
+            while queue and not crashed and len(running) < limit:
+                doc = queue.popleft()
+                try:
+                    path, temporary = textindex.local_path(doc)
+                except OSError as exc:
+                    failed += self.record(doc, {"error": f"unreadable: {exc}"[:200]})
+                    continue
+                try:
+                    running[pool.submit(textindex.extract_file, path, doc.extension, timeout)] = (doc, path, temporary)
+                except BrokenProcessPool:
+                    if temporary:
+                        textindex.remove_temporary(path)
+                    crashed.append(doc)
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            # Results are written from this process; workers never touch the database
+            for future in finished:
+                doc, path, temporary = running.pop(future)
+                if temporary:
+                    textindex.remove_temporary(path)
+                try:
+                    data = future.result()
+                except BrokenProcessPool:
+                    crashed.append(doc)
+                    continue
+                if self.record(doc, data):
+                    failed += 1
+                else:
+                    done += 1
+        return done, failed, crashed
+
+    def record(self, doc: Documento, data: dict) -> bool:
+        """
+        Saves the result; True when it is an error.
+        """
+        self.save(doc, data)
+        if data.get("error"):
+            self.stderr.write(f"{doc.file.name}: {data['error']}")
+            return True
+        return False
+
+    def save(self, doc: Documento, data: dict) -> None:
+        try:
+            DocumentText.objects.create(sha256=doc.sha256, **data)
+        except IntegrityError:  # same bytes extracted by a concurrent run
+            pass
@@ -0,0 +1,18 @@
+# catalogo/management/commands/refresh_area_counters.py
+from django.core.management.base import BaseCommand
+
+from catalogo.models import Area
+
+
+class Command(BaseCommand):
+    help = "Recompute Area.published_count / last_published_at from Trabajo (repairs drift)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="*", help="Only these areas (default: all).")
+
+    def handle(self, *args, **options):
+        qs = Area.objects.all()
+        if options["slugs"]:
+            qs = qs.filter(slug__in=options["slugs"])
+        updated = qs.refresh_counters()
+        self.stdout.write(self.style.SUCCESS(f"OK -> refreshed {updated} area(s)"))
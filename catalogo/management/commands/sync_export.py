@@ -0,0 +1,34 @@
+# catalogo/management/commands/sync_export.py
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalogo.sync import export_bundle, read_meta
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the catalog rows changed since a watermark (plus deletes and document files) "
+        "into a bundle directory for sync_apply. Without --since/--after exports everything."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("bundle", help="Target directory (created if missing).")
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument("--since", help="ISO-8601 watermark, e.g. the previous bundle's 'until'.")
+        group.add_argument("--after", help="Previous bundle directory: continue from its 'until'.")
+
+    def handle(self, *args, **options):
+        since = options["since"]
+        if options["after"]:
+            since = read_meta(Path(options["after"]))["until"]
+        try:
+            since = datetime.fromisoformat(since) if since else None
+        except ValueError as exc:
+            raise CommandError(f"Invalid --since: {exc}") from exc
+
+        meta = export_bundle(Path(options["bundle"]), since)
+        self.stdout.write(self.style.SUCCESS(
+            f"OK -> {meta['records']} record(s) into {options['bundle']} (until {meta['until']})"
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-19 10:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogo', '0004_alter_area_options_alter_documento_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documento',
+            index=models.Index(fields=['trabajo', 'doc_type', 'order', 'id'], name='ix_documento_trabajo_type'),
+        ),
+        migrations.AddIndex(
+            model_name='documento',
+            index=models.Index(fields=['trabajo', 'order', 'id'], name='ix_documento_trabajo_order'),
+        ),
+        migrations.AddIndex(
+            model_name='highlight',
+            index=models.Index(fields=['trabajo', 'order', 'id'], name='ix_highlight_trabajo_order'),
+        ),
+        migrations.AddIndex(
+            model_name='trabajo',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['area', '-published_at', '-created_at', '-id'], name='ix_trabajo_area_published'),
+        ),
+        migrations.AddIndex(
+            model_name='trabajo',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-published_at', '-created_at', '-id'], name='ix_trabajo_published'),
+        ),
+    ]
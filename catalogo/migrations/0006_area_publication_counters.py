@@ -0,0 +1,43 @@
+# Generated by Django 5.2.11 on 2026-10-19 10:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Area = apps.get_model("catalogo", "Area")
+    Trabajo = apps.get_model("catalogo", "Trabajo")
+    published = Trabajo.objects.filter(area=OuterRef("pk"), status="published").order_by()
+    Area.objects.update(
+        published_count=Coalesce(
+            Subquery(published.values("area").annotate(n=Count("id")).values("n")),
+            0,
+        ),
+        last_published_at=Subquery(
+            published.filter(published_at__isnull=False)
+            .order_by("-published_at")
+            .values("published_at")[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogo', '0005_trabajo_documento_highlight_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='area',
+            name='last_published_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='area',
+            name='published_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
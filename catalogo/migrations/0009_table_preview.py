@@ -0,0 +1,26 @@
+# Generated by Django 5.2.11 on 2026-10-19 11:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogo', '0008_documento_file_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TablePreview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('row_count', models.PositiveBigIntegerField(default=0)),
+                ('columns', models.JSONField(default=list)),
+                ('rows', models.JSONField(default=list)),
+                ('sampled', models.BooleanField(default=False)),
+                ('error', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
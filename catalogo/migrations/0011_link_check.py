@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-19 11:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogo', '0010_document_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkCheck',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('ok', models.BooleanField(db_index=True, default=False)),
+                ('status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('latency_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('final_url', models.URLField(blank=True, max_length=500)),
+                ('error', models.CharField(blank=True, max_length=200)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('checked_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'ordering': ('ok', '-failures', 'url'),
+            },
+        ),
+    ]
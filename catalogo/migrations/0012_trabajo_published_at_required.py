@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-19 11:42
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def backfill_published_at(apps, schema_editor):
+    # Rows published through QuerySet.update() or an old import: use their creation date
+    Area = apps.get_model("catalogo", "Area")
+    Trabajo = apps.get_model("catalogo", "Trabajo")
+    missing = Trabajo.objects.filter(status="published", published_at__isnull=True)
+    area_ids = set(missing.values_list("area_id", flat=True))
+    missing.update(published_at=F("created_at"))
+    published = Trabajo.objects.filter(area=OuterRef("pk"), status="published").order_by("-published_at")
+    Area.objects.filter(pk__in=area_ids).update(last_published_at=Subquery(published.values("published_at")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogo', '0011_link_check'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_published_at, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='trabajo',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('status', 'published'), _negated=True), ('published_at__isnull', False), _connector='OR'), name='ck_trabajo_published_at'),
+        ),
+    ]
@@ -2,14 +2,22 @@
 from __future__ import annotations
 
 import os
+from time import perf_counter
 from typing import Optional
 
 from django.core.exceptions import ValidationError
-from django.core.files.storage import Storage, default_storage
-from django.db import models
+from django.core.files.storage import FileSystemStorage, Storage, default_storage
+from django.db import models, router, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+
+from core.utils import observability
+
+from . import filemeta
 
 
 # ------------------------------------------------------------
@@ -40,36 +48,49 @@ class DocumentRawStorage(Storage):
 
         return self._backend
 
+    def is_local(self) -> bool:
+        # Local files are served by catalogo.downloads (ranges, sendfile)
+        return isinstance(self._get_backend(), FileSystemStorage)
+
+    def _call(self, method: str, *args, **kwargs):
+        # Timed in the "storage" bucket of sampled requests (portal.instrumentation)
+        # and in the storage latency histogram (portal.metrics)
+        start = perf_counter()
+        try:
+            with observability.track("storage"):
+                return getattr(self._get_backend(), method)(*args, **kwargs)
+        finally:
+            observability.observe("portal_storage_call_seconds", perf_counter() - start, method=method.lstrip("_"))
+
     def _open(self, name, mode="rb"):
-        return self._get_backend()._open(name, mode)
+        return self._call("_open", name, mode)
 
     def _save(self, name, content):
-        return self._get_backend()._save(name, content)
+        return self._call("_save", name, content)
 
     def delete(self, name):
-        return self._get_backend().delete(name)
+        return self._call("delete", name)
 
     def exists(self, name):
-        return self._get_backend().exists(name)
+        return self._call("exists", name)
 
     def listdir(self, path):
-        return self._get_backend().listdir(path)
+        return self._call("listdir", path)
 
     def size(self, name):
-        return self._get_backend().size(name)
+        return self._call("size", name)
+
+    def path(self, name):
+        if not hasattr(self._get_backend(), "path"):
+            raise NotImplementedError("This storage backend does not support absolute paths.")
+        return self._call("path", name)
 
     def url(self, name):
-        return self._get_backend().url(name)
+        return self._call("url", name)
 
     def get_available_name(self, name, max_length=None):
         return self._get_backend().get_available_name(name, max_length=max_length)
 
-    def path(self, name):
-        backend = self._get_backend()
-        if hasattr(backend, "path"):
-            return backend.path(name)
-        raise NotImplementedError("This storage backend does not support absolute paths.")
-
 
 # ------------------------------------------------------------
 # Upload paths (CANONICAL STRUCTURE)
@@ -111,14 +132,44 @@ def upload_document_to(instance: "Documento", filename: str) -> str:
 # Models
 # ------------------------------------------------------------
 
+class AreaQuerySet(models.QuerySet):
+
+    def refresh_counters(self) -> int:
+        """
+        Recomputes the denormalized publication counters with one UPDATE.
+        Used by the Trabajo signals and by `manage.py refresh_area_counters`.
+        """
+        published = Trabajo.objects.filter(
+            area=OuterRef("pk"),
+            status=Trabajo.Status.PUBLISHED,
+        ).order_by()
+        return self.update(
+            published_count=Coalesce(
+                Subquery(published.values("area").annotate(n=Count("id")).values("n")),
+                0,
+            ),
+            last_published_at=Subquery(
+                published.filter(published_at__isnull=False)
+                .order_by("-published_at")
+                .values("published_at")[:1]
+            ),
+        )
+
+
 class Area(models.Model):
     name = models.CharField(max_length=120, unique=True)
     slug = models.SlugField(max_length=140, unique=True)
     description = models.TextField(blank=True)
     order = models.PositiveIntegerField(default=0, db_index=True)
 
+    # Denormalized from Trabajo (see catalogo/signals.py); never edited by hand.
+    published_count = models.PositiveIntegerField(default=0, editable=False)
+    last_published_at = models.DateTimeField(blank=True, null=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # sync_export watermark
+
+    objects = AreaQuerySet.as_manager()
 
     class Meta:
         ordering = ("order", "name")
@@ -167,12 +218,32 @@ class Trabajo(models.Model):
     order = models.PositiveIntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # sync_export watermark
 
     class Meta:
         ordering = ("-published_at", "-created_at")
         constraints = [
             models.UniqueConstraint(fields=["area", "slug"], name="uq_trabajo_area_slug"),
+            # Listings page on published_at (catalogo/pagination.py); save() and the
+            # importer set it, this also covers QuerySet.update() and raw SQL.
+            models.CheckConstraint(
+                condition=~models.Q(status="published") | models.Q(published_at__isnull=False),
+                name="ck_trabajo_published_at",
+            ),
+        ]
+        indexes = [
+            # Partial indexes for the public listings (home, area_detail):
+            # only published rows are indexed, already in display order.
+            models.Index(
+                fields=["area", "-published_at", "-created_at", "-id"],
+                condition=models.Q(status="published"),
+                name="ix_trabajo_area_published",
+            ),
+            models.Index(
+                fields=["-published_at", "-created_at", "-id"],
+                condition=models.Q(status="published"),
+                name="ix_trabajo_published",
+            ),
         ]
 
     def __str__(self) -> str:
@@ -181,7 +252,7 @@ class Trabajo(models.Model):
     def get_absolute_url(self) -> str:
         return reverse("catalogo:trabajo_detail", args=[self.area.slug, self.slug])
 
-    @property
+    @cached_property  # may hit the storage backend; async views resolve it off-loop
     def hero_image(self) -> str:
         if self.image and hasattr(self.image, "url"):
             return self.image.url
@@ -191,10 +262,17 @@ class Trabajo(models.Model):
             return self.thumbnail_url
         return ""
 
+    @cached_property
+    def card_image(self) -> str:
+        # Listing cards prefer the thumbnail over the full-size image
+        return self.thumbnail_url or self.hero_image
+
     def save(self, *args, **kwargs):
         if self.status == self.Status.PUBLISHED and self.published_at is None:
             self.published_at = timezone.now()
-        super().save(*args, **kwargs)
+        # post_save receivers (area counters, catalogo/signals.py) run in the same transaction
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(type(self), instance=self)):
+            super().save(*args, **kwargs)
 
 
 # ------------------------------------------------------------
@@ -211,9 +289,13 @@ class Highlight(models.Model):
     value = models.CharField(max_length=220, blank=True)
     order = models.PositiveIntegerField(default=0, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ("order", "id")
+        indexes = [
+            models.Index(fields=["trabajo", "order", "id"], name="ix_highlight_trabajo_order"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.label}: {self.value}" if self.value else self.label
@@ -245,16 +327,149 @@ class Documento(models.Model):
 
     url = models.URLField(blank=True)
 
+    # File metadata, filled from the upload stream (catalogo.filemeta)
+    mime_type = models.CharField(max_length=100, blank=True, editable=False)
+    extension = models.CharField(max_length=16, blank=True, editable=False)
+    size = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    sha256 = models.CharField(max_length=64, blank=True, editable=False)
+    page_count = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ("order", "id")
+        indexes = [
+            # trabajo_detail: one query per doc_type, ordered by (order, id)
+            models.Index(fields=["trabajo", "doc_type", "order", "id"], name="ix_documento_trabajo_type"),
+            # trabajo_documentos: all documents, ordered by (order, id)
+            models.Index(fields=["trabajo", "order", "id"], name="ix_documento_trabajo_order"),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_file = instance.__dict__.get("file", models.DEFERRED)
+        return instance
+
+    def save(self, *args, **kwargs):
+        # New or replaced file: describe it once, from the stream being uploaded
+        stored = getattr(self, "_stored_file", "")
+        name = self.file.name if self.file else ""
+        if stored is not models.DEFERRED and name != (stored or ""):
+            self.refresh_file_metadata()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], *filemeta.FIELDS}
+        super().save(*args, **kwargs)
+        self._stored_file = self.file.name if self.file else ""
+
+    def refresh_file_metadata(self) -> None:
+        if not self.file:
+            meta = filemeta.empty()
+        elif not self.file._committed:
+            meta = filemeta.extract(self.file.name, self.file.file)
+        else:
+            with self.file.storage.open(self.file.name, "rb") as f:
+                meta = filemeta.extract(self.file.name, f)
+        for field, value in meta.items():
+            setattr(self, field, value)
+
+    @cached_property
+    def file_url(self) -> str:
+        # Resolved once per instance (Cloudinary URLs are built by the backend)
+        if not self.file:
+            return ""
+        if self.file.storage.is_local():
+            return reverse("documento_download", args=[self.pk])
+        return self.file.url
+
     def clean(self) -> None:
         super().clean()
         if not self.file and not self.url:
             raise ValidationError("Provide either a file upload or a URL.")
+
+
+class TablePreview(models.Model):
+    """
+    Inline preview of a CSV/XLSX document (catalogo.previews), one per file
+    content: documents with the same bytes share it, edits to a document that
+    keep its file never reparse it. `error` records files that can't be parsed.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)  # Documento.sha256
+    row_count = models.PositiveBigIntegerField(default=0)
+    columns = models.JSONField(default=list)  # [{"name", "type", "count", "missing", "mean", ...}]
+    rows = models.JSONField(default=list)  # first rows, as strings
+    sampled = models.BooleanField(default=False)  # quartiles from a sample
+    error = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.error or f"{self.row_count} rows x {len(self.columns)} columns"
+
+
+class DocumentText(models.Model):
+    """
+    Normalized text of a document file for search (catalogo.textindex), one
+    per file content, like TablePreview.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)  # Documento.sha256
+    text = models.TextField(blank=True)
+    truncated = models.BooleanField(default=False)  # longer than textindex.MAX_CHARS
+    error = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.error or f"{len(self.text)} chars"
+
+
+# ------------------------------------------------------------
+# External link health (see catalogo/linkcheck.py)
+# ------------------------------------------------------------
+
+class LinkCheck(models.Model):
+    """
+    Last `manage.py check_links` result for an external URL used by
+    Documento.url or Trabajo.app_url (one row per distinct URL).
+    """
+
+    url = models.URLField(max_length=500, unique=True)
+    ok = models.BooleanField(default=False, db_index=True)
+    status = models.PositiveSmallIntegerField(null=True, blank=True)
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+    final_url = models.URLField(max_length=500, blank=True)  # after redirects
+    error = models.CharField(max_length=200, blank=True)
+    failures = models.PositiveIntegerField(default=0)  # consecutive failed checks
+    checked_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ("ok", "-failures", "url")
+
+    def __str__(self) -> str:
+        return f"{self.url} ({'ok' if self.ok else self.error or self.status})"
+
+
+# ------------------------------------------------------------
+# Delta sync (see catalogo/sync.py)
+# ------------------------------------------------------------
+
+class Tombstone(models.Model):
+    """
+    Natural key of a deleted (or re-keyed) Area/Trabajo, so sync_export can
+    propagate deletes. Highlight/Documento deletes bump their trabajo instead.
+    """
+
+    model = models.CharField(max_length=40)  # "catalogo.area" / "catalogo.trabajo"
+    key = models.CharField(max_length=400)  # "<area_slug>" / "<area_slug>/<trabajo_slug>"
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ("deleted_at", "id")
+
+    def __str__(self) -> str:
+        return f"{self.model} {self.key}"
@@ -0,0 +1,108 @@
+# catalogo/pagination.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from django.core import signing
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+
+
+# ------------------------------------------------------------
+# Keyset (cursor) pagination over the Trabajo publication order
+# ------------------------------------------------------------
+# Same order as Trabajo.Meta.ordering, plus "id" as a unique tie-breaker so
+# the cursor always points at exactly one row.
+KEYSET_ORDERING = ("-published_at", "-created_at", "-id")
+
+_CURSOR_SALT = "catalogo.pagination.cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _value(row: Any, name: str) -> Any:
+    if isinstance(row, dict):
+        return row[name]
+    return getattr(row, name)
+
+
+@dataclass(frozen=True)
+class Cursor:
+    published_at: datetime
+    created_at: datetime
+    id: int
+
+    @classmethod
+    def from_row(cls, row: Any) -> "Cursor":
+        """
+        Builds a cursor from a model instance or a `.values()` dict.
+        """
+        return cls(_value(row, "published_at"), _value(row, "created_at"), _value(row, "id"))
+
+    def encode(self) -> str:
+        payload = [self.published_at.isoformat(), self.created_at.isoformat(), self.id]
+        return signing.dumps(payload, salt=_CURSOR_SALT, compress=False)
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        try:
+            published_at, created_at, pk = signing.loads(token, salt=_CURSOR_SALT)
+        except (signing.BadSignature, TypeError, ValueError) as exc:
+            raise InvalidCursor("Invalid cursor.") from exc
+
+        published = parse_datetime(str(published_at))
+        created = parse_datetime(str(created_at))
+        if published is None or created is None or not isinstance(pk, int):
+            raise InvalidCursor("Invalid cursor.")
+        return cls(published, created, pk)
+
+    def as_filter(self) -> Q:
+        """
+        Rows strictly after this cursor in KEYSET_ORDERING.
+        """
+        return (
+            Q(published_at__lt=self.published_at)
+            | Q(published_at=self.published_at, created_at__lt=self.created_at)
+            | Q(published_at=self.published_at, created_at=self.created_at, id__lt=self.id)
+        )
+
+
+def _page_queryset(qs: QuerySet, cursor: Optional[Cursor], limit: int) -> QuerySet:
+    qs = qs.filter(published_at__isnull=False).order_by(*KEYSET_ORDERING)
+    if cursor is not None:
+        qs = qs.filter(cursor.as_filter())
+    return qs[: limit + 1]  # one extra row tells whether there is a next page
+
+
+def _split(rows: list[Any], limit: int) -> tuple[list[Any], Optional[Cursor]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, Cursor.from_row(rows[-1])
+
+
+def paginate_keyset(
+    qs: QuerySet, cursor: Optional[Cursor], limit: int
+) -> tuple[list[Any], Optional[Cursor]]:
+    """
+    Returns (rows, next_cursor). `qs` may be a model or `.values()` queryset;
+    `.values()` querysets must include published_at, created_at and id.
+
+    Rows without published_at (drafts only: the ck_trabajo_published_at
+    constraint requires it on published rows) are skipped, since NULLs sort
+    differently on SQLite and Postgres.
+    """
+    return _split(list(_page_queryset(qs, cursor, limit)), limit)
+
+
+async def apaginate_keyset(
+    qs: QuerySet, cursor: Optional[Cursor], limit: int
+) -> tuple[list[Any], Optional[Cursor]]:
+    """
+    paginate_keyset for async views (async ORM iteration).
+    """
+    return _split([row async for row in _page_queryset(qs, cursor, limit)], limit)
@@ -0,0 +1,323 @@
+# catalogo/previews.py
+"""
+Inline previews of "Statistics and reports" documents (CSV / XLSX).
+
+- files are read as a stream, CHUNK_ROWS rows at a time, so memory stays
+  flat whatever the number of rows (XLSX: the sheet XML is parsed
+  incrementally; its shared string table is held in memory, and a table
+  over MAX_SHARED_STRINGS entries or MAX_SHARED_CHARS characters is
+  recorded as a parse error)
+- per column: inferred type and, for numeric columns, count / missing /
+  mean / std / min / max accumulated chunk by chunk with NumPy; quartiles
+  come from a fixed-size reservoir sample (exact below SAMPLE_SIZE values)
+- the result (first PREVIEW_ROWS rows + column stats) is stored once per
+  file content in TablePreview, keyed by Documento.sha256: unchanged or
+  duplicated files are never parsed again, failures included
+- parsing takes seconds for large files, so it never runs in a request:
+  `manage.py build_previews` (scheduled, or `--watch`) builds what's missing
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import itertools
+import math
+import posixpath
+import re
+import zipfile
+from typing import IO, Any, Iterable, Iterator, Optional
+from xml.etree.ElementTree import iterparse
+
+from django.db import IntegrityError
+
+from .models import Documento, TablePreview
+
+FORMATS = ("csv", "tsv", "xlsx")
+PREVIEW_ROWS = 10
+MAX_COLUMNS = 30
+MAX_CELL = 80  # characters kept per preview cell
+CHUNK_ROWS = 5000
+SAMPLE_SIZE = 10_000  # values per numeric column kept for quartiles
+MAX_SHARED_STRINGS = 1_000_000  # XLSX shared string table limits
+MAX_SHARED_CHARS = 50_000_000
+MISSING = {"", "na", "n/a", "nan", "null", "none", "-", "..", "s/d"}
+
+
+def supports(documento: Documento) -> bool:
+    return bool(
+        documento.doc_type == Documento.DocType.DATA
+        and documento.file
+        and documento.sha256
+        and documento.extension in FORMATS
+    )
+
+
+# ------------------------------------------------------------
+# Readers: rows of strings
+# ------------------------------------------------------------
+
+def iter_csv_rows(f: IO[bytes]) -> Iterator[list[str]]:
+    text = codecs.getreader("utf-8-sig")(f, errors="replace")
+    sample = text.read(64 * 1024)
+    sample += text.readline()  # complete the last line of the sample
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    lines = itertools.chain(io.StringIO(sample), text)
+    yield from csv.reader(lines, dialect)
+
+
+_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_CELL_REF = re.compile(r"[A-Z]+")
+
+
+def _column_index(ref: str) -> int:
+    index = 0
+    for char in _CELL_REF.match(ref).group():
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def _first_sheet(archive: zipfile.ZipFile) -> str:
+    try:
+        with archive.open("xl/workbook.xml") as f:
+            sheet = next(el for _, el in iterparse(f) if el.tag == f"{_MAIN}sheet")
+        with archive.open("xl/_rels/workbook.xml.rels") as f:
+            targets = {el.get("Id"): el.get("Target") for _, el in iterparse(f) if el.tag == f"{_PKG_REL}Relationship"}
+        target = targets[sheet.get(f"{_REL}id")]
+    except (KeyError, StopIteration):
+        return "xl/worksheets/sheet1.xml"
+    return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+
+
+def iter_xlsx_rows(f: IO[bytes]) -> Iterator[list[str]]:
+    """
+    Rows of the first worksheet (cached values; dates stay serial numbers).
+    """
+    with zipfile.ZipFile(f) as archive:
+        shared: list[str] = []
+        chars = 0
+        if "xl/sharedStrings.xml" in archive.namelist():
+            with archive.open("xl/sharedStrings.xml") as ss:
+                for _, el in iterparse(ss):
+                    if el.tag == f"{_MAIN}si":
+                        shared.append("".join(t.text or "" for t in el.iter(f"{_MAIN}t")))
+                        chars += len(shared[-1])
+                        el.clear()
+                        if len(shared) > MAX_SHARED_STRINGS or chars > MAX_SHARED_CHARS:
+                            raise ValueError("shared string table too large")
+
+        with archive.open(_first_sheet(archive)) as sheet:
+            for _, el in iterparse(sheet):
+                if el.tag != f"{_MAIN}row":
+                    continue
+                row: list[str] = []
+                for cell in el.iter(f"{_MAIN}c"):
+                    if cell.get("r"):
+                        row.extend([""] * (_column_index(cell.get("r")) - len(row)))
+                    kind, value = cell.get("t"), cell.findtext(f"{_MAIN}v") or ""
+                    if kind == "s" and value:
+                        value = shared[int(value)]
+                    elif kind == "inlineStr":
+                        value = "".join(t.text or "" for t in cell.iter(f"{_MAIN}t"))
+                    elif kind == "b":
+                        value = "TRUE" if value == "1" else "FALSE"
+                    row.append(value)
+                el.clear()
+                yield row
+
+
+def iter_rows(extension: str, f: IO[bytes]) -> Iterator[list[str]]:
+    return iter_xlsx_rows(f) if extension == "xlsx" else iter_csv_rows(f)
+
+
+# ------------------------------------------------------------
+# Column statistics
+# ------------------------------------------------------------
+
+def parse_number(value: str) -> Optional[float]:
+    """
+    float, NaN for a missing value, None when the value isn't numeric.
+    Accepts decimal commas ("1,5") as used in Spanish-language files.
+    """
+    value = value.strip()
+    if value.lower() in MISSING:
+        return math.nan
+    if "," in value and "." not in value:
+        value = value.replace(",", ".")
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+class ColumnStats:
+    """
+    Streaming statistics of one column; `add(values)` takes a chunk.
+    Mean and variance are merged per chunk (Chan et al.), so precision
+    doesn't degrade over millions of rows.
+    """
+
+    def __init__(self, name: str, rng):
+        self.name = name
+        self.numeric = True
+        self.count = self.missing = 0
+        self.mean = self.m2 = 0.0
+        self.lo, self.hi = math.inf, -math.inf
+        self.seen = 0  # numeric values offered to the reservoir
+        self.sample = None
+        self._rng = rng
+
+    def add(self, values: list[str]) -> None:
+        import numpy as np
+
+        numbers = [parse_number(v) for v in values] if self.numeric else None
+        if numbers is not None and None in numbers:
+            self.numeric = False  # first non-numeric value: text column from now on
+        if not self.numeric:
+            present = sum(1 for v in values if v.strip().lower() not in MISSING)
+            self.count += present
+            self.missing += len(values) - present
+            return
+
+        array = np.asarray(numbers, dtype=np.float64)
+        array = array[~np.isnan(array)]
+        self.missing += len(values) - array.size
+        if not array.size:
+            return
+        n, mean = array.size, float(array.mean())
+        m2 = float(np.square(array - mean).sum())
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.lo, self.hi = min(self.lo, float(array.min())), max(self.hi, float(array.max()))
+        self._reservoir(array)
+
+    def _reservoir(self, array) -> None:
+        import numpy as np
+
+        if self.sample is None:
+            self.sample = np.empty(0, dtype=np.float64)
+        room = SAMPLE_SIZE - self.sample.size
+        if room > 0:
+            self.sample = np.concatenate([self.sample, array[:room]])
+        rest = array[max(room, 0):]
+        if rest.size:
+            # Algorithm R, vectorized: value i replaces a random slot with p = K / (seen + i + 1)
+            positions = self.seen + max(room, 0) + np.arange(rest.size)
+            slots = self._rng.integers(0, positions + 1)
+            keep = slots < SAMPLE_SIZE
+            self.sample[slots[keep]] = rest[keep]
+        self.seen += array.size
+
+    def summary(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "name": self.name,
+            "type": "number" if self.numeric and self.count else "text",
+            "count": self.count,
+            "missing": self.missing,
+        }
+        if out["type"] == "number":
+            import numpy as np
+
+            p25, p50, p75 = np.quantile(self.sample, [0.25, 0.5, 0.75])
+            std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+            out.update(
+                mean=round(self.mean, 6), std=round(std, 6), min=self.lo, max=self.hi,
+                p25=float(p25), p50=float(p50), p75=float(p75),
+            )
+        return out
+
+
+def build(extension: str, f: IO[bytes]) -> dict[str, Any]:
+    """
+    {"row_count", "columns": [column summaries], "rows": [first rows], "sampled"}
+    for a CSV/XLSX stream; the first row is the header.
+    """
+    import numpy as np
+
+    rows = iter_rows(extension, f)
+    header = next(rows, [])[:MAX_COLUMNS]
+    width = len(header)
+    rng = np.random.default_rng(0)  # deterministic previews for the same bytes
+    columns = [ColumnStats(name.strip() or f"#{i + 1}", rng) for i, name in enumerate(header)]
+
+    preview, row_count = [], 0
+    while True:
+        chunk = list(itertools.islice(rows, CHUNK_ROWS))
+        if not chunk:
+            break
+        chunk = [(row + [""] * width)[:width] for row in chunk]
+        if len(preview) < PREVIEW_ROWS:
+            preview += [[cell[:MAX_CELL] for cell in row] for row in chunk[: PREVIEW_ROWS - len(preview)]]
+        for index, values in enumerate(zip(*chunk)):
+            columns[index].add(list(values))
+        row_count += len(chunk)
+
+    return {
+        "row_count": row_count,
+        "columns": [c.summary() for c in columns],
+        "rows": preview,
+        "sampled": any(c.seen > SAMPLE_SIZE for c in columns),
+    }
+
+
+# ------------------------------------------------------------
+# Storage (one TablePreview per file content)
+# ------------------------------------------------------------
+
+def read(documento: Documento) -> dict[str, Any]:
+    """
+    Parses the document's file: preview fields, or {"error": ...}.
+    """
+    try:
+        with documento.file.storage.open(documento.file.name, "rb") as f:
+            return build(documento.extension, f)
+    except Exception as exc:  # any malformed file is recorded, never raised
+        return {"error": f"{type(exc).__name__}: {exc}"[:200]}
+
+
+def save(sha256: str, data: dict[str, Any]) -> TablePreview:
+    try:
+        return TablePreview.objects.create(sha256=sha256, **data)
+    except IntegrityError:  # built concurrently for the same bytes
+        return TablePreview.objects.get(sha256=sha256)
+
+
+def ensure(documento: Documento) -> Optional[TablePreview]:
+    """
+    The document's preview, parsing the file only if these bytes were never seen.
+    """
+    if not supports(documento):
+        return None
+    existing = TablePreview.objects.filter(sha256=documento.sha256).first()
+    return existing or save(documento.sha256, read(documento))
+
+
+def _lookup(documentos: Iterable[Documento]):
+    shas = {d.sha256 for d in documentos if supports(d)}
+    return TablePreview.objects.filter(sha256__in=shas, error="") if shas else TablePreview.objects.none()
+
+
+def _assign(documentos: Iterable[Documento], by_sha: dict[str, TablePreview]) -> None:
+    for d in documentos:
+        d.table_preview = by_sha.get(d.sha256) if supports(d) else None
+
+
+def attach(documentos: list[Documento]) -> None:
+    """
+    Sets `.table_preview` on each document (one query for the whole list).
+    """
+    _assign(documentos, {p.sha256: p for p in _lookup(documentos)})
+
+
+async def aattach(documentos: list[Documento]) -> None:
+    _assign(documentos, {p.sha256: p async for p in _lookup(documentos)})
@@ -0,0 +1,132 @@
+# catalogo/purge.py
+"""
+Surrogate keys for the HTTP cache / CDN in front of the site.
+
+Public catalog responses carry a `Surrogate-Key` header listing what they
+show; when the catalog changes (catalogo/signals.py) only those keys are
+purged:
+- "nav"          every HTML page (the navbar in base.html lists the areas)
+- "home"         the home page (latest publications)
+- "area-<id>"    area pages and the trabajo pages of that area
+- "trabajo-<id>" trabajo_detail / trabajo_documentos, home carousel entries
+
+Purges are sent after commit, batched (one request per SURROGATE_PURGE_DELAY
+window, up to SURROGATE_PURGE_BATCH keys each) from a background thread, as
+`POST SURROGATE_PURGE_URL` with the keys in a `Surrogate-Key` header. Without
+SURROGATE_PURGE_URL nothing is queued.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import urllib.request
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+
+from core.utils import observability
+
+logger = logging.getLogger(__name__)
+
+HEADER = "Surrogate-Key"
+NAV = "nav"
+HOME = "home"
+
+
+def area_key(pk) -> str:
+    return f"area-{pk}"
+
+
+def trabajo_key(pk) -> str:
+    return f"trabajo-{pk}"
+
+
+def tag_response(response, *keys: str):
+    """
+    Adds `keys` (plus "nav", every page has the navbar) to the response's
+    Surrogate-Key header.
+    """
+    current = response.get(HEADER, "").split()
+    for key in (NAV, *keys):
+        if key not in current:
+            current.append(key)
+    response[HEADER] = " ".join(current)
+    return response
+
+
+# ------------------------------------------------------------
+# Purging
+# ------------------------------------------------------------
+
+def send_purge(keys: Iterable[str]) -> bool:
+    """
+    One purge request per SURROGATE_PURGE_BATCH keys; False if any failed.
+    """
+    url = getattr(settings, "SURROGATE_PURGE_URL", "")
+    if not url:
+        return True
+    keys = sorted(set(keys))
+    batch = int(getattr(settings, "SURROGATE_PURGE_BATCH", 256))
+    token = getattr(settings, "SURROGATE_PURGE_TOKEN", "")
+    ok = True
+    for start in range(0, len(keys), batch):
+        chunk = keys[start : start + batch]
+        request = urllib.request.Request(url, method="POST", headers={HEADER: " ".join(chunk)})
+        if token:
+            request.add_header("Authorization", f"Bearer {token}")
+        try:
+            with urllib.request.urlopen(request, timeout=getattr(settings, "SURROGATE_PURGE_TIMEOUT", 5)):
+                pass
+        except OSError:
+            # The cache stays stale until s-maxage at worst
+            logger.exception("surrogate purge failed for %d keys", len(chunk))
+            observability.inc("portal_cache_purges_total", result="error")
+            ok = False
+        else:
+            observability.inc("portal_cache_purges_total", result="ok")
+            observability.inc("portal_cache_purged_keys_total", len(chunk))
+    return ok
+
+
+class PurgeQueue:
+    """
+    Collects keys and sends them from a timer thread once per window, so a
+    bulk admin action costs one purge request instead of one per row.
+    """
+
+    def __init__(self):
+        self._keys: set[str] = set()
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+
+    def add(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._keys.update(keys)
+            if self._timer is None:
+                self._timer = threading.Timer(getattr(settings, "SURROGATE_PURGE_DELAY", 0.5), self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> bool:
+        """
+        Sends whatever is pending now (also called by the timer).
+        """
+        with self._lock:
+            keys, self._keys = self._keys, set()
+            timer, self._timer = self._timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+        return send_purge(keys) if keys else True
+
+
+queue = PurgeQueue()
+
+
+def purge(*keys: str) -> None:
+    """
+    Queues `keys` once the current transaction commits (right away outside one).
+    """
+    if keys and getattr(settings, "SURROGATE_PURGE_URL", ""):
+        transaction.on_commit(lambda: queue.add(keys))
@@ -0,0 +1,131 @@
+# catalogo/signals.py
+from __future__ import annotations
+
+from django.db import models
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import purge
+from .models import Area, Documento, Highlight, Tombstone, Trabajo
+
+
+# ------------------------------------------------------------
+# Area publication counters
+# ------------------------------------------------------------
+# Counters are recomputed (not incremented) inside the writing transaction
+# (Trabajo.save() opens it; deletes run in the collector's), so they can't
+# drift from concurrent edits. Raw saves (loaddata) are skipped, and
+# QuerySet.update() sends no signals at all: after either, call
+# `Area.objects.filter(...).refresh_counters()` or run
+# `manage.py refresh_area_counters`.
+
+@receiver(pre_save, sender=Trabajo)
+def remember_previous_area(sender, instance: Trabajo, raw: bool, **kwargs) -> None:
+    instance._previous_area_id = None
+    instance._previous_key = None
+    if raw or instance.pk is None:
+        return
+    row = Trabajo.objects.filter(pk=instance.pk).values_list("area_id", "area__slug", "slug").first()
+    if row:
+        instance._previous_area_id = row[0]
+        instance._previous_key = f"{row[1]}/{row[2]}"
+
+
+@receiver(post_save, sender=Trabajo)
+def refresh_counters_on_save(sender, instance: Trabajo, raw: bool, **kwargs) -> None:
+    if raw:
+        return
+    area_ids = {instance.area_id, getattr(instance, "_previous_area_id", None)} - {None}
+    Area.objects.filter(pk__in=area_ids).refresh_counters()
+
+
+@receiver(post_delete, sender=Trabajo)
+def refresh_counters_on_delete(sender, instance: Trabajo, **kwargs) -> None:
+    Area.objects.filter(pk=instance.area_id).refresh_counters()
+
+
+# ------------------------------------------------------------
+# Delta sync bookkeeping (catalogo/sync.py)
+# ------------------------------------------------------------
+# Areas/Trabajos are synced by natural key, so deleting one (or changing its
+# key) leaves a Tombstone. Highlights/Documentos travel with their trabajo:
+# deleting one just marks the trabajo as changed.
+
+@receiver(post_save, sender=Trabajo)
+def tombstone_old_trabajo_key(sender, instance: Trabajo, raw: bool, **kwargs) -> None:
+    previous = getattr(instance, "_previous_key", None)
+    if raw or previous is None:
+        return
+    if previous != f"{instance.area.slug}/{instance.slug}":
+        Tombstone.objects.create(model="catalogo.trabajo", key=previous)
+
+
+@receiver(pre_save, sender=Area)
+def remember_previous_slug(sender, instance: Area, raw: bool, **kwargs) -> None:
+    instance._previous_slug = None
+    if not raw and instance.pk is not None:
+        instance._previous_slug = Area.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+
+
+@receiver(post_save, sender=Area)
+def tombstone_old_area_slug(sender, instance: Area, raw: bool, **kwargs) -> None:
+    previous = getattr(instance, "_previous_slug", None)
+    if raw or previous in (None, instance.slug):
+        return
+    Tombstone.objects.create(model="catalogo.area", key=previous)
+    # Their natural keys changed too: re-send them under the new slug.
+    instance.trabajos.update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Area)
+def tombstone_area(sender, instance: Area, **kwargs) -> None:
+    Tombstone.objects.create(model="catalogo.area", key=instance.slug)
+
+
+def _origin_model(origin):
+    # post_delete `origin`: the instance or queryset whose delete() started it
+    return type(origin) if isinstance(origin, models.Model) else getattr(origin, "model", None)
+
+
+@receiver(post_delete, sender=Trabajo)
+def tombstone_trabajo(sender, instance: Trabajo, origin=None, **kwargs) -> None:
+    if _origin_model(origin) is Area:
+        return  # cascaded from an Area delete, whose tombstone covers it
+    area_slug = Area.objects.filter(pk=instance.area_id).values_list("slug", flat=True).first()
+    Tombstone.objects.create(model="catalogo.trabajo", key=f"{area_slug}/{instance.slug}")
+
+
+@receiver(post_delete, sender=Highlight)
+@receiver(post_delete, sender=Documento)
+def touch_trabajo_on_child_delete(sender, instance, origin=None, **kwargs) -> None:
+    if _origin_model(origin) is sender:  # not when the trabajo itself is going away
+        Trabajo.objects.filter(pk=instance.trabajo_id).update(updated_at=timezone.now())
+
+
+# ------------------------------------------------------------
+# HTTP cache / CDN purges (catalogo/purge.py)
+# ------------------------------------------------------------
+# Keys are queued on commit and sent in batches from a background thread.
+
+@receiver(post_save, sender=Area)
+@receiver(post_delete, sender=Area)
+def purge_area(sender, instance: Area, **kwargs) -> None:
+    # The navbar lists every area: "nav" covers all HTML pages
+    purge.purge(purge.NAV, purge.area_key(instance.pk))
+
+
+@receiver(post_save, sender=Trabajo)
+@receiver(post_delete, sender=Trabajo)
+def purge_trabajo(sender, instance: Trabajo, **kwargs) -> None:
+    area_ids = {instance.area_id, getattr(instance, "_previous_area_id", None)} - {None}
+    purge.purge(purge.HOME, purge.trabajo_key(instance.pk), *map(purge.area_key, area_ids))
+
+
+@receiver(post_save, sender=Highlight)
+@receiver(post_delete, sender=Highlight)
+@receiver(post_save, sender=Documento)
+@receiver(post_delete, sender=Documento)
+def purge_trabajo_child(sender, instance, **kwargs) -> None:
+    purge.purge(purge.trabajo_key(instance.trabajo_id))
+
@@ -0,0 +1,60 @@
+# catalogo/sitemaps.py
+from __future__ import annotations
+
+from django.conf import settings
+from django.contrib.sitemaps import Sitemap
+from django.db.models import Max
+
+from .models import Area, Trabajo
+
+
+class CatalogSitemap(Sitemap):
+    """
+    One <url> per language with hreflang alternates; split into pages of
+    CATALOG_SITEMAP_LIMIT entries behind the sitemap index.
+    """
+
+    i18n = True
+    alternates = True
+    x_default = True
+
+    @property
+    def limit(self) -> int:
+        return getattr(settings, "CATALOG_SITEMAP_LIMIT", 1000)
+
+
+class AreaSitemap(CatalogSitemap):
+    changefreq = "weekly"
+
+    def items(self):
+        return Area.objects.order_by("order", "name").only("slug", "updated_at", "last_published_at")
+
+    def lastmod(self, area: Area):
+        return max(filter(None, (area.updated_at, area.last_published_at)))
+
+    def get_latest_lastmod(self):
+        return Area.objects.aggregate(m=Max("updated_at"))["m"]
+
+
+class TrabajoSitemap(CatalogSitemap):
+    changefreq = "monthly"
+
+    def items(self):
+        return (
+            Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED)
+            .select_related("area")
+            .only("slug", "updated_at", "area__slug")
+            .order_by("id")
+        )
+
+    def lastmod(self, trabajo: Trabajo):
+        return trabajo.updated_at
+
+    def get_latest_lastmod(self):
+        return Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED).aggregate(m=Max("updated_at"))["m"]
+
+
+SITEMAPS = {
+    "areas": AreaSitemap,
+    "trabajos": TrabajoSitemap,
+}
@@ -0,0 +1,194 @@
+# catalogo/sync.py
+"""
+Delta sync between environments (manage.py sync_export / sync_apply).
+
+A bundle is a directory:
+
+    changes.ndjson     meta line, catalogo.transfer records, then tombstones
+    files/<sha256>     contents of the document files it references
+
+sync_export selects rows with `updated_at >= since` (indexed on every model),
+plus the Tombstones written by catalogo/signals.py, so its cost follows the
+size of the change. A changed trabajo travels with all its highlights and
+documents (transfer semantics: the trabajo is authoritative for its children).
+
+sync_apply upserts through catalogo.transfer in one transaction, deletes the
+tombstoned keys and copies a document file only when the target storage does
+not already hold the same bytes (file copies are not rolled back with the
+transaction). Applying a bundle twice is a no-op.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional
+
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Area, Documento, Highlight, Tombstone, Trabajo
+from .transfer import (
+    AREA,
+    DOCUMENTO,
+    TRABAJO,
+    CatalogLoader,
+    Record,
+    iter_export,
+    iter_records,
+    write_ndjson,
+)
+
+META = "sync.meta"
+TOMBSTONE = "catalogo.tombstone"
+CHANGES_FILE = "changes.ndjson"
+FILES_DIR = "files"
+
+
+def file_sha256(f: IO[bytes], chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(chunk_size), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _document_storage():
+    return Documento._meta.get_field("file").storage
+
+
+def read_meta(bundle: Path) -> dict:
+    with open(Path(bundle, CHANGES_FILE), encoding="utf-8") as f:
+        record = json.loads(f.readline())
+    if record.get("model") != META:
+        raise ValueError(f"{bundle} is not a sync bundle")
+    return record["fields"]
+
+
+# ------------------------------------------------------------
+# Export
+# ------------------------------------------------------------
+
+def changed_trabajos(since: Optional[datetime]):
+    if since is None:
+        return Trabajo.objects.all()
+    return Trabajo.objects.filter(
+        Q(updated_at__gte=since)
+        | Exists(Highlight.objects.filter(trabajo=OuterRef("pk"), updated_at__gte=since))
+        | Exists(Documento.objects.filter(trabajo=OuterRef("pk"), updated_at__gte=since))
+    )
+
+
+def iter_changes(since: Optional[datetime]) -> Iterator[Record]:
+    areas = Area.objects.all() if since is None else Area.objects.filter(updated_at__gte=since)
+    trabajos = changed_trabajos(since)
+    trabajo_ids = trabajos.values("id")
+    yield from iter_export(
+        areas=areas,
+        trabajos=trabajos,
+        highlights=Highlight.objects.filter(trabajo__in=trabajo_ids),
+        documentos=Documento.objects.filter(trabajo__in=trabajo_ids),
+    )
+
+    if since is None:
+        return
+    for model, key in Tombstone.objects.filter(deleted_at__gte=since).values_list("model", "key").distinct():
+        # Skip keys that were re-created after the delete: the upsert above wins.
+        if model == AREA:
+            if Area.objects.filter(slug=key).exists():
+                continue
+        elif model == TRABAJO:
+            area_slug, _, slug = key.partition("/")
+            if Trabajo.objects.filter(area__slug=area_slug, slug=slug).exists():
+                continue
+        yield {"model": TOMBSTONE, "fields": {"target": model, "key": key}}
+
+
+def _attach_files(records: Iterable[Record], files_dir: Path) -> Iterator[Record]:
+    storage = _document_storage()
+    for record in records:
+        fields = record["fields"]
+        if record["model"] == DOCUMENTO and fields.get("file"):
+            with storage.open(fields["file"], "rb") as src:
+                fields["sha256"] = sha = file_sha256(src)
+                target = files_dir / sha
+                if not target.exists():
+                    src.seek(0)
+                    with open(target, "wb") as dst:
+                        shutil.copyfileobj(src, dst)
+        yield record
+
+
+def export_bundle(bundle: Path, since: Optional[datetime]) -> dict:
+    until = timezone.now()
+    files_dir = Path(bundle, FILES_DIR)
+    files_dir.mkdir(parents=True, exist_ok=True)
+    meta = {"since": since.isoformat() if since else None, "until": until.isoformat()}
+
+    with open(Path(bundle, CHANGES_FILE), "w", encoding="utf-8", newline="\n") as out:
+        write_ndjson([{"model": META, "fields": meta}], out)
+        meta["records"] = write_ndjson(_attach_files(iter_changes(since), files_dir), out)
+    return meta
+
+
+# ------------------------------------------------------------
+# Apply
+# ------------------------------------------------------------
+
+def _copy_file(fields: dict, files_dir: Path) -> bool:
+    """
+    Puts the bundled bytes at fields["file"] unless they are already there.
+    """
+    storage = _document_storage()
+    name, sha = fields["file"], fields["sha256"]
+    if storage.exists(name):
+        with storage.open(name, "rb") as current:
+            if file_sha256(current) == sha:
+                return False
+        storage.delete(name)
+    with open(files_dir / sha, "rb") as src:
+        fields["file"] = storage.save(name, File(src, name=name))
+    return True
+
+
+def _delete_tombstoned(tombstones: list[dict]) -> int:
+    deleted = 0
+    for fields in tombstones:
+        if fields["target"] == AREA:
+            qs = Area.objects.filter(slug=fields["key"])
+        else:
+            area_slug, _, slug = fields["key"].partition("/")
+            qs = Trabajo.objects.filter(area__slug=area_slug, slug=slug)
+        for obj in qs:  # instance deletes: signals keep counters/tombstones right
+            obj.delete()
+            deleted += 1
+    return deleted
+
+
+def apply_bundle(bundle: Path, batch_size: int = 1000) -> dict:
+    files_dir = Path(bundle, FILES_DIR)
+    tombstones: list[dict] = []
+    copied = 0
+
+    def stage(records: Iterable[Record]) -> Iterator[Record]:
+        nonlocal copied
+        for record in records:
+            model, fields = record.get("model"), record.get("fields", {})
+            if model == META:
+                continue
+            if model == TOMBSTONE:
+                tombstones.append(fields)
+                continue
+            if model == DOCUMENTO and fields.get("sha256"):
+                copied += _copy_file(fields, files_dir)
+            yield record
+
+    with open(Path(bundle, CHANGES_FILE), encoding="utf-8") as f, transaction.atomic():
+        stats = CatalogLoader(batch_size).load(stage(iter_records(f)))
+        deleted = _delete_tombstoned(tombstones)
+
+    return {**{k.split(".")[1]: v for k, v in stats.counts.items()}, "deleted": deleted, "files_copied": copied}
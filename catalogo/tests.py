@@ -1,3 +1,790 @@
-from django.test import TestCase
+import asyncio
+import html
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import threading
+import time
+import tempfile
+import urllib.request
+import zipfile
+import zlib
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from pypdf import PdfWriter
+
+from portal import cacheproxy
+
+from . import filemeta, linkcheck, previews, purge, textindex
+from .models import Area, AreaQuerySet, Documento, DocumentText, Highlight, LinkCheck, TablePreview, Tombstone, Trabajo
+from .pagination import KEYSET_ORDERING, Cursor
+from .sync import apply_bundle, export_bundle
+from .transfer import import_catalog, iter_export, iter_json_array, write_ndjson
+from .views import area_cards
+
+
+def make_trabajo(area, slug, **kwargs):
+    kwargs.setdefault("title", slug.replace("-", " ").title())
+    kwargs.setdefault("status", Trabajo.Status.PUBLISHED)
+    return Trabajo.objects.create(area=area, slug=slug, **kwargs)
+
+
+class CatalogApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.area = Area.objects.create(name="Economía", slug="economia")
+        now = timezone.now()
+        cls.trabajos = [
+            make_trabajo(cls.area, f"t-{i}", published_at=now - timedelta(days=i))
+            for i in range(5)
+        ]
+        make_trabajo(cls.area, "borrador", status=Trabajo.Status.DRAFT)
+        Highlight.objects.create(trabajo=cls.trabajos[0], label="N", value="1200")
+        Documento.objects.create(trabajo=cls.trabajos[0], title="Informe", url="https://example.org/r")
+
+    def test_cursor_pagination_walks_every_published_trabajo(self):
+        slugs = []
+        url = "/api/catalogo/trabajos/?limit=2&fields=slug"
+        while url:
+            data = self.client.get(url).json()
+            slugs += [t["slug"] for t in data["results"]]
+            url = data["next"]
+        self.assertEqual(slugs, [t.slug for t in self.trabajos])
+
+    def test_sparse_fields_and_includes(self):
+        data = self.client.get(
+            "/api/catalogo/trabajos/?limit=1&fields=title,url&include=highlights,documents"
+        ).json()
+        item = data["results"][0]
+        self.assertEqual(set(item), {"title", "url", "highlights", "documents"})
+        self.assertEqual(item["highlights"], [{"label": "N", "value": "1200", "order": 0}])
+        self.assertEqual(item["documents"][0]["title"], "Informe")
+
+    def test_unknown_field_and_bad_cursor_are_rejected(self):
+        self.assertEqual(self.client.get("/api/catalogo/trabajos/?fields=nope").status_code, 400)
+        self.assertEqual(self.client.get("/api/catalogo/trabajos/?cursor=nope").status_code, 400)
+
+    def test_etag_roundtrip(self):
+        response = self.client.get("/api/catalogo/areas/")
+        self.assertEqual(response.status_code, 200)
+        again = self.client.get("/api/catalogo/areas/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_documents_of_draft_trabajo_are_not_exposed(self):
+        response = self.client.get("/api/catalogo/trabajos/economia/borrador/documentos/")
+        self.assertEqual(response.status_code, 404)
+
+
+class IndexUsageTests(TestCase):
+    """
+    EXPLAIN-based checks that the hot public queries hit the composite indexes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.area = Area.objects.create(name="Economía", slug="economia")
+        trabajo = make_trabajo(cls.area, "t-1")
+        Documento.objects.create(trabajo=trabajo, title="Doc", url="https://example.org/d")
+        cls.trabajo = trabajo
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # Tiny test tables would otherwise always be scanned sequentially.
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+        elif connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN assertions are written for SQLite and Postgres.")
+
+    def assertUsesIndex(self, qs, index_name):
+        self.assertIn(index_name, qs.explain())
+
+    def test_area_detail_listing(self):
+        qs = self.area.trabajos.filter(status=Trabajo.Status.PUBLISHED).order_by("-published_at", "-created_at")
+        self.assertUsesIndex(qs, "ix_trabajo_area_published")
+
+    def test_area_grid_keyset_page(self):
+        cursor = Cursor.from_row(self.trabajo)
+        qs = area_cards(self.area).order_by(*KEYSET_ORDERING).filter(cursor.as_filter())[:25]
+        self.assertUsesIndex(qs, "ix_trabajo_area_published")
+
+    def test_home_latest_listing(self):
+        qs = Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED).order_by("-published_at", "-created_at", "-id")[:3]
+        self.assertUsesIndex(qs, "ix_trabajo_published")
+
+    def test_documents_by_type(self):
+        qs = self.trabajo.documentos.filter(doc_type=Documento.DocType.DATA).order_by("order", "id")
+        self.assertUsesIndex(qs, "ix_documento_trabajo_type")
+
+
+class AreaCounterTests(TestCase):
+    def setUp(self):
+        self.eco = Area.objects.create(name="Economía", slug="economia")
+        self.psi = Area.objects.create(name="Psicometría", slug="psicometria")
+
+    def test_counters_follow_publish_move_and_delete(self):
+        t = make_trabajo(self.eco, "t-1")
+        make_trabajo(self.eco, "draft", status=Trabajo.Status.DRAFT)
+        self.eco.refresh_from_db()
+        self.assertEqual(self.eco.published_count, 1)
+        self.assertEqual(self.eco.last_published_at, t.published_at)
+
+        t.area = self.psi
+        t.save()
+        self.eco.refresh_from_db()
+        self.psi.refresh_from_db()
+        self.assertEqual((self.eco.published_count, self.eco.last_published_at), (0, None))
+        self.assertEqual(self.psi.published_count, 1)
+
+        t.delete()
+        self.psi.refresh_from_db()
+        self.assertEqual(self.psi.published_count, 0)
+
+    def test_refresh_command_repairs_drift(self):
+        make_trabajo(self.eco, "t-1")
+        Area.objects.update(published_count=99)
+        call_command("refresh_area_counters", stdout=StringIO())
+        self.eco.refresh_from_db()
+        self.assertEqual(self.eco.published_count, 1)
+
+    def test_published_rows_always_have_published_at(self):
+        # Keyset pages skip NULL published_at; published rows can't have one
+        t = make_trabajo(self.eco, "draft", status=Trabajo.Status.DRAFT)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Trabajo.objects.filter(pk=t.pk).update(status=Trabajo.Status.PUBLISHED)
+        self.assertEqual(Trabajo.objects.get(pk=t.pk).status, Trabajo.Status.DRAFT)
+
+    def test_counter_failure_rolls_back_the_save(self):
+        with mock.patch.object(AreaQuerySet, "refresh_counters", side_effect=RuntimeError), self.assertRaises(RuntimeError):
+            make_trabajo(self.eco, "t-1")
+        self.assertFalse(Trabajo.objects.filter(slug="t-1").exists())
+
+    @override_settings(
+        STORAGES={**settings.STORAGES, "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}},
+    )
+    def test_area_list_shows_counters(self):
+        make_trabajo(self.eco, "t-1")
+        response = self.client.get("/es/areas/")
+        self.assertContains(response, "(1 · ")
+
+
+@override_settings(
+    CATALOG_PAGE_SIZE=3,
+    STORAGES={**settings.STORAGES, "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}},
+)
+class AreaGridTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.area = Area.objects.create(name="Economía", slug="economia")
+        now = timezone.now()
+        for i in range(7):
+            # Pairs share published_at: the cursor must break ties
+            make_trabajo(cls.area, f"t-{i}", published_at=now - timedelta(days=i // 2), description="x" * 5000)
+        make_trabajo(cls.area, "borrador", status=Trabajo.Status.DRAFT)
+        make_trabajo(cls.area, "con-miniatura", published_at=now - timedelta(days=30),
+                     image_url="https://example.org/full.png", thumbnail_url="https://example.org/thumb.png")
+
+    def slugs(self, response):
+        return re.findall(r'href="/es/economia/([\w-]+)/"', response.content.decode())
+
+    def test_first_page_then_fragments_walk_the_area(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/es/areas/economia/")
+        listing = [q["sql"] for q in queries if 'FROM "catalogo_trabajo"' in q["sql"]]
+        self.assertEqual(len(listing), 1)
+        self.assertNotIn('"description"', listing[0])
+        self.assertNotIn('"highlights"', listing[0])
+
+        slugs = self.slugs(response)
+        self.assertEqual(len(slugs), 3)
+        next_url = re.search(r'data-fragment="([^"]+)"', response.content.decode()).group(1)
+        while next_url:
+            response = self.client.get(html.unescape(next_url))
+            self.assertEqual(response.status_code, 200)
+            self.assertNotContains(response, "<html")
+            slugs += self.slugs(response)
+            match = re.search(r'data-fragment="([^"]+)"', response.content.decode())
+            next_url = match and match.group(1)
+
+        expected = Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED).order_by("-published_at", "-created_at", "-id")
+        self.assertEqual(slugs, [t.slug for t in expected])
+        self.assertContains(response, 'src="https://example.org/thumb.png"')
+        self.assertContains(response, 'loading="lazy"')
+
+    def test_bad_cursor_is_not_found(self):
+        self.assertEqual(self.client.get("/es/areas/economia/trabajos/?cursor=nope").status_code, 404)
+        self.assertEqual(self.client.get("/es/areas/economia/?cursor=nope").status_code, 404)
+
+
+class SitemapFeedTests(TestCase):
+    def setUp(self):
+        self.area = Area.objects.create(name="Economía", slug="economia")
+        make_trabajo(self.area, "deuda")
+
+    def test_sitemap_is_cached_until_the_catalog_changes(self):
+        first = self.client.get("/sitemap-trabajos.xml")
+        self.assertContains(first, "/economia/deuda/")
+        self.assertContains(first, 'hreflang="en"')
+        self.assertEqual(
+            self.client.get("/sitemap-trabajos.xml", HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304
+        )
+
+        make_trabajo(self.area, "empleo")
+        second = self.client.get("/sitemap-trabajos.xml")
+        self.assertNotEqual(first["ETag"], second["ETag"])
+        self.assertContains(second, "/economia/empleo/")
+
+    def test_sitemap_index_and_atom_feed(self):
+        self.assertContains(self.client.get("/sitemap.xml"), "sitemap-trabajos.xml")
+        feed = self.client.get("/feed.atom")
+        self.assertContains(feed, "<feed")
+        self.assertContains(feed, "/economia/deuda/")
+
+
+class CatalogTransferTests(TestCase):
+    FIXTURE = settings.BASE_DIR / "catalogo_fixture_ready.json"
+
+    def import_fixture(self, **kwargs):
+        with open(self.FIXTURE, encoding="utf-8") as f:
+            return import_catalog(f, **kwargs)
+
+    def test_legacy_fixture_import_is_repaired_and_idempotent(self):
+        self.import_fixture()
+        self.import_fixture(batch_size=2)
+        self.assertEqual((Area.objects.count(), Trabajo.objects.count(), Documento.objects.count()), (3, 6, 12))
+        trabajo = Trabajo.objects.get(slug="monitoreo-pobreza-y-condiciones-laborales")
+        self.assertEqual(trabajo.tagline, "Brechas persistentes en pobreza y empleo (2016–2021)")
+        self.assertIn("económicos", trabajo.summary)
+        self.assertEqual(sum(Area.objects.values_list("published_count", flat=True)), 6)
+
+    def test_ndjson_roundtrip(self):
+        self.import_fixture()
+        trabajo = Trabajo.objects.first()
+        Highlight.objects.create(trabajo=trabajo, label="N", value="1200")
+        out = StringIO()
+        write_ndjson(iter_export(), out)
+
+        Area.objects.all().delete()
+        out.seek(0)
+        stats = import_catalog(out)
+        self.assertEqual(stats.counts["catalogo.highlight"], 1)
+        self.assertEqual(Trabajo.objects.get(slug=trabajo.slug).highlight_items.get().value, "1200")
+        self.assertEqual(Documento.objects.count(), 12)
+
+    def test_reimport_keeps_child_primary_keys(self):
+        self.import_fixture()
+        trabajo = Trabajo.objects.filter(documentos__isnull=False).first()
+        removed = trabajo.documentos.first()
+        out = StringIO()
+        write_ndjson(iter_export(documentos=Documento.objects.exclude(pk=removed.pk)), out)
+        before = set(Documento.objects.exclude(pk=removed.pk).values_list("pk", "title"))
+
+        out.seek(0)
+        import_catalog(out, batch_size=2)  # children of one trabajo span batches
+        self.assertEqual(set(Documento.objects.values_list("pk", "title")), before)
+
+    def test_reimport_leaves_fields_missing_from_records_alone(self):
+        self.import_fixture()
+        trabajo = Trabajo.objects.get(slug="monitoreo-pobreza-y-condiciones-laborales")
+        Trabajo.objects.filter(pk=trabajo.pk).update(is_featured=True, order=7)
+        records = [
+            {"model": "catalogo.trabajo", "fields": {
+                "area": trabajo.area.slug, "slug": trabajo.slug, "title": "Nuevo título", "status": "published",
+            }},
+        ]
+        import_catalog(StringIO(json.dumps(records)))
+        again = Trabajo.objects.get(pk=trabajo.pk)
+        self.assertEqual((again.title, again.is_featured, again.order), ("Nuevo título", True, 7))
+        self.assertEqual((again.published_at, again.tagline), (trabajo.published_at, trabajo.tagline))
+
+    def test_reimport_without_metadata_keeps_stored_file_metadata(self):
+        stats = self.import_fixture()
+        self.assertEqual(stats.undescribed, Documento.objects.exclude(file="").count())
+        Documento.objects.update(mime_type="application/pdf", size=123, sha256="a" * 64)
+        stats = self.import_fixture()  # legacy records carry no metadata fields
+        self.assertEqual(stats.undescribed, 0)
+        self.assertFalse(Documento.objects.exclude(sha256="a" * 64).exists())
+        self.assertEqual(set(Documento.objects.values_list("mime_type", "size")), {("application/pdf", 123)})
+
+    def test_json_array_reader_handles_small_chunks(self):
+        items = list(iter_json_array(StringIO(' [ {"a": "x,]"} , {"b": [1, 2]} ] '), chunk_size=3))
+        self.assertEqual(items, [{"a": "x,]"}, {"b": [1, 2]}])
+
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.bundle = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.bundle, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.area = Area.objects.create(name="Economía", slug="economia")
+        self.kept = make_trabajo(self.area, "kept")
+        self.gone = make_trabajo(self.area, "gone")
+        self.untouched = make_trabajo(self.area, "untouched")
+        self.doc = Documento.objects.create(trabajo=self.kept, title="Datos")
+        self.doc.file.save("datos.csv", ContentFile(b"a,b\n1,2\n"))
+        self.since = timezone.now()
+
+    def test_export_contains_only_the_delta(self):
+        Trabajo.objects.filter(pk=self.kept.pk).update(title="Edited", updated_at=timezone.now())
+        self.gone.delete()
+        meta = export_bundle(self.bundle, self.since)
+
+        lines = (self.bundle / "changes.ndjson").read_text(encoding="utf-8").splitlines()
+        models = [json.loads(line)["model"] for line in lines[1:]]
+        self.assertEqual(models, ["catalogo.trabajo", "catalogo.documento", "catalogo.tombstone"])
+        self.assertEqual(meta["records"], 3)
+        self.assertTrue(Tombstone.objects.filter(key="economia/gone").exists())
+
+    def test_child_delete_marks_trabajo_changed(self):
+        highlight = Highlight.objects.create(trabajo=self.untouched, label="N")
+        self.since = timezone.now()
+        highlight.delete()
+        export_bundle(self.bundle, self.since)
+        self.assertIn('"slug":"untouched"', (self.bundle / "changes.ndjson").read_text(encoding="utf-8"))
+
+    def test_apply_is_idempotent_and_copies_changed_files_only(self):
+        self.kept.title = "Edited"
+        self.kept.save()
+        self.gone.delete()
+        export_bundle(self.bundle, self.since)
+
+        # Simulate a target that is behind: stale title, deleted row still there, other bytes.
+        Trabajo.objects.filter(pk=self.kept.pk).update(title="Stale")
+        make_trabajo(self.area, "gone")
+        storage = self.doc.file.storage
+        storage.delete(self.doc.file.name)
+        storage.save(self.doc.file.name, ContentFile(b"old"))
+
+        stats = apply_bundle(self.bundle)
+        self.assertEqual((stats["deleted"], stats["files_copied"]), (1, 1))
+        self.assertEqual(Trabajo.objects.get(slug="kept").title, "Edited")
+        self.assertFalse(Trabajo.objects.filter(slug="gone").exists())
+        with storage.open(Documento.objects.get().file.name) as f:
+            self.assertEqual(f.read(), b"a,b\n1,2\n")
+
+        stats = apply_bundle(self.bundle)
+        self.assertEqual((stats["deleted"], stats["files_copied"]), (0, 0))
+        self.assertEqual(Documento.objects.count(), 1)
+
+
+@override_settings(
+    STORAGES={**settings.STORAGES, "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}},
+)
+class SurrogatePurgeTests(LiveServerTestCase):
+    def setUp(self):
+        self.proxy = cacheproxy.serve(self.live_server_url)
+        self.addCleanup(self.proxy.server_close)
+        self.addCleanup(self.proxy.shutdown)
+        self.economia = Area.objects.create(name="Economía", slug="economia")
+        self.salud = Area.objects.create(name="Salud", slug="salud")
+        self.trabajo = make_trabajo(self.economia, "deuda", title="Deuda")
+        make_trabajo(self.salud, "camas", title="Camas")
+
+    def get(self, path):
+        with urllib.request.urlopen(self.proxy.url + path) as response:
+            return response.headers["X-Cache"], response.read().decode()
+
+    def test_hit_purge_miss(self):
+        deuda, camas = "/es/economia/deuda/", "/es/areas/salud/"
+        self.assertEqual(self.get(deuda)[0], "MISS")
+        self.assertEqual(self.get(camas)[0], "MISS")
+        self.assertEqual(self.get(deuda)[0], "HIT")
+
+        with self.settings(SURROGATE_PURGE_URL=self.proxy.url + "/.purge"):
+            self.trabajo.title = "Deuda pública"
+            self.trabajo.save()
+            self.assertTrue(purge.queue.flush())  # don't wait for the batch timer
+
+        cache, body = self.get(deuda)
+        self.assertEqual(cache, "MISS")
+        self.assertIn("Deuda pública", body)
+        self.assertEqual(self.get(camas)[0], "HIT")  # other area untouched
+
+    def test_surrogate_keys_on_catalog_pages(self):
+        response = self.client.get("/es/economia/deuda/")
+        self.assertEqual(
+            set(response["Surrogate-Key"].split()),
+            {"nav", f"area-{self.economia.pk}", f"trabajo-{self.trabajo.pk}"},
+        )
+
+
+class DocumentDownloadTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media, DOCUMENT_SENDFILE="")
+        override.enable()
+        self.addCleanup(override.disable)
+
+        trabajo = make_trabajo(Area.objects.create(name="Economía", slug="economia"), "t")
+        self.doc = Documento.objects.create(trabajo=trabajo, title="Datos")
+        self.doc.file.save("datos.csv", ContentFile(b"0123456789"))
+        self.url = self.doc.file_url
+
+    def test_full_download_with_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_ranges(self):
+        cases = {"bytes=2-4": b"234", "bytes=7-": b"789", "bytes=-3": b"789", "bytes=8-100": b"89"}
+        for header, body in cases.items():
+            response = self.client.get(self.url, HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 206, header)
+            self.assertEqual(b"".join(response.streaming_content), body)
+            self.assertEqual(int(response["Content-Length"]), len(body))
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=10-")["Content-Range"], "bytes */10")
+        stale = self.client.get(self.url, HTTP_RANGE="bytes=2-4", HTTP_IF_RANGE='"old"')
+        self.assertEqual(stale.status_code, 200)
+
+    def test_accel_redirect_hands_off_to_the_proxy(self):
+        with override_settings(DOCUMENT_SENDFILE="x-accel-redirect", DOCUMENT_ACCEL_PREFIX="/_protected/"):
+            response = self.client.get(self.url, HTTP_RANGE="bytes=2-4")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/_protected/" + self.doc.file.name)
+        self.assertEqual(response.content, b"")
+
+
+    def test_draft_documents_are_for_staff_only(self):
+        Trabajo.objects.filter(pk=self.doc.trabajo_id).update(status=Trabajo.Status.DRAFT)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        staff = get_user_model().objects.create_user("editor", password="x", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertNotIn("public", response["Cache-Control"])
+
+def make_pdf(pages: int) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    out = BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+class DocumentMetadataTests(TestCase):
+    PDF = make_pdf(2)
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.trabajo = make_trabajo(Area.objects.create(name="Economía", slug="economia"), "t")
+
+    def test_upload_stores_metadata_once(self):
+        doc = Documento.objects.create(trabajo=self.trabajo, title="Informe")
+        doc.file.save("informe.pdf", ContentFile(self.PDF))
+        doc = Documento.objects.get(pk=doc.pk)
+        self.assertEqual((doc.mime_type, doc.extension, doc.size), ("application/pdf", "pdf", len(self.PDF)))
+        self.assertEqual(doc.page_count, 2)
+        self.assertEqual(len(doc.sha256), 64)
+
+        with mock.patch.object(filemeta, "extract") as extract:
+            doc.title = "Informe final"
+            doc.save()
+        extract.assert_not_called()
+
+    def test_unreadable_pdf_has_no_page_count(self):
+        meta = filemeta.extract("roto.pdf", BytesIO(b"%PDF-1.4\n2 0 obj << /Type /Page >>\n%%EOF"))
+        self.assertEqual((meta["extension"], meta["page_count"]), ("pdf", None))
+
+    def test_backfill_command(self):
+        doc = Documento.objects.create(trabajo=self.trabajo, title="Datos")
+        doc.file.save("datos.csv", ContentFile(b"a,b\n1,2\n"))
+        other = Documento.objects.create(trabajo=self.trabajo, title="Informe")
+        other.file.save("informe.pdf", ContentFile(self.PDF))
+        Documento.objects.update(sha256="", size=None, mime_type="", extension="", page_count=None)
+        out = StringIO()
+        call_command("backfill_document_metadata", "--workers", "2", "--batch-size", "1", stdout=out)
+        doc.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((doc.extension, doc.size, doc.page_count), ("csv", 8, None))
+        self.assertEqual((other.extension, other.page_count), ("pdf", 2))
+        self.assertIn("described 2 document(s)", out.getvalue())
+
+        response = self.client.get("/api/catalogo/trabajos/economia/t/documentos/?fields=extension,size,pages")
+        self.assertEqual(response.json()["results"][0], {"extension": "csv", "size": 8, "pages": None})
+
+
+def make_xlsx(rows) -> bytes:
+    ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    cells = "".join(
+        f'<row r="{i + 1}">'
+        + "".join(
+            f'<c r="{chr(65 + j)}{i + 1}" t="inlineStr"><is><t>{v}</t></is></c>' if isinstance(v, str)
+            else f'<c r="{chr(65 + j)}{i + 1}"><v>{v}</v></c>'
+            for j, v in enumerate(row)
+        )
+        + "</row>"
+        for i, row in enumerate(rows)
+    )
+    out = BytesIO()
+    with zipfile.ZipFile(out, "w") as z:
+        z.writestr("xl/worksheets/sheet1.xml", f'<worksheet xmlns="{ns}"><sheetData>{cells}</sheetData></worksheet>')
+    return out.getvalue()
+
+
+class TablePreviewTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        plain_static = {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}
+        override = override_settings(MEDIA_ROOT=media, STORAGES={**settings.STORAGES, "staticfiles": plain_static})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.trabajo = make_trabajo(Area.objects.create(name="Economía", slug="economia"), "t")
+
+    def upload(self, name, content):
+        doc = Documento.objects.create(trabajo=self.trabajo, title=name, doc_type=Documento.DocType.DATA)
+        with self.captureOnCommitCallbacks(execute=True):
+            doc.file.save(name, ContentFile(content))
+        return doc
+
+    def test_csv_statistics_are_merged_across_chunks(self):
+        values = [i * 0.5 for i in range(1, 101)]
+        body = "region;valor;nota\n" + "".join(
+            f"R{i};{str(v).replace('.', ',')};{'' if i % 10 else 'x'}\n" for i, v in enumerate(values)
+        ) + "R;NA;\n"
+        with mock.patch.object(previews, "CHUNK_ROWS", 7):
+            data = previews.build("csv", BytesIO(body.encode("utf-8")))
+        region, valor, nota = data["columns"]
+        self.assertEqual(data["row_count"], 101)
+        self.assertEqual(data["rows"][0], ["R0", "0,5", "x"])
+        self.assertEqual((region["type"], valor["type"], valor["count"], valor["missing"]), ("text", "number", 100, 1))
+        self.assertAlmostEqual(valor["mean"], statistics.mean(values))
+        self.assertAlmostEqual(valor["std"], statistics.stdev(values), places=5)
+        self.assertEqual((valor["min"], valor["p50"], valor["max"]), (0.5, 25.25, 50.0))
+        self.assertEqual((nota["count"], nota["missing"]), (10, 91))
+
+    def test_command_builds_preview_once_per_content_and_page_shows_it(self):
+        xlsx = make_xlsx([["Año", "Total"], [2020, 10], [2021, 30]])
+        with mock.patch.object(previews, "read") as read:
+            self.upload("serie.xlsx", xlsx)
+        read.assert_not_called()  # never parsed inside the upload request
+        call_command("build_previews", "--workers", "1", stdout=StringIO())
+        preview = TablePreview.objects.get()
+        self.assertEqual(preview.row_count, 2)
+        self.assertEqual(preview.columns[1]["mean"], 20.0)
+
+        self.upload("copia.xlsx", xlsx)
+        with mock.patch.object(previews, "read") as read:
+            call_command("build_previews", stdout=StringIO())
+        read.assert_not_called()
+        self.assertEqual(TablePreview.objects.count(), 1)
+
+        response = self.client.get(self.trabajo.get_absolute_url())
+        self.assertContains(response, "Vista previa · 2 filas · 2 columnas")
+        self.assertContains(response, "<td>2021</td>", count=2)
+
+    def test_shared_string_table_is_bounded(self):
+        ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+        out = BytesIO()
+        with zipfile.ZipFile(out, "w") as z:
+            z.writestr("xl/sharedStrings.xml", f'<sst xmlns="{ns}">' + "<si><t>Lima</t></si><si><t>Cusco</t></si></sst>")
+            z.writestr(
+                "xl/worksheets/sheet1.xml",
+                f'<worksheet xmlns="{ns}"><sheetData><row><c t="s"><v>0</v></c></row>'
+                '<row><c t="s"><v>1</v></c></row></sheetData></worksheet>',
+            )
+        self.assertEqual(previews.build("xlsx", BytesIO(out.getvalue()))["rows"], [["Cusco"]])
+        with mock.patch.object(previews, "MAX_SHARED_CHARS", 8):
+            with self.assertRaisesMessage(ValueError, "shared string table too large"):
+                previews.build("xlsx", BytesIO(out.getvalue()))
+
+    def test_malformed_file_is_recorded_as_an_error(self):
+        doc = self.upload("roto.xlsx", make_xlsx([["a"], [1]]))
+        with mock.patch.object(previews, "build", side_effect=AttributeError("'NoneType' object has no attribute 'group'")):
+            call_command("build_previews", stdout=StringIO(), stderr=StringIO())
+        self.assertTrue(TablePreview.objects.get(sha256=doc.sha256).error.startswith("AttributeError"))
+
+
+EXTRACT_FILE = textindex.extract_file
+
+
+def extract_or_crash(path, extension, timeout):
+    # Stands in for a worker killed by a segfault or the OOM killer
+    if "crash" in path:
+        os._exit(1)
+    time.sleep(0.1)  # still running when the other worker dies
+    return EXTRACT_FILE(path, extension, timeout)
+
+
+class DocumentTextTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.trabajo = make_trabajo(Area.objects.create(name="Economía", slug="economia"), "t", title="Informe")
+
+    def test_extractors(self):
+        stream = zlib.compress(b"BT /F1 12 Tf (Encuesta de) Tj ( hogares) Tj T* [(Ingreso) -250 (s)] TJ ET")
+        pdf = b"%%PDF-1.4\n4 0 obj << /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream)
+        with mock.patch.dict(sys.modules, {"pypdf": None}):  # the fallback used without pypdf
+            self.assertEqual(list(textindex.iter_pdf_text(BytesIO(pdf))), ["Encuesta de hogares", "Ingresos"])
+        self.assertEqual(list(textindex.iter_pdf_text(BytesIO(make_pdf(2)))), ["", ""])
+
+        html = b"<html><head><script>var x = 'oculto';</script></head><body><h1>Mapa</h1><p>Pobreza&nbsp;rural</p></body>"
+        text, truncated = textindex.normalize(textindex.iter_html_text(BytesIO(html), chunk_size=7))
+        self.assertEqual((text, truncated), ("Mapa\nPobreza rural", False))
+
+        self.assertEqual(textindex.normalize(["uno\nUno\n dos  tres ", "cuatro"], max_chars=13), ("uno\ndos tres", True))
+
+    def test_command_extracts_once_per_content_and_feeds_search(self):
+        for name in ("visor.html", "copia.html"):
+            doc = Documento.objects.create(trabajo=self.trabajo, title=name, doc_type=Documento.DocType.OTHER)
+            doc.file.save(name, ContentFile(b"<p>Desnutricion cronica infantil</p>"))
+
+        out = StringIO()
+        call_command("extract_document_text", "--workers", "1", stdout=out)
+        self.assertIn("extracted 1 document(s), 0 failed", out.getvalue())
+        self.assertEqual(DocumentText.objects.get().text, "Desnutricion cronica infantil")
+        call_command("extract_document_text", stdout=out)
+        self.assertIn("extracted 0 document(s)", out.getvalue())
+
+        found = self.client.get("/api/catalogo/trabajos/?q=cronica&fields=slug").json()["results"]
+        self.assertEqual(found, [{"slug": "t"}])
+        self.assertEqual(self.client.get("/api/catalogo/trabajos/?q=vivienda").json()["results"], [])
+
+    def test_crashed_worker_fails_only_its_own_file(self):
+        for name in ("uno.html", "crash.html", "dos.html", "tres.html"):
+            doc = Documento.objects.create(trabajo=self.trabajo, title=name, doc_type=Documento.DocType.OTHER)
+            doc.file.save(name, ContentFile(f"<p>{name}</p>".encode()))
+
+        out = StringIO()
+        with mock.patch.object(textindex, "extract_file", extract_or_crash):
+            call_command("extract_document_text", "--workers", "2", "--memory-mb", "0", stdout=out, stderr=StringIO())
+        self.assertIn("extracted 3 document(s), 1 failed", out.getvalue())
+        errors = dict(DocumentText.objects.values_list("text", "error"))
+        self.assertEqual(errors, {"uno.html": "", "dos.html": "", "tres.html": "", "": "worker crashed"})
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # Local stand-in for the external sites checked by check_links
+    protocol_version = "HTTP/1.1"
+    peers: set = set()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.peers.add(self.client_address)
+        if self.path == "/nohead":
+            return self.reply(405)
+        self.do_GET()
+
+    def do_GET(self):
+        self.peers.add(self.client_address)
+        if self.path == "/slow":
+            time.sleep(1)
+        if self.path == "/busy":
+            time.sleep(0.3)
+        if self.path == "/moved":
+            return self.reply(301, location="/ok")
+        if self.path == "/signed":
+            return self.reply(302, location="/ok?signature=" + "x" * 600)
+        self.reply(404 if self.path == "/missing" else 200)
+
+    def reply(self, status, location=None):
+        body = b"" if self.command == "HEAD" else b"hola"
+        self.send_response(status)
+        if location:
+            self.send_header("Location", location)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients that time out (/slow) close the connection early
+
+
+class LinkCheckTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = QuietServer(("127.0.0.1", 0), StandInHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_client_reuses_connections_per_host(self):
+        StandInHandler.peers = set()
+
+        async def run():
+            client = linkcheck.Client(per_host=1, timeout=2)
+            try:
+                return [await client.check(f"{self.base}/ok") for _ in range(3)], client.connections_opened
+            finally:
+                await client.aclose()
+
+        results, opened = asyncio.run(run())
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual((opened, len(StandInHandler.peers)), (1, 1))
+
+    def test_waiting_for_a_host_slot_is_not_timed(self):
+        async def run():
+            client = linkcheck.Client(per_host=1, timeout=0.6)
+            try:
+                return await asyncio.gather(*(client.check(f"{self.base}/busy") for _ in range(3)))
+            finally:
+                await client.aclose()
+
+        results = asyncio.run(run())  # served one after another: ~0.9 s in all
+        self.assertTrue(all(r.ok for r in results), [r.error for r in results])
+        self.assertTrue(all(r.latency_ms < 600 for r in results))
+
+    def test_command_stores_status_latency_and_failures(self):
+        trabajo = make_trabajo(Area.objects.create(name="Economía", slug="economia"), "t", app_url=f"{self.base}/moved")
+        for path in ("ok", "nohead", "missing", "slow", "signed"):
+            Documento.objects.create(trabajo=trabajo, title=path, url=f"{self.base}/{path}")
+        LinkCheck.objects.create(url="https://example.invalid/gone", checked_at=timezone.now())
+
+        for _ in range(2):
+            call_command("check_links", "--timeout", "0.5", stdout=StringIO(), stderr=StringIO())
+
+        checks = {c.url.rsplit("/", 1)[-1]: c for c in LinkCheck.objects.all()}
+        self.assertEqual(sorted(checks), ["missing", "moved", "nohead", "ok", "signed", "slow"])
+        self.assertTrue(checks["ok"].ok and checks["nohead"].ok)
+        self.assertEqual((checks["moved"].ok, checks["moved"].final_url), (True, f"{self.base}/ok"))
+        self.assertEqual((checks["missing"].status, checks["missing"].failures), (404, 2))
+        self.assertEqual(len(checks["signed"].final_url), 500)
+        self.assertIn("timeout", checks["slow"].error)
+        self.assertIsNotNone(checks["ok"].latency_ms)
@@ -0,0 +1,266 @@
+# catalogo/textindex.py
+"""
+Searchable text of Documento files (PDF, XLSX/CSV, HTML viewers).
+
+- extraction runs in a process pool (`manage.py extract_document_text`), each
+  worker under an address-space limit (RLIMIT_AS) and each file under a
+  wall-clock limit (SIGALRM), so one hostile or huge file can't take the
+  worker host down with it
+- the text is normalized (whitespace collapsed, repeated lines dropped, at
+  most MAX_CHARS) and stored once per file content in DocumentText, keyed by
+  Documento.sha256: a file is extracted again only when its bytes change
+- `search_filter(q)` matches trabajos by their fields, document titles and
+  document text, with no file access at query time
+
+PDF text comes from pypdf when installed; the fallback reads the text
+operators of (Flate-compressed) content streams, enough for generated reports.
+"""
+
+from __future__ import annotations
+
+import codecs
+import os
+import re
+import resource
+import signal
+import zlib
+from html.parser import HTMLParser
+from typing import IO, Iterable, Iterator
+
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Documento, DocumentText
+
+FORMATS = ("pdf", "xlsx", "csv", "tsv", "html", "htm")
+MAX_CHARS = 200_000
+
+
+def supports(documento: Documento) -> bool:
+    return bool(documento.file and documento.sha256 and documento.extension in FORMATS)
+
+
+# ------------------------------------------------------------
+# Extractors: text fragments of a file
+# ------------------------------------------------------------
+
+_PDF_STREAM = re.compile(rb"<<(.*?)>>\s*stream\r?\n(.*?)\r?\nendstream", re.S)
+_PDF_TEXT = re.compile(rb"\((?:\\.|[^\\)])*\)\s*'|\((?:\\.|[^\\)])*\)\s*Tj|\[(?:\\.|[^\]])*\]\s*TJ|T\*|\bET\b")
+_PDF_STRING = re.compile(rb"\(((?:\\.|[^\\)])*)\)")
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"", b"f": b"", b"(": b"(", b")": b")", b"\\": b"\\"}
+
+
+def _pdf_string(raw: bytes) -> str:
+    out = re.sub(
+        rb"\\([0-7]{1,3}|.)",
+        lambda m: bytes([int(m.group(1), 8) & 0xFF]) if m.group(1)[:1].isdigit() else _PDF_ESCAPES.get(m.group(1), b""),
+        raw,
+        flags=re.S,
+    )
+    return out.decode("latin-1")
+
+
+def iter_pdf_text(f: IO[bytes]) -> Iterator[str]:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        PdfReader = None
+    if PdfReader is not None:
+        for page in PdfReader(f).pages:
+            yield page.extract_text() or ""
+        return
+
+    for params, data in _PDF_STREAM.findall(f.read()):
+        if b"/FlateDecode" in params:
+            try:
+                data = zlib.decompress(data)
+            except zlib.error:
+                continue
+        elif b"/Filter" in params:
+            continue  # images and other encodings carry no text
+        line: list[str] = []
+        for op in _PDF_TEXT.finditer(data):
+            token = op.group()
+            if token in (b"T*", b"ET") or token.endswith(b"'"):
+                if line:
+                    yield "".join(line)
+                line = []
+            if token not in (b"T*", b"ET"):
+                line.extend(_pdf_string(s) for s in _PDF_STRING.findall(token))
+        if line:
+            yield "".join(line)
+
+
+class _HTMLText(HTMLParser):
+    SKIP = {"script", "style", "noscript", "template", "svg"}
+    BLOCK = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "td", "th"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag in self.BLOCK:
+            self.parts.append("\n")
+        elif tag == "meta":
+            attrs = dict(attrs)
+            if attrs.get("name") in ("description", "keywords") and attrs.get("content"):
+                self.parts.append("\n" + attrs["content"] + "\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def iter_html_text(f: IO[bytes], chunk_size: int = 1 << 16) -> Iterator[str]:
+    parser = _HTMLText()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    tail = ""  # text after the last line break: may continue in the next chunk
+    for chunk in iter(lambda: f.read(chunk_size), b""):
+        parser.feed(decoder.decode(chunk))
+        text = tail + "".join(parser.parts)
+        parser.parts.clear()
+        complete, newline, tail = text.rpartition("\n")
+        if newline:
+            yield complete
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield tail + "".join(parser.parts)
+
+
+def iter_table_text(extension: str, f: IO[bytes]) -> Iterator[str]:
+    # Labels only: numeric cells add size, not findability
+    from .previews import iter_rows, parse_number
+
+    for row in iter_rows("xlsx" if extension == "xlsx" else "csv", f):
+        words = [cell.strip() for cell in row if cell.strip() and parse_number(cell) is None]
+        if words:
+            yield " ".join(words)
+
+
+def iter_text(extension: str, f: IO[bytes]) -> Iterator[str]:
+    if extension == "pdf":
+        return iter_pdf_text(f)
+    if extension in ("html", "htm"):
+        return iter_html_text(f)
+    return iter_table_text(extension, f)
+
+
+def normalize(fragments: Iterable[str], max_chars: int = MAX_CHARS) -> tuple[str, bool]:
+    """
+    (text, truncated): one line per distinct non-empty line, in first-seen order.
+    """
+    seen: set[str] = set()
+    lines: list[str] = []
+    size = 0
+    for fragment in fragments:
+        for line in fragment.splitlines():
+            line = " ".join(line.split())
+            if len(line) < 2 or line.lower() in seen:
+                continue
+            seen.add(line.lower())
+            if size + len(line) + 1 > max_chars:
+                return "\n".join(lines), True
+            lines.append(line)
+            size += len(line) + 1
+    return "\n".join(lines), False
+
+
+# ------------------------------------------------------------
+# Worker side (process pool)
+# ------------------------------------------------------------
+
+def init_worker(memory_mb: int) -> None:
+    import django
+
+    django.setup()  # spawn/forkserver workers start from scratch
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _timeout(signum, frame):
+    raise TimeoutError("extraction time limit exceeded")
+
+
+def extract_file(path: str, extension: str, timeout: int) -> dict:
+    """
+    DocumentText fields for a local file: {"text", "truncated"} or {"error"}.
+    """
+    previous = signal.signal(signal.SIGALRM, _timeout)
+    signal.alarm(timeout)
+    try:
+        with open(path, "rb") as f:
+            text, truncated = normalize(iter_text(extension, f))
+        return {"text": text, "truncated": truncated}
+    except MemoryError:
+        return {"error": "memory limit exceeded"}
+    except Exception as exc:  # any parser failure is recorded, never retried automatically
+        return {"error": f"{type(exc).__name__}: {exc}"[:200]}
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def local_path(documento: Documento) -> tuple[str, bool]:
+    """
+    (path, is_temporary): remote files are copied to a temporary file first,
+    since workers read plain files.
+    """
+    try:
+        return documento.file.path, False
+    except NotImplementedError:
+        import shutil
+        import tempfile
+
+        with documento.file.storage.open(documento.file.name, "rb") as src, tempfile.NamedTemporaryFile(
+            suffix=f".{documento.extension}", delete=False
+        ) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        return dst.name, True
+
+
+def pending() -> list[Documento]:
+    """
+    One document per file content that has no DocumentText yet.
+    """
+    done = DocumentText.objects.filter(sha256=OuterRef("sha256"))
+    todo: dict[str, Documento] = {}
+    for doc in Documento.objects.exclude(sha256="").filter(~Exists(done)).order_by("id"):
+        if supports(doc):
+            todo.setdefault(doc.sha256, doc)
+    return list(todo.values())
+
+
+def remove_temporary(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+# ------------------------------------------------------------
+# Search
+# ------------------------------------------------------------
+
+def search_filter(q: str) -> Q:
+    """
+    Trabajos whose title/tagline/summary, document titles or document text
+    contain `q` (case-insensitive).
+    """
+    text_hits = DocumentText.objects.filter(text__icontains=q).values("sha256")
+    documents = Documento.objects.filter(trabajo=OuterRef("pk")).filter(
+        Q(title__icontains=q) | Q(sha256__in=text_hits)
+    )
+    return (
+        Q(title__icontains=q)
+        | Q(tagline__icontains=q)
+        | Q(summary__icontains=q)
+        | Exists(documents)
+    )
@@ -0,0 +1,484 @@
+# catalogo/transfer.py
+"""
+Streaming catalog import/export (manage.py import_catalog / export_catalog).
+
+Wire format: NDJSON, one record per line, parents before children:
+
+    {"model": "catalogo.area", "fields": {"slug": "...", ...}}
+    {"model": "catalogo.trabajo", "fields": {"area": "<area_slug>", "slug": "...", ...}}
+    {"model": "catalogo.highlight", "fields": {"trabajo": ["<area_slug>", "<trabajo_slug>"], ...}}
+    {"model": "catalogo.documento", "fields": {"trabajo": [...], ...}}
+
+References use natural keys (Area.slug, (area slug, Trabajo.slug)), so files
+move between databases. Import also accepts Django fixtures (a JSON array with
+integer pks, e.g. old dumpdata backups), parsed incrementally; the legacy
+Spanish field names and codepage mojibake of those backups are repaired on the way.
+
+Upserts: Area on slug, Trabajo on (area, slug). A Trabajo present in the input
+is authoritative for its children: its highlights and documents become the ones
+that follow it in the input. Children are matched to the existing rows by
+natural key (CHILD_KEYS), so their primary keys - and the
+/documentos/<pk>/descarga/ URLs built on them - survive re-imports and syncs;
+unmatched rows are created, leftovers deleted. Only the fields a record carries
+are written to an existing row; missing ones keep their stored value.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import re
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import IO, Any, Iterable, Iterator, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from .models import Area, Documento, Highlight, Trabajo
+
+AREA = "catalogo.area"
+TRABAJO = "catalogo.trabajo"
+HIGHLIGHT = "catalogo.highlight"
+DOCUMENTO = "catalogo.documento"
+
+# Dependency order (parents first)
+MODELS = (AREA, TRABAJO, HIGHLIGHT, DOCUMENTO)
+
+Record = dict[str, Any]
+
+
+# ------------------------------------------------------------
+# Readers
+# ------------------------------------------------------------
+
+def open_stream(path: str, mode: str = "rt") -> IO:
+    """
+    "-" -> stdin/stdout, "*.gz" -> gzip, anything else -> plain UTF-8 file.
+    """
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8-sig" if "r" in mode else "utf-8", newline="\n")
+
+
+def iter_json_array(f: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yields the elements of a top-level JSON array without loading it whole.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf, pos = buf[pos:] + chunk, 0
+        return True
+
+    def skip(chars: str) -> Optional[str]:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return None
+
+    if skip(" \t\r\n") != "[":
+        raise ValueError("Expected a JSON array.")
+    pos += 1
+
+    while True:
+        ch = skip(" \t\r\n,")
+        if ch is None:
+            raise ValueError("Unterminated JSON array.")
+        if ch == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof or not fill():
+                raise
+            chunk_size *= 2  # large element: grow reads to avoid re-parsing often
+            continue
+        yield obj
+        pos = end
+
+
+def iter_records(f: IO[str]) -> Iterator[Record]:
+    """
+    NDJSON or a JSON array (Django fixture), detected from the first byte.
+    """
+    first = f.read(1)
+    while first and first.isspace():
+        first = f.read(1)
+    if not first:
+        return
+    if first == "[":
+        yield from iter_json_array(_Prepend(first, f))
+        return
+    line = first + f.readline()
+    while line:
+        if line.strip():
+            yield json.loads(line)
+        line = f.readline()
+
+
+class _Prepend:
+    """
+    File-like `read()` that first returns an already-consumed prefix.
+    """
+
+    def __init__(self, prefix: str, f: IO[str]):
+        self._prefix, self._f = prefix, f
+
+    def read(self, size: int = -1) -> str:
+        if self._prefix:
+            out, self._prefix = self._prefix, ""
+            return out
+        return self._f.read(size)
+
+
+# ------------------------------------------------------------
+# Pipeline stages (record iterators in, record iterators out)
+# ------------------------------------------------------------
+
+# Characters that only show up when UTF-8 bytes were decoded as CP850/CP437
+_MOJIBAKE_MARKERS = set("├┬┐└┘┴┼─│") | {"Ô"}
+_NON_ASCII_RUN = re.compile(r"[^\x00-\x7f]+")
+
+LEGACY_FIELD_MAPS = {
+    AREA: {"nombre": "name", "descripcion": "description", "orden": "order"},
+    TRABAJO: {"titulo": "title", "resumen": "summary", "descripcion": "description", "orden": "order"},
+    HIGHLIGHT: {"orden": "order"},
+    DOCUMENTO: {"titulo": "title", "tipo": "doc_type", "orden": "order"},
+}
+
+
+def fix_mojibake(s: str) -> str:
+    """
+    Repairs strings that were produced by decoding UTF-8 bytes with a DOS
+    codepage (Windows console redirects). Example: 'An├ílisis' -> 'Análisis'.
+    CP850 covers '├®' (é) and 'ÔÇô' (–), which CP437 cannot encode back.
+    """
+    for codepage in ("cp850", "cp437"):
+        try:
+            return s.encode(codepage).decode("utf-8")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            continue
+    return s
+
+
+def _fix_runs(s: str) -> str:
+    # Run by run, so one genuinely non-CP437 character (a curly quote, say)
+    # does not prevent repairing the rest of the string.
+    return _NON_ASCII_RUN.sub(lambda m: fix_mojibake(m.group()), s)
+
+
+def repair_mojibake(records: Iterable[Record]) -> Iterator[Record]:
+    for record in records:
+        fields = record.get("fields", {})
+        for key, value in fields.items():
+            if isinstance(value, str) and value and any(ch in _MOJIBAKE_MARKERS for ch in value):
+                fields[key] = _fix_runs(value)
+        yield record
+
+
+def rename_legacy_fields(records: Iterable[Record]) -> Iterator[Record]:
+    for record in records:
+        mapping = LEGACY_FIELD_MAPS.get(record.get("model"), {})
+        fields = record.get("fields", {})
+        for old, new in mapping.items():
+            if old in fields and new not in fields:
+                fields[new] = fields.pop(old)
+        yield record
+
+
+def resolve_fixture_pks(records: Iterable[Record]) -> Iterator[Record]:
+    """
+    Integer pk references (Django fixtures) -> natural keys.
+    Only fixture input needs the pk maps; NDJSON exports already use natural keys.
+    """
+    area_slugs: dict[Any, str] = {}
+    trabajo_keys: dict[Any, list[str]] = {}
+
+    for record in records:
+        model, fields = record.get("model"), record.get("fields", {})
+        if model == AREA and "pk" in record:
+            area_slugs[record["pk"]] = fields["slug"]
+        elif model == TRABAJO:
+            if not isinstance(fields.get("area"), str):
+                fields["area"] = area_slugs[fields["area"]]
+            if "pk" in record:
+                trabajo_keys[record["pk"]] = [fields["area"], fields["slug"]]
+        elif model in (HIGHLIGHT, DOCUMENTO) and not isinstance(fields.get("trabajo"), list):
+            fields["trabajo"] = trabajo_keys[fields["trabajo"]]
+        yield record
+
+
+def import_pipeline(records: Iterable[Record]) -> Iterator[Record]:
+    return resolve_fixture_pks(rename_legacy_fields(repair_mojibake(records)))
+
+
+# ------------------------------------------------------------
+# Loader (batched upserts)
+# ------------------------------------------------------------
+
+AREA_FIELDS = ("name", "description", "order")
+TRABAJO_FIELDS = (
+    "title", "tagline", "summary", "description", "highlights", "app_url", "image",
+    "image_url", "thumbnail_url", "status", "published_at", "is_featured", "order",
+)
+HIGHLIGHT_FIELDS = ("label", "value", "order")
+DOCUMENTO_FIELDS = (
+    "title", "doc_type", "file", "url", "order",
+    "mime_type", "extension", "size", "sha256", "page_count",  # catalogo.filemeta
+)
+# Natural keys of children within their trabajo; duplicates pair up in (order, id) order
+CHILD_KEYS = {HIGHLIGHT: ("label",), DOCUMENTO: ("title", "file", "url")}
+
+
+@dataclass
+class ImportStats:
+    counts: dict[str, int] = field(default_factory=lambda: dict.fromkeys(MODELS, 0))
+    undescribed: int = 0  # new documents with a file but no metadata in the input
+
+    def __str__(self) -> str:
+        return ", ".join(f"{n} {model.split('.')[1]}" for model, n in self.counts.items())
+
+
+class CatalogLoader:
+    """
+    Buffers records per model and writes them with bulk_create/bulk_update in
+    batches. Memory is bounded by `batch_size`, a bounded natural-key -> id
+    cache and the ids of the trabajos and children written (for the final
+    removal of children absent from the input).
+    """
+
+    KEY_CACHE_SIZE = 50_000
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self.buffers: dict[str, list[Record]] = {model: [] for model in MODELS}
+        self.area_ids: dict[str, int] = {}
+        self.trabajo_ids: dict[tuple[str, str], int] = {}
+        self.written_trabajos: set[int] = set()
+        self.kept_children: dict[str, set[int]] = {HIGHLIGHT: set(), DOCUMENTO: set()}
+        self.stats = ImportStats()
+
+    def load(self, records: Iterable[Record]) -> ImportStats:
+        for record in records:
+            model = record.get("model")
+            if model not in self.buffers:
+                continue
+            self.buffers[model].append(record["fields"])
+            if len(self.buffers[model]) >= self.batch_size:
+                self.flush(upto=model)
+        self.flush()
+        self._delete_absent_children()
+        Area.objects.all().refresh_counters()
+        return self.stats
+
+    def flush(self, upto: Optional[str] = None) -> None:
+        # Parents are always written before children that may reference them.
+        for model in MODELS:
+            if self.buffers[model]:
+                getattr(self, f"_flush_{model.split('.')[1]}")(self.buffers[model])
+                self.stats.counts[model] += len(self.buffers[model])
+                self.buffers[model] = []
+            if model == upto:
+                break
+
+    # -- natural keys -----------------------------------------------
+
+    def _remember(self, cache: dict, items: Iterable[tuple[Any, int]]) -> None:
+        if len(cache) > self.KEY_CACHE_SIZE:
+            cache.clear()
+        cache.update(items)
+
+    def _area_id(self, slug: str) -> int:
+        if slug not in self.area_ids:
+            self._remember(self.area_ids, Area.objects.filter(slug=slug).values_list("slug", "id"))
+        return self.area_ids[slug]
+
+    def _trabajo_id_map(self, keys: set[tuple[str, str]]) -> dict[tuple[str, str], int]:
+        missing = keys - self.trabajo_ids.keys()
+        if missing:
+            cond = Q()
+            for area_slug, slug in missing:
+                cond |= Q(area__slug=area_slug, slug=slug)
+            self._remember(
+                self.trabajo_ids,
+                (((a, s), pk) for a, s, pk in Trabajo.objects.filter(cond).values_list("area__slug", "slug", "id")),
+            )
+        return {key: self.trabajo_ids[key] for key in keys}
+
+    # -- per-model writers --------------------------------------------
+
+    def _flush_area(self, rows: list[Record]) -> None:
+        groups: dict[tuple[str, ...], list[Area]] = defaultdict(list)
+        for r in rows:
+            fields = _present(AREA_FIELDS, r)
+            groups[fields].append(Area(slug=r["slug"], **{f: r[f] for f in fields}))
+        for fields, objs in groups.items():
+            Area.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=["slug"],
+                update_fields=[*fields, "updated_at"],
+            )
+        self._remember(self.area_ids, Area.objects.filter(slug__in=[r["slug"] for r in rows]).values_list("slug", "id"))
+
+    def _flush_trabajo(self, rows: list[Record]) -> None:
+        # Published without a date: keep the stored one, else now (same rule as Trabajo.save())
+        undated = {
+            (r["area"], r["slug"]) for r in rows
+            if r.get("status") == Trabajo.Status.PUBLISHED and not r.get("published_at")
+        }
+        dated = self._published_at(undated) if undated else {}
+        now = timezone.now()
+
+        groups: dict[tuple[str, ...], list[Trabajo]] = defaultdict(list)
+        for r in rows:
+            values = {f: r[f] for f in _present(TRABAJO_FIELDS, r)}
+            if (r["area"], r["slug"]) in undated:
+                values["published_at"] = dated.get((r["area"], r["slug"])) or now
+            fields = _present(TRABAJO_FIELDS, values)
+            groups[fields].append(Trabajo(area_id=self._area_id(r["area"]), slug=r["slug"], **values))
+        for fields, objs in groups.items():
+            Trabajo.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=["area", "slug"],
+                update_fields=[*fields, "updated_at"],
+            )
+        # The input is authoritative for the children of every trabajo it contains.
+        self.written_trabajos.update(self._trabajo_id_map({(r["area"], r["slug"]) for r in rows}).values())
+
+    def _published_at(self, keys: set[tuple[str, str]]) -> dict[tuple[str, str], Any]:
+        cond = Q()
+        for area_slug, slug in keys:
+            cond |= Q(area__slug=area_slug, slug=slug)
+        rows = Trabajo.objects.filter(cond).values_list("area__slug", "slug", "published_at")
+        return {(a, s): published_at for a, s, published_at in rows}
+
+    def _flush_children(self, model, label: str, fields: tuple[str, ...], rows: list[Record]) -> list:
+        ids = self._trabajo_id_map({tuple(r["trabajo"]) for r in rows})
+        key_fields = CHILD_KEYS[label]
+        kept = self.kept_children[label]
+
+        # Existing rows not matched yet, by (trabajo, natural key)
+        existing: dict[tuple, list[int]] = defaultdict(list)
+        for pk, trabajo_id, *key in (
+            model.objects.filter(trabajo_id__in=set(ids.values()))
+            .order_by("trabajo_id", "order", "id")
+            .values_list("id", "trabajo_id", *key_fields)
+        ):
+            if pk not in kept:
+                existing[(trabajo_id, *map(_key_part, key))].append(pk)
+
+        now = timezone.now()
+        created: list = []
+        updated: dict[tuple[str, ...], list] = defaultdict(list)
+        for r in rows:
+            present = _present(fields, r)
+            obj = model(trabajo_id=ids[tuple(r["trabajo"])], **{f: r[f] for f in present})
+            pks = existing.get((obj.trabajo_id, *(_key_part(getattr(obj, f)) for f in key_fields)))
+            if pks:
+                obj.pk, obj.updated_at = pks.pop(0), now
+                updated[present].append(obj)
+            else:
+                created.append(obj)
+        for present, objs in updated.items():
+            model.objects.bulk_update(objs, [*present, "updated_at"])
+        model.objects.bulk_create(created)
+        kept.update(obj.pk for obj in (*created, *(o for objs in updated.values() for o in objs)))
+        return created
+
+    def _flush_highlight(self, rows: list[Record]) -> None:
+        self._flush_children(Highlight, HIGHLIGHT, HIGHLIGHT_FIELDS, rows)
+
+    def _flush_documento(self, rows: list[Record]) -> None:
+        created = self._flush_children(Documento, DOCUMENTO, DOCUMENTO_FIELDS, rows)
+        # Files aren't read inside the import: backfill_document_metadata picks these up (sha256 == "")
+        self.stats.undescribed += sum(1 for d in created if d.file and not d.sha256)
+
+    def _delete_absent_children(self) -> None:
+        trabajos = sorted(self.written_trabajos)
+        for model, label in ((Highlight, HIGHLIGHT), (Documento, DOCUMENTO)):
+            kept = self.kept_children[label]
+            for i in range(0, len(trabajos), self.batch_size):
+                pks = model.objects.filter(trabajo_id__in=trabajos[i : i + self.batch_size]).values_list("id", flat=True)
+                absent = [pk for pk in pks if pk not in kept]
+                if absent:
+                    model.objects.filter(pk__in=absent).delete()
+
+
+def _present(fields: tuple[str, ...], record: Record) -> tuple[str, ...]:
+    # Fields missing from a record keep their stored value: only these are written
+    return tuple(f for f in fields if f in record)
+
+
+def _key_part(value: Any) -> str:
+    # FieldFile, file name, None and "" compare as the stored name
+    return str(value or "")
+
+
+def import_catalog(f: IO[str], batch_size: int = 1000) -> ImportStats:
+    """
+    Runs the whole import in one transaction (all or nothing).
+    """
+    with transaction.atomic():
+        return CatalogLoader(batch_size).load(import_pipeline(iter_records(f)))
+
+
+# ------------------------------------------------------------
+# Export
+# ------------------------------------------------------------
+
+def iter_export(
+    areas: Optional[QuerySet] = None,
+    trabajos: Optional[QuerySet] = None,
+    highlights: Optional[QuerySet] = None,
+    documentos: Optional[QuerySet] = None,
+    chunk_size: int = 2000,
+) -> Iterator[Record]:
+    """
+    The whole catalog by default; catalogo.sync passes only changed rows.
+    """
+    areas = Area.objects.all() if areas is None else areas
+    trabajos = Trabajo.objects.all() if trabajos is None else trabajos
+    children = (
+        (HIGHLIGHT, Highlight.objects.all() if highlights is None else highlights, HIGHLIGHT_FIELDS),
+        (DOCUMENTO, Documento.objects.all() if documentos is None else documentos, DOCUMENTO_FIELDS),
+    )
+
+    for row in areas.order_by("id").values("slug", *AREA_FIELDS).iterator(chunk_size=chunk_size):
+        yield {"model": AREA, "fields": row}
+
+    rows = trabajos.order_by("area_id", "id").values("area__slug", "slug", *TRABAJO_FIELDS)
+    for row in rows.iterator(chunk_size=chunk_size):
+        row["area"] = row.pop("area__slug")
+        yield {"model": TRABAJO, "fields": row}
+
+    for label, qs, fields in children:
+        rows = qs.order_by("trabajo_id", "order", "id").values("trabajo__area__slug", "trabajo__slug", *fields)
+        for row in rows.iterator(chunk_size=chunk_size):
+            row["trabajo"] = [row.pop("trabajo__area__slug"), row.pop("trabajo__slug")]
+            yield {"model": label, "fields": row}
+
+
+def write_ndjson(records: Iterable[Record], out: IO[str]) -> int:
+    n = 0
+    for record in records:
+        out.write(json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")) + "\n")
+        n += 1
+    return n
@@ -1,12 +1,18 @@
 # catalogo/urls.py
+from django.conf import settings
 from django.urls import path
-from . import views
+
+from . import async_views, views
+
+# Public pages: async twins under ASGI (settings.ASYNC_VIEWS)
+pages = async_views if settings.ASYNC_VIEWS else views
 
 app_name = "catalogo"
 
 urlpatterns = [
     path("areas/", views.areas, name="areas"),
-    path("areas/<slug:area_slug>/", views.area_detail, name="area_detail"),
-    path("<slug:area_slug>/<slug:trabajo_slug>/", views.trabajo_detail, name="trabajo_detail"),
-    path("<slug:area_slug>/<slug:trabajo_slug>/documentos/", views.trabajo_documentos, name="trabajo_documentos"),
+    path("areas/<slug:area_slug>/", pages.area_detail, name="area_detail"),
+    path("areas/<slug:area_slug>/trabajos/", pages.area_trabajos, name="area_trabajos"),
+    path("<slug:area_slug>/<slug:trabajo_slug>/", pages.trabajo_detail, name="trabajo_detail"),
+    path("<slug:area_slug>/<slug:trabajo_slug>/documentos/", pages.trabajo_documentos, name="trabajo_documentos"),
 ]
@@ -1,48 +1,110 @@
 # catalogo/views.py
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import get_object_or_404, render
+
+from . import previews
 from .models import Area, Trabajo, Documento
+from .pagination import Cursor, InvalidCursor, paginate_keyset
+from .purge import area_key, tag_response, trabajo_key
+
+# What a trabajo card renders (plus id); description/highlights are never loaded
+CARD_FIELDS = (
+    "area", "slug", "title", "tagline", "summary",
+    "image", "image_url", "thumbnail_url", "published_at", "created_at",
+)
+
+
+# ------------------------------------------------------------
+# Queries and context, shared with the async twins (catalogo/async_views.py)
+# ------------------------------------------------------------
+
+def request_cursor(request):
+    token = request.GET.get("cursor")
+    if not token:
+        return None
+    try:
+        return Cursor.decode(token)
+    except InvalidCursor:
+        raise Http404("Invalid cursor.")
+
+
+def area_cards(area):
+    """
+    Published trabajos of `area` for the card grid, keyset-paginated by
+    paginate_keyset (ix_trabajo_area_published), card fields only.
+    """
+    return area.trabajos.filter(status=Trabajo.Status.PUBLISHED).only(*CARD_FIELDS)
+
+
+def trabajo_queryset():
+    return Trabajo.objects.select_related("area")  # pages link back to the area
+
+
+def highlights_of(trabajo):
+    return trabajo.highlight_items.all().order_by("order", "id")
+
+
+def documents_of(trabajo):
+    return trabajo.documentos.all().order_by("order", "id")
 
 
+def detail_context(trabajo, highlights: list, documentos: list) -> dict:
+    """
+    trabajo_detail context; the three document groups come from one query.
+    """
+
+    def of_type(doc_type):
+        return [d for d in documentos if d.doc_type == doc_type]
+
+    return {
+        "trabajo": trabajo,
+        "highlights": highlights,
+        "docs_tech": of_type(Documento.DocType.METHODOLOGY),
+        "docs_stats": of_type(Documento.DocType.DATA),
+        "docs_viewers": of_type(Documento.DocType.OTHER),
+    }
+
+
+# ------------------------------------------------------------
+# Views
+# ------------------------------------------------------------
+
 def areas(request):
     areas_qs = Area.objects.all().order_by("order", "name")
-    return render(request, "catalogo/areas.html", {"areas": areas_qs})
+    response = render(request, "catalogo/area_list.html", {"areas": areas_qs})
+    return tag_response(response, *(area_key(a.pk) for a in areas_qs))
 
 
-def area_detail(request, area_slug):
+def _area_page(request, area_slug, template: str, eager: int):
     area = get_object_or_404(Area, slug=area_slug)
-    trabajos = (
-        area.trabajos
-        .filter(status=Trabajo.Status.PUBLISHED)
-        .order_by("-published_at", "-created_at")
+    trabajos, next_cursor = paginate_keyset(area_cards(area), request_cursor(request), settings.CATALOG_PAGE_SIZE)
+    response = render(
+        request, template, {"area": area, "trabajos": trabajos, "next_cursor": next_cursor, "eager": eager}
     )
-    return render(request, "catalogo/area_detail.html", {"area": area, "trabajos": trabajos})
+    return tag_response(response, area_key(area.pk))
+
+
+def area_detail(request, area_slug):
+    # First page server-side; `?cursor=` serves later pages without JS
+    return _area_page(request, area_slug, "catalogo/area_detail.html", eager=3)
+
+
+def area_trabajos(request, area_slug):
+    # Further pages of the grid as an HTML fragment, fetched on scroll
+    return _area_page(request, area_slug, "catalogo/trabajo_cards.html", eager=0)
 
 
 def trabajo_detail(request, area_slug, trabajo_slug):
-    trabajo = get_object_or_404(Trabajo, area__slug=area_slug, slug=trabajo_slug)
-
-    # Highlights: keep existing behavior
-    highlights = trabajo.highlight_items.all().order_by("order", "id")
-
-    # Documents grouped by category (ordered)
-    docs_tech = trabajo.documentos.filter(doc_type=Documento.DocType.METHODOLOGY).order_by("order", "id")
-    docs_stats = trabajo.documentos.filter(doc_type=Documento.DocType.DATA).order_by("order", "id")
-    docs_viewers = trabajo.documentos.filter(doc_type=Documento.DocType.OTHER).order_by("order", "id")
-
-    return render(
-        request,
-        "catalogo/trabajo_detail.html",
-        {
-            "trabajo": trabajo,
-            "highlights": highlights,
-            "docs_tech": docs_tech,
-            "docs_stats": docs_stats,
-            "docs_viewers": docs_viewers,
-        },
-    )
+    trabajo = get_object_or_404(trabajo_queryset(), area__slug=area_slug, slug=trabajo_slug)
+    context = detail_context(trabajo, list(highlights_of(trabajo)), list(documents_of(trabajo)))
+    previews.attach(context["docs_stats"])  # stored CSV/XLSX previews, one query
+    response = render(request, "catalogo/trabajo_detail.html", context)
+    return tag_response(response, area_key(trabajo.area_id), trabajo_key(trabajo.pk))
 
 
 def trabajo_documentos(request, area_slug, trabajo_slug):
-    trabajo = get_object_or_404(Trabajo, area__slug=area_slug, slug=trabajo_slug)
-    documentos = trabajo.documentos.all().order_by("order", "id")
-    return render(request, "catalogo/trabajo_documentos.html", {"trabajo": trabajo, "documentos": documentos})
+    trabajo = get_object_or_404(trabajo_queryset(), area__slug=area_slug, slug=trabajo_slug)
+    documentos = documents_of(trabajo)
+    response = render(request, "catalogo/trabajo_documentos.html", {"trabajo": trabajo, "documentos": documentos})
+    return tag_response(response, area_key(trabajo.area_id), trabajo_key(trabajo.pk))
@@ -0,0 +1,25 @@
+# core/async_views.py
+"""
+Async twin of core.views.home for ASGI (selected by settings.ASYNC_VIEWS);
+the queries are shared with it.
+"""
+
+from __future__ import annotations
+
+from catalogo.async_views import arender, resolve_attrs
+from catalogo.purge import HOME, tag_response, trabajo_key
+
+from .views import home_areas, home_latest
+
+
+async def home(request):
+    areas = [a async for a in home_areas()]
+    latest_trabajos = [t async for t in home_latest()]
+    await resolve_attrs(latest_trabajos, "hero_image")
+
+    response = await arender(
+        request,
+        "core/home.html",
+        {"areas": areas, "latest_trabajos": latest_trabajos},
+    )
+    return tag_response(response, HOME, *(trabajo_key(t.pk) for t in latest_trabajos))
@@ -0,0 +1,30 @@
+# core/management/commands/cache_proxy.py
+from django.core.management.base import BaseCommand
+
+from portal.cacheproxy import CacheProxyServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local caching reverse proxy with surrogate-key purges in front of the site "
+        "(stand-in for the CDN; point SURROGATE_PURGE_URL at its purge path)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--upstream", default="http://127.0.0.1:8000", help="Django server to proxy to.")
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8080)
+        parser.add_argument("--purge-path", default="/.purge", help="POST here with a Surrogate-Key header.")
+
+    def handle(self, *args, **options):
+        server = CacheProxyServer((options["host"], options["port"]), options["upstream"], options["purge_path"])
+        self.stdout.write(
+            f"Caching {options['upstream']} on {server.url} "
+            f"(SURROGATE_PURGE_URL={server.url}{options['purge_path']})"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,212 @@
+# core/management/commands/export_static.py
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import timezone, translation
+
+from catalogo.models import Area, Documento, Highlight, Trabajo
+
+STATE_FILE = ".export_state.json"
+
+
+# ------------------------------------------------------------
+# Page planning
+# ------------------------------------------------------------
+
+def _path(viewname: str, *args) -> str:
+    """
+    Public URL without its language prefix ("/es/areas/x/" -> "/areas/x/");
+    render_page() adds the prefix of each exported language back.
+    """
+    with translation.override(settings.LANGUAGE_CODE):
+        return reverse(viewname, args=args).removeprefix(f"/{settings.LANGUAGE_CODE}")
+
+
+def _trabajo_paths(area_slug: str, trabajo_slug: str) -> list[str]:
+    return [
+        _path("catalogo:trabajo_detail", area_slug, trabajo_slug),
+        _path("catalogo:trabajo_documentos", area_slug, trabajo_slug),
+    ]
+
+
+def plan_pages() -> dict[str, list[str]]:
+    """
+    Every public path, grouped by what it depends on:
+      "site"           -> pages without catalog-specific content
+      "area:<id>"      -> area_detail
+      "trabajo:<id>"   -> trabajo_detail + trabajo_documentos
+    Only published trabajos are exported.
+    """
+    groups: dict[str, list[str]] = {"site": [_path("home"), _path("laboratorio")]}
+    for pk, slug in Area.objects.values_list("id", "slug"):
+        groups[f"area:{pk}"] = [_path("catalogo:area_detail", slug)]
+
+    trabajos = (
+        Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED)
+        .values_list("id", "area__slug", "slug")
+    )
+    for pk, area_slug, slug in trabajos:
+        groups[f"trabajo:{pk}"] = _trabajo_paths(area_slug, slug)
+    return groups
+
+
+def changed_groups(since: datetime) -> set[str] | None:
+    """
+    Groups touched since `since`; None means "everything" (the navbar in
+    base.html lists all areas, so any Area edit affects every page).
+    """
+    if Area.objects.filter(updated_at__gt=since).exists():
+        return None
+
+    trabajo_ids = set(Trabajo.objects.filter(updated_at__gt=since).values_list("id", flat=True))
+    # Child edits show up on the children; child deletes bump the trabajo (catalogo/signals.py).
+    trabajo_ids |= set(Highlight.objects.filter(updated_at__gt=since).values_list("trabajo_id", flat=True))
+    trabajo_ids |= set(Documento.objects.filter(updated_at__gt=since).values_list("trabajo_id", flat=True))
+
+    groups = {f"trabajo:{pk}" for pk in trabajo_ids}
+    area_ids = Trabajo.objects.filter(id__in=trabajo_ids).values_list("area_id", flat=True).distinct()
+    groups |= {f"area:{pk}" for pk in area_ids}
+    if groups:
+        groups.add("site")  # home carousel lists the latest publications
+    return groups
+
+
+# ------------------------------------------------------------
+# Rendering (runs inside worker processes)
+# ------------------------------------------------------------
+
+def _init_worker() -> None:
+    import django
+
+    django.setup()
+
+
+def _output_file(output_dir: str, lang: str, path: str) -> Path:
+    return Path(output_dir, lang, path.lstrip("/"), "index.html")
+
+
+def render_page(task: tuple[str, str, str]) -> tuple[str, str, int]:
+    output_dir, lang, path = task
+    url = f"/{lang}{path}"  # <output>/<lang>/<path> mirrors the live URLs
+
+    with translation.override(lang):
+        match = resolve(url)
+        request = RequestFactory().get(url)
+        request.LANGUAGE_CODE = lang
+        view = match.func
+        if iscoroutinefunction(view):  # settings.ASYNC_VIEWS
+            view = async_to_sync(view)
+        response = view(request, *match.args, **match.kwargs)
+
+    if response.status_code == 200:
+        target = _output_file(output_dir, lang, path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(response.content)
+    return lang, path, response.status_code
+
+
+# ------------------------------------------------------------
+# Command
+# ------------------------------------------------------------
+
+class Command(BaseCommand):
+    help = (
+        "Pre-render the public catalog (home, areas, trabajos, documentos) for every "
+        "language in LANGUAGES into <output>/<lang>/<path>/index.html."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Target directory.")
+        parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only re-render pages affected since the previous export (uses updated_at).",
+        )
+
+    def handle(self, *args, **options):
+        output_dir = Path(options["output"]).resolve()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        state_path = output_dir / STATE_FILE
+        languages = [code for code, _ in settings.LANGUAGES]
+
+        started_at = timezone.now()
+        groups = plan_pages()
+        all_paths = {p for paths in groups.values() for p in paths}
+
+        previous = None
+        if options["incremental"] and state_path.exists():
+            previous = json.loads(state_path.read_text(encoding="utf-8"))
+
+        if previous is None:
+            selected = set(groups)
+        else:
+            since = datetime.fromisoformat(previous["exported_at"])
+            selected = changed_groups(since)
+            previous_groups = previous.get("groups", {})
+            if any(key.startswith("area:") and key not in groups for key in previous_groups):
+                selected = None  # deleted area: every navbar changes
+            if selected is None:
+                selected = set(groups)
+            elif any(previous_groups.get(key) != groups.get(key) for key in previous_groups):
+                # A trabajo was unpublished, deleted or moved: the area pages
+                # and home that listed it must be re-rendered too.
+                selected |= {"site"} | {k for k in groups if k.startswith("area:")}
+
+            previous_paths = {p for paths in previous_groups.values() for p in paths}
+            self._remove_stale(output_dir, languages, previous_paths - all_paths)
+
+        tasks = [
+            (str(output_dir), lang, path)
+            for key in sorted(selected & set(groups))
+            for path in groups[key]
+            for lang in languages
+        ]
+
+        failures = self._render(tasks, max(1, min(options["jobs"], len(tasks))))
+        if failures:
+            # No new state: the next incremental run retries everything since the last good export
+            raise CommandError(f"{failures} page(s) failed to render")
+        state_path.write_text(
+            json.dumps({"exported_at": started_at.isoformat(), "groups": groups}),
+            encoding="utf-8",
+        )
+        self.stdout.write(self.style.SUCCESS(f"OK -> rendered {len(tasks)} page(s) into {output_dir}"))
+
+    def _render(self, tasks: list[tuple[str, str, str]], jobs: int) -> int:
+        if jobs == 1:
+            return self._report(map(render_page, tasks))
+        # Forked workers must not share the parent's DB connection.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+            return self._report(pool.map(render_page, tasks, chunksize=8))
+
+    def _report(self, results) -> int:
+        failures = 0
+        for lang, path, status in results:
+            if status != 200:
+                failures += 1
+                self.stderr.write(f"[{status}] {lang} {path}")
+        return failures
+
+    def _remove_stale(self, output_dir: Path, languages: list[str], paths: set[str]) -> None:
+        for path in paths:
+            for lang in languages:
+                target = _output_file(str(output_dir), lang, path)
+                target.unlink(missing_ok=True)
+                # Prune now-empty directories up to <output>/<lang>
+                parent = target.parent
+                while parent != output_dir / lang and parent.is_dir() and not any(parent.iterdir()):
+                    parent.rmdir()
+                    parent = parent.parent
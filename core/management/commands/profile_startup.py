@@ -0,0 +1,90 @@
+# core/management/commands/profile_startup.py
+from __future__ import annotations
+
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+# "import time: <self us> | <cumulative us> | <indent><module>"
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+# Runs in a fresh interpreter; prints one JSON line on stdout.
+PROBE = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+import {module}
+loaded = time.perf_counter()
+timings = {{}}
+if {warm}:
+    from portal.preload import warm
+    timings = warm()
+print(json.dumps({{
+    "import_ms": (loaded - start) * 1000,
+    "warm_ms": {{k: v * 1000 for k, v in timings.items()}},
+    "maxrss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                "module": module,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": (len(indent) - 1) // 2,
+            })
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import the WSGI module in a fresh interpreter with -X importtime and report the "
+        "slowest imports, total boot time and RSS (optionally including portal.preload.warm())."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default="portal.wsgi", help="Module to import (default: portal.wsgi).")
+        parser.add_argument("--top", type=int, default=25, help="Rows to show.")
+        parser.add_argument(
+            "--sort", choices=("self", "cumulative"), default="cumulative", help="Order of the module table."
+        )
+        parser.add_argument("--warm", action="store_true", help="Also run the gunicorn --preload warm-up.")
+        parser.add_argument("--json", action="store_true", help="Print a JSON report instead of a table.")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "portal.settings")}
+        code = PROBE.format(module=options["module"], warm=bool(options["warm"]))
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env
+        )
+        if proc.returncode != 0:
+            errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+            raise CommandError(errors[-1] if errors else "probe failed")
+
+        summary = json.loads(proc.stdout.strip().splitlines()[-1])
+        key = f"{options['sort']}_ms"
+        rows = sorted(parse_importtime(proc.stderr), key=lambda r: r[key], reverse=True)[: options["top"]]
+
+        if options["json"]:
+            self.stdout.write(json.dumps({**summary, "imports": rows}, indent=2))
+            return
+
+        self.stdout.write(
+            f"import {options['module']}: {summary['import_ms']:.1f} ms, "
+            f"{summary['modules']} modules, max RSS {summary['maxrss_kb'] / 1024:.1f} MiB"
+        )
+        for name, ms in summary["warm_ms"].items():
+            self.stdout.write(f"  warm {name}: {ms:.1f} ms")
+        self.stdout.write(f"\n{'self ms':>9} {'cumul ms':>9}  module")
+        for row in rows:
+            self.stdout.write(f"{row['self_ms']:9.1f} {row['cumulative_ms']:9.1f}  {'  ' * row['depth']}{row['module']}")
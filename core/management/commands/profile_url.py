@@ -0,0 +1,17 @@
+# core/management/commands/profile_url.py
+from django.core.management.base import BaseCommand
+from django.utils.http import urlencode
+
+from portal.middleware import InstrumentationMiddleware
+
+
+class Command(BaseCommand):
+    help = "Print a signed ?_profile= URL (valid 10 min) that returns a cProfile dump to staff users."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='Request path, e.g. "/es/economia/mi-trabajo/".')
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        token = InstrumentationMiddleware.profile_token(path)
+        self.stdout.write(f"{path}?{urlencode({InstrumentationMiddleware.PROFILE_PARAM: token})}")
@@ -8,8 +8,6 @@ from django.http import JsonResponse, HttpResponseBadRequest
 from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.http import require_POST
 
-from core.utils.richtext import render_md_block, render_md_inline
-
 
 @staff_member_required
 @csrf_protect
@@ -41,5 +39,7 @@ def richtext_preview(request):
     if mode not in {"inline", "block"}:
         mode = "block"
 
+    from core.utils.richtext import render_md_block, render_md_inline  # lazy import (markdown, nh3)
+
     html = render_md_inline(text) if mode == "inline" else render_md_block(text)
     return JsonResponse({"html": html})
@@ -27,3 +27,45 @@
     initAreaPill();
   }
 })();
+
+/**
+ * Area grid: load the next page of cards (catalogo:area_trabajos) when the
+ * "Show more" link scrolls into view. Without JS the link opens the next page.
+ */
+(function () {
+  function initGrid() {
+    if (!("IntersectionObserver" in window)) return;
+    const grid = document.querySelector(".lea-grid");
+    if (!grid) return;
+
+    const observer = new IntersectionObserver(
+      (entries) => entries.forEach((entry) => entry.isIntersecting && load(entry.target)),
+      { rootMargin: "600px 0px" }
+    );
+
+    function watch() {
+      const link = grid.querySelector(".lea-more a[data-fragment]");
+      if (link) observer.observe(link);
+    }
+
+    async function load(link) {
+      observer.unobserve(link);
+      try {
+        const response = await fetch(link.dataset.fragment);
+        if (!response.ok) return; // the link still works as a plain page
+        link.closest(".lea-more").outerHTML = await response.text();
+        watch();
+      } catch (err) {
+        // offline / aborted: same fallback
+      }
+    }
+
+    watch();
+  }
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", initGrid);
+  } else {
+    initGrid();
+  }
+})();
@@ -0,0 +1,193 @@
+# core/staticbuild.py
+"""
+Static build step, run by `collectstatic` (STORAGES["staticfiles"]):
+- bundles + minifies the core stylesheets and scripts into one CSS and one
+  JS file (rcssmin / rjsmin when installed, a conservative fallback otherwise)
+- extracts the above-the-fold CSS of the home and trabajo pages (rules whose
+  selectors match the markup before the `{# fold #}` marker) for inlining
+- then WhiteNoise fingerprints everything (far-future, immutable caching) and
+  writes .gz and, with the `brotli` package installed, .br variants
+
+Templates pick the outputs up through core/templatetags/assets.py.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable
+
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+# Order matters: typography -> base layout -> components -> footer
+CSS_SOURCES = (
+    "core/css/typography.css",
+    "core/css/base.css",
+    "core/css/components.css",
+    "core/css/footer.css",
+)
+JS_SOURCES = ("core/js/base.js",)
+CSS_BUNDLE = "core/css/site.css"
+JS_BUNDLE = "core/js/site.js"
+
+# page -> templates whose markup (up to the fold) is visible on first paint
+CRITICAL_PAGES = {
+    "home": ("base.html", "core/home.html"),
+    "trabajo": ("base.html", "catalogo/trabajo_detail.html"),
+}
+FOLD_MARKER = "{# fold #}"
+
+
+def critical_name(page: str) -> str:
+    return f"core/css/critical-{page}.css"
+
+
+# ------------------------------------------------------------
+# Minification
+# ------------------------------------------------------------
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+
+
+def minify_css(text: str) -> str:
+    try:
+        import rcssmin
+    except ImportError:
+        text = _CSS_COMMENT.sub("", text)
+        text = re.sub(r"\s+", " ", text)
+        text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+        text = re.sub(r":\s+", ":", text)
+        return text.replace(";}", "}").strip()
+    return rcssmin.cssmin(text)
+
+
+def minify_js(text: str) -> str:
+    try:
+        import rjsmin
+    except ImportError:
+        # Only whole-line comments and blank lines: never touches string contents
+        text = re.sub(r"^\s*/\*.*?\*/\s*$", "", text, flags=re.S | re.M)
+        lines = (line.rstrip() for line in text.splitlines())
+        return "\n".join(line for line in lines if line and not line.lstrip().startswith("//")) + "\n"
+    return rjsmin.jsmin(text)
+
+
+# ------------------------------------------------------------
+# Critical CSS
+# ------------------------------------------------------------
+
+_TEMPLATE_SYNTAX = re.compile(r"\{%.*?%\}|\{\{.*?\}\}|\{#.*?#\}", re.S)
+_PSEUDO = re.compile(r"::?[\w-]+(\([^)]*\))?|\[[^\]]*\]")
+
+
+def above_the_fold(source: str) -> str:
+    """
+    base.html: the header (up to the content block); pages: their markup up
+    to FOLD_MARKER (everything when there is none).
+    """
+    for marker in (FOLD_MARKER, "{% block content %}{% endblock %}", "<main"):
+        if marker in source:
+            return source.split(marker, 1)[0]
+    return source
+
+
+def markup_tokens(markup: str) -> set[str]:
+    """
+    Tag names, ".class" and "#id" tokens of a template's markup.
+    """
+    tokens = {tag.lower() for tag in re.findall(r"<([a-zA-Z][\w-]*)", markup)}
+    for attr, prefix in (("class", "."), ("id", "#")):
+        for value in re.findall(rf'\b{attr}="([^"]*)"', markup):
+            # {% if x %}active{% endif %} -> "active" may be present
+            words = _TEMPLATE_SYNTAX.sub(" ", value).split()
+            tokens.update(prefix + word for word in words)
+    return tokens
+
+
+def _selector_matches(selector: str, tokens: set[str]) -> bool:
+    selector = _PSEUDO.sub("", selector)
+    needed = re.findall(r"[.#][\w-]+", selector)
+    needed += [tag.lower() for tag in re.findall(r"(?:^|[\s>+~(])([a-zA-Z][\w-]*)", selector)]
+    return all(token in tokens for token in needed)
+
+
+def _blocks(css: str):
+    """
+    Top-level (prelude, body) pairs; at-rules without a body are skipped.
+    """
+    depth, start, prelude = 0, 0, ""
+    for i, char in enumerate(css):
+        if char == "{":
+            if depth == 0:
+                prelude, start = css[start:i].strip(), i + 1
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                yield prelude, css[start:i]
+                start = i + 1
+        elif char == ";" and depth == 0:
+            start = i + 1
+
+
+def critical_css(css: str, tokens: set[str]) -> str:
+    """
+    The rules of `css` that can apply to markup made of `tokens`.
+    """
+    out = []
+    for prelude, body in _blocks(_CSS_COMMENT.sub("", css)):
+        if prelude.startswith("@media") or prelude.startswith("@supports"):
+            inner = critical_css(body, tokens)
+            if inner:
+                out.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@"):
+            continue  # @font-face, @keyframes: not needed for the first paint
+        elif any(_selector_matches(selector, tokens) for selector in prelude.split(",")):
+            out.append(f"{prelude}{{{body}}}")
+    return minify_css("".join(out))
+
+
+def template_source(name: str) -> str:
+    from django.template.loader import get_template
+
+    return get_template(name).template.source
+
+
+# ------------------------------------------------------------
+# Build
+# ------------------------------------------------------------
+
+def build_assets(read: Callable[[str], str], source: Callable[[str], str] = template_source) -> dict[str, str]:
+    """
+    Bundle name -> content; `read` returns a collected static file as text,
+    `source` a template's source.
+    """
+    css = "\n".join(read(name) for name in CSS_SOURCES)
+    assets = {
+        CSS_BUNDLE: minify_css(css),
+        JS_BUNDLE: minify_js("\n;".join(read(name) for name in JS_SOURCES)),
+    }
+    for page, templates in CRITICAL_PAGES.items():
+        tokens = set().union(*(markup_tokens(above_the_fold(source(t))) for t in templates))
+        assets[critical_name(page)] = critical_css(css, tokens)
+    return assets
+
+
+class BundledStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    CompressedManifestStaticFilesStorage that first adds the bundles and
+    critical CSS files, so they get fingerprinted and compressed too.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            def read(name: str) -> str:
+                with self.open(name) as f:
+                    return f.read().decode("utf-8")
+
+            for name, content in build_assets(read).items():
+                if self.exists(name):
+                    self.delete(name)
+                self._save(name, ContentFile(content.encode("utf-8")))
+                paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run, **options)
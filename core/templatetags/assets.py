@@ -0,0 +1,62 @@
+# core/templatetags/assets.py
+from __future__ import annotations
+
+import functools
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from core import staticbuild
+
+register = template.Library()
+
+
+def _bundled() -> bool:
+    return bool(getattr(settings, "STATIC_BUNDLES", False))
+
+
+@functools.lru_cache(maxsize=8)
+def _read_critical(page: str) -> str | None:
+    # Written by collectstatic (core.staticbuild.BundledStaticFilesStorage)
+    try:
+        with staticfiles_storage.open(staticbuild.critical_name(page)) as f:
+            return f.read().decode("utf-8")
+    except (OSError, ValueError):
+        return None
+
+
+def _links(names) -> str:
+    return format_html_join("\n  ", '<link rel="stylesheet" href="{}">', ((static(n),) for n in names))
+
+
+@register.simple_tag
+def stylesheets(critical: str = "") -> str:
+    """
+    The core stylesheets: one bundle when STATIC_BUNDLES is on (the four
+    source files otherwise). With `critical="home"` the page's above-the-fold
+    CSS is inlined and the bundle loads without blocking the first paint.
+    """
+    if not _bundled():
+        return _links(staticbuild.CSS_SOURCES)
+    css = _read_critical(critical) if critical else None
+    if not css:
+        return _links([staticbuild.CSS_BUNDLE])
+    href = static(staticbuild.CSS_BUNDLE)
+    return format_html(
+        "<style>{}</style>\n"
+        '  <link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '  <noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(css),
+        href,
+        href,
+    )
+
+
+@register.simple_tag
+def scripts() -> str:
+    names = [staticbuild.JS_BUNDLE] if _bundled() else staticbuild.JS_SOURCES
+    return format_html_join("\n  ", '<script src="{}" defer></script>', ((static(n),) for n in names))
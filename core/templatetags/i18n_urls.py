@@ -0,0 +1,23 @@
+# core/templatetags/i18n_urls.py
+from __future__ import annotations
+
+from django import template
+from django.urls import reverse, translate_url
+from django.utils import translation
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def translated_url(context, lang_code: str) -> str:
+    """
+    The current page in another language (/es/... <-> /en/...); the home
+    page in that language when the current URL can't be translated.
+    """
+    request = context.get("request")
+    if request is not None:
+        url = translate_url(request.get_full_path(), lang_code)
+        if url != request.get_full_path() or lang_code == translation.get_language():
+            return url
+    with translation.override(lang_code):
+        return reverse("home")
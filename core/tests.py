@@ -1,3 +1,429 @@
-from django.test import TestCase
+import gzip
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import translation
+
+from catalogo import async_views as catalogo_async
+from catalogo.models import Area, Documento, Trabajo
+from core import async_views, staticbuild, views as core_views
+from core.management.commands.profile_startup import parse_importtime
+from core.utils.richtext import render_md_inline
+from portal import compression
+from portal.instrumentation import collecting
+from portal.metrics import registry
+from portal.middleware import (
+    AdminEnglishMiddleware,
+    CompressionMiddleware,
+    InstrumentationMiddleware,
+    MetricsMiddleware,
+    ReplicaRoutingMiddleware,
+)
+from portal.routers import PrimaryReplicaRouter, routing
+
+# Tests render full pages without running collectstatic first.
+PLAIN_STATIC = {
+    **settings.STORAGES,
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class ExportStaticTests(TestCase):
+    def setUp(self):
+        self.area = Area.objects.create(name="Economía", slug="economia")
+        self.trabajo = Trabajo.objects.create(
+            area=self.area, title="Deuda", slug="deuda", status=Trabajo.Status.PUBLISHED
+        )
+        self.output = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output, ignore_errors=True)
+
+    def export(self, *args):
+        call_command("export_static", str(self.output), "--jobs", "1", *args, stdout=StringIO())
+
+    def test_full_then_incremental_export(self):
+        self.export()
+        for lang in ("es", "en"):
+            self.assertTrue((self.output / lang / "index.html").exists())
+            self.assertTrue((self.output / lang / "economia" / "deuda" / "documentos" / "index.html").exists())
+
+        self.trabajo.status = Trabajo.Status.DRAFT
+        self.trabajo.save()
+        self.export("--incremental")
+        self.assertFalse((self.output / "es" / "economia" / "deuda" / "index.html").exists())
+        self.assertTrue((self.output / "es" / "areas" / "economia" / "index.html").exists())
+
+    def test_failed_export_keeps_the_previous_state(self):
+        with mock.patch(
+            "core.management.commands.export_static.render_page", side_effect=lambda task: (task[1], task[2], 500)
+        ):
+            with self.assertRaises(CommandError):
+                call_command("export_static", str(self.output), "--jobs", "1", stdout=StringIO(), stderr=StringIO())
+        self.assertFalse((self.output / ".export_state.json").exists())
+
+
+@override_settings(STORAGES=PLAIN_STATIC, ENABLE_RICHTEXT=True)
+class InstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        area = Area.objects.create(name="Economía", slug="economia")
+        Trabajo.objects.create(
+            area=area, title="Deuda", slug="deuda", tagline="*Brechas*", status=Trabajo.Status.PUBLISHED
+        )
+        render_md_inline.cache_clear()
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=1.0)
+    def test_sampled_request_gets_server_timing(self):
+        with self.assertLogs("portal.instrumentation", "INFO") as logs:
+            response = self.client.get("/es/areas/economia/")
+        timing = response["Server-Timing"]
+        for bucket in ("total;", "db;", "template;", "richtext;"):
+            self.assertIn(bucket, timing)
+        self.assertIn('"path": "/es/areas/economia/"', logs.output[0])
+
+    def test_richtext_cache_hits_are_tracked(self):
+        render_md_inline("*Brechas*")
+        with collecting() as stats:
+            render_md_inline("*Brechas*")
+        self.assertEqual(render_md_inline.cache_info().hits, 1)
+        self.assertEqual(stats.timings["richtext"].count, 1)
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=0.0)
+    def test_unsampled_request_is_untouched(self):
+        self.assertFalse(self.client.get("/es/areas/economia/").has_header("Server-Timing"))
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=0.0)
+    def test_profile_dump_requires_staff_and_signature(self):
+        url = "/es/areas/economia/?_profile=" + InstrumentationMiddleware.profile_token("/es/areas/economia/")
+        with mock.patch("portal.middleware.cProfile.Profile") as profile:
+            self.assertEqual(self.client.get(url)["Content-Type"], "text/html; charset=utf-8")
+        profile.assert_not_called()  # anonymous: never profiled
+
+        staff = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(url)["Content-Type"], "application/octet-stream")
+        forged = self.client.get("/es/areas/economia/?_profile=forged")
+        self.assertNotEqual(forged["Content-Type"], "application/octet-stream")
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class MetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        Area.objects.create(name="Economía", slug="economia")
+
+    def test_latency_histogram_per_url_name(self):
+        self.client.get("/es/")
+        self.client.get("/es/areas/economia/")
+        body = self.client.get("/metrics").content.decode()
+        self.assertIn('portal_http_request_duration_seconds_count{view="home"} 1', body)
+        self.assertIn('portal_http_requests_total{status="2xx",view="catalogo:area_detail"} 1', body)
+        self.assertIn('portal_db_queries_total{view="home"}', body)
+
+    def test_endpoint_is_local_or_staff_only(self):
+        response = self.client.get("/metrics", REMOTE_ADDR="203.0.113.9")
+        self.assertEqual(response.status_code, 403)
+        staff = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="203.0.113.9").status_code, 200)
+
+    def test_snapshots_of_all_workers_are_summed(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        other_worker = {
+            "counters": [["portal_http_requests_total", [["status", "2xx"], ["view", "home"]], 4]],
+            "histograms": [],
+        }
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()  # a pid that no longer runs
+        Path(directory, f"{exited.pid}-1.json").write_text(json.dumps(other_worker))
+
+        with self.settings(METRICS_DIR=directory):
+            self.client.get("/es/")
+            body = self.client.get("/metrics").content.decode()
+        self.assertIn('portal_http_requests_total{status="2xx",view="home"} 5', body)
+        # The exited worker's snapshot was folded into retired.json
+        self.assertEqual(sorted(p.name for p in Path(directory).glob("*.json") if not p.name[0].isdigit()), ["retired.json"])
+        self.assertFalse(Path(directory, f"{exited.pid}-1.json").exists())
+        with self.settings(METRICS_DIR=directory):
+            body = self.client.get("/metrics").content.decode()
+        self.assertIn('portal_http_requests_total{status="2xx",view="home"} 5', body)
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class ChromeFragmentCacheTests(TestCase):
+    def setUp(self):
+        caches["template_fragments"].clear()
+        self.area = Area.objects.create(name="Economía", slug="economia")
+
+    def get_laboratorio(self, path="/es/laboratorio/"):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(path)
+        nav_queries = [q for q in ctx.captured_queries if 'FROM "catalogo_area" ORDER BY' in q["sql"]]
+        return response, len(nav_queries)
+
+    def test_navbar_is_cached_per_language_until_an_area_changes(self):
+        response, nav_queries = self.get_laboratorio()
+        self.assertContains(response, "Economía")
+        self.assertEqual(nav_queries, 1)
+
+        response, nav_queries = self.get_laboratorio()
+        self.assertContains(response, "Economía")
+        self.assertEqual(nav_queries, 0)
+
+        self.area.name = "Economía aplicada"
+        self.area.save()
+        response, nav_queries = self.get_laboratorio()
+        self.assertContains(response, "Economía aplicada")
+        self.assertEqual(nav_queries, 1)
+
+        response, nav_queries = self.get_laboratorio("/en/laboratorio/")
+        self.assertContains(response, "Statistics")
+        self.assertEqual(nav_queries, 1)
+
+
+class ProfileStartupTests(TestCase):
+    def test_parse_importtime(self):
+        rows = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     markdown.util\n"
+            "import time:      2048 |       4096 |   markdown\n"
+        )
+        self.assertEqual(
+            [(r["module"], r["self_ms"], r["cumulative_ms"], r["depth"]) for r in rows],
+            [("markdown.util", 0.12, 0.12, 2), ("markdown", 2.048, 4.096, 1)],
+        )
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.area = Area.objects.create(name="Economía", slug="economia")
+        cls.trabajo = Trabajo.objects.create(
+            area=cls.area, title="Deuda", slug="deuda", status=Trabajo.Status.PUBLISHED,
+            image_url="https://example.org/deuda.png",
+        )
+        Documento.objects.create(trabajo=cls.trabajo, title="Informe", doc_type=Documento.DocType.DATA,
+                                 url="https://example.org/informe.pdf")
+
+    async def test_async_pages_render_like_the_sync_ones(self):
+        factory = AsyncRequestFactory()
+        response = await async_views.home(factory.get("/"))
+        self.assertContains(response, "https://example.org/deuda.png")
+
+        response = await catalogo_async.trabajo_detail(factory.get("/economia/deuda/"), "economia", "deuda")
+        self.assertContains(response, "https://example.org/informe.pdf")
+
+        response = await catalogo_async.area_detail(factory.get("/es/areas/economia/"), "economia")
+        self.assertContains(response, "Deuda")
+
+        response = await catalogo_async.area_trabajos(factory.get("/es/areas/economia/trabajos/"), "economia")
+        self.assertContains(response, "https://example.org/deuda.png")
+
+    async def test_async_middleware_chain(self):
+        registry.reset()
+
+        async def view(request):
+            request.resolver_match = None
+            n = await Area.objects.acount()
+            return HttpResponse(translation.get_language() + f":{n}")
+
+        handler = MetricsMiddleware(AdminEnglishMiddleware(view))
+        with translation.override("es"):
+            response = await handler(AsyncRequestFactory().get("/admin/"))
+            self.assertEqual(translation.get_language(), "es")
+        self.assertEqual(response.content, b"en:1")
+        counters = {(name, tuple(map(tuple, labels))): v for name, labels, v in registry.snapshot()["counters"]}
+        self.assertEqual(counters[("portal_db_queries_total", (("view", "unmatched"),))], 1)
+
+
+class DatabaseSettingsTests(TestCase):
+    def test_sqlite_pragmas_applied_per_connection(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite only")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+        self.assertTrue(settings.DATABASES["default"]["CONN_HEALTH_CHECKS"])
+
+
+class ReplicaRoutingTests(TestCase):
+    router = PrimaryReplicaRouter()
+
+    def test_router_reads_replica_until_a_write(self):
+        self.assertEqual(self.router.db_for_read(Area), "default")  # no request
+        with routing() as state:
+            self.assertEqual(self.router.db_for_read(Area), "default")
+            state.replica = True
+            self.assertEqual(self.router.db_for_read(Area), "replica")
+            self.assertEqual(self.router.db_for_write(Area), "default")
+            self.assertEqual(self.router.db_for_read(Area), "default")
+        self.assertFalse(self.router.allow_migrate("replica", "catalogo"))
+
+    def run_middleware(self, request, view, write=False):
+        def get_response(req):
+            middleware.process_view(req, view, (), {})
+            if write:
+                self.router.db_for_write(Area)
+            return HttpResponse(self.router.db_for_read(Area))
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        return middleware(request)
+
+    def test_public_get_reads_replica(self):
+        factory = RequestFactory()
+        response = self.run_middleware(factory.get("/"), core_views.home)
+        self.assertEqual(response.content, b"replica")
+        self.assertNotIn(ReplicaRoutingMiddleware.PIN_COOKIE, response.cookies)
+
+        response = self.run_middleware(factory.post("/"), core_views.home)
+        self.assertEqual(response.content, b"default")
+
+        def admin_view(request):
+            return HttpResponse()
+
+        response = self.run_middleware(factory.get("/admin/"), admin_view)
+        self.assertEqual(response.content, b"default")
+
+    def test_write_pins_browser_to_primary(self):
+        factory = RequestFactory()
+        response = self.run_middleware(factory.post("/admin/"), core_views.home, write=True)
+        self.assertEqual(response.content, b"default")
+        self.assertIn(ReplicaRoutingMiddleware.PIN_COOKIE, response.cookies)
+
+        request = factory.get("/")
+        request.COOKIES[ReplicaRoutingMiddleware.PIN_COOKIE] = "1"
+        self.assertEqual(self.run_middleware(request, core_views.home).content, b"default")
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class PublicCacheTests(TestCase):
+    def setUp(self):
+        Area.objects.create(name="Economía", slug="economia")
+
+    def test_catalog_pages_are_cookie_free_and_public(self):
+        response = self.client.get("/es/areas/economia/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.cookies)
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("s-maxage", response["Cache-Control"])
+        # Language switch is a plain link to the same page
+        self.assertContains(response, 'href="/en/areas/economia/"')
+        self.assertNotContains(response, "csrfmiddlewaretoken")
+
+    def test_unprefixed_urls_redirect_to_a_language(self):
+        response = self.client.get("/areas/economia/", HTTP_ACCEPT_LANGUAGE="en")
+        self.assertRedirects(response, "/en/areas/economia/", fetch_redirect_response=False)
+
+    def test_admin_keeps_csrf_and_stays_private(self):
+        response = self.client.get("/admin/login/")
+        self.assertIn(settings.CSRF_COOKIE_NAME, response.cookies)
+        self.assertNotIn("public", response.get("Cache-Control", ""))
+
+
+class StaticBuildTests(TestCase):
+    def test_critical_css_keeps_rules_for_markup_above_the_fold(self):
+        source = '<header class="top {% if x %}on{% endif %}"><a>x</a></header>{# fold #}<div class="below">'
+        tokens = staticbuild.markup_tokens(staticbuild.above_the_fold(source))
+        css = """
+            /* comment */
+            .top a { color: red; }
+            .top .below { color: blue; }
+            .on:hover { color: green; }
+            @media (max-width: 576px) { .top { padding: 0; } .below { margin: 0; } }
+            @font-face { font-family: X; }
+        """
+        self.assertEqual(
+            staticbuild.critical_css(css, tokens),
+            ".top a{color:red}.on:hover{color:green}@media (max-width:576px){.top{padding:0}}",
+        )
+
+    def test_bundle_concatenates_sources_in_order(self):
+        sources = {name: f"/* {name} */ .s{i} {{ color: red; }}" for i, name in enumerate(staticbuild.CSS_SOURCES)}
+        sources["core/js/base.js"] = "// init\nrun();\n"
+        assets = staticbuild.build_assets(sources.__getitem__, source=lambda name: "<p>")
+        self.assertEqual(assets[staticbuild.CSS_BUNDLE], ".s0{color:red}.s1{color:red}.s2{color:red}.s3{color:red}")
+        self.assertEqual(assets[staticbuild.JS_BUNDLE], "run();\n")
+        self.assertEqual(assets[staticbuild.critical_name("home")], "")
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.html = ("<p>" + "trabajo " * 200 + "</p>").encode()
+
+    def test_negotiation_follows_q_values_then_preference(self):
+        available = ("br", "gzip")
+        self.assertEqual(compression.negotiate("gzip, deflate, br", available), "br")
+        self.assertEqual(compression.negotiate("br;q=0.5, gzip", available), "gzip")
+        self.assertEqual(compression.negotiate("zstd", available), None)
+        self.assertEqual(compression.negotiate("*, br;q=0", available), "gzip")
+        self.assertEqual(compression.negotiate("identity", available), None)
+
+    def test_available_encodings_does_not_import_the_codecs(self):
+        # Probing runs at middleware load; brotli/zstandard load on first use.
+        code = (
+            "import sys; from portal import compression; compression.available_encodings(); "
+            "print('brotli' in sys.modules or 'zstandard' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_compresses_html_for_the_negotiated_encoding(self):
+        middleware = CompressionMiddleware(lambda request: HttpResponse(self.html))
+        response = middleware(self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), self.html)
+
+    def test_streaming_response_is_compressed_chunk_by_chunk(self):
+        chunks = [self.html] * 5
+        middleware = CompressionMiddleware(lambda request: StreamingHttpResponse(iter(chunks)))
+        response = middleware(self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), b"".join(chunks))
+
+    def test_small_and_binary_bodies_are_left_alone(self):
+        for response in (HttpResponse(b"<p>hola</p>"), HttpResponse(self.html, content_type="application/pdf")):
+            middleware = CompressionMiddleware(lambda request, response=response: response)
+            out = middleware(self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip"))
+            self.assertFalse(out.has_header("Content-Encoding"))
+
+    def test_cached_page_keeps_compressed_variant_by_etag(self):
+        def view(request):
+            response = HttpResponse(self.html)
+            response["ETag"] = '"v1"'
+            return response
+
+        caches["default"].clear()
+        registry.reset()
+        middleware = CompressionMiddleware(view)
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip")
+        first = middleware(request)
+        second = middleware(request)
+        self.assertEqual(first["ETag"], 'W/"v1"')
+        self.assertEqual(second.content, first.content)
+        counters = {tuple(map(tuple, labels)): v for name, labels, v in registry.snapshot()["counters"]
+                    if name == "portal_compression_cache_total"}
+        self.assertEqual(counters, {(("result", "miss"),): 1, (("result", "hit"),): 1})
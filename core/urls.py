@@ -1,8 +1,13 @@
 # core/urls.py
+from django.conf import settings
 from django.urls import path
-from .views import home, laboratorio
+
+from . import async_views, views
+
+# Public pages: async twins under ASGI (settings.ASYNC_VIEWS)
+pages = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path("", home, name="home"),
-    path("laboratorio/", laboratorio, name="laboratorio"),
+    path("", pages.home, name="home"),
+    path("laboratorio/", views.laboratorio, name="laboratorio"),
 ]
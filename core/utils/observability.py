@@ -0,0 +1,56 @@
+# core/utils/observability.py
+"""
+Timing and metrics hooks for the apps (catalogo, core).
+
+The apps call `track`, `inc`, `observe` and `register_collector` without
+importing the project package; they do nothing until the project installs
+its implementations (portal.apps.PortalConfig.ready: per-request timing
+buckets from portal.instrumentation, the portal.metrics registry).
+"""
+
+from __future__ import annotations
+
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Iterable, Optional
+
+Collector = Callable[[], Iterable[tuple[str, dict, float]]]
+
+_tracker: Optional[Callable[[str], ContextManager]] = None
+_registry: Any = None  # inc(name, value, **labels), observe(name, value, **labels), register_collector(fn)
+_collectors: list[Collector] = []
+
+
+def install(tracker: Callable[[str], ContextManager], registry: Any) -> None:
+    global _tracker, _registry
+    _tracker = tracker
+    if registry is not _registry:
+        _registry = registry
+        for collector in _collectors:  # registered at import, before install
+            registry.register_collector(collector)
+
+
+def track(bucket: str) -> ContextManager:
+    """
+    Times the block in a per-request bucket (db, richtext, storage, ...).
+    """
+    return _tracker(bucket) if _tracker is not None else nullcontext()
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    if _registry is not None:
+        _registry.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    if _registry is not None:
+        _registry.observe(name, value, **labels)
+
+
+def register_collector(collector: Collector) -> None:
+    """
+    `collector()` yields (name, labels, value) counter totals kept elsewhere,
+    read at snapshot time.
+    """
+    _collectors.append(collector)
+    if _registry is not None:
+        _registry.register_collector(collector)
@@ -1,6 +1,7 @@
 # core/utils/richtext.py
 from __future__ import annotations
 
+import functools
 import re
 from dataclasses import dataclass
 from typing import Optional
@@ -8,6 +9,8 @@ from typing import Optional
 import markdown
 import nh3
 
+from . import observability
+
 
 # -----------------------------
 # Sanitization policy (allowlist)
@@ -43,6 +46,9 @@ SET_TAG_ATTRIBUTE_VALUES = {
     "a": {"target": "_blank"},
 }
 
+# Rendered HTML per distinct input, per process (renderers are pure functions)
+RICHTEXT_CACHE_SIZE = 2048
+
 # Optional: remove a single outer <p> wrapper (common for single-line Markdown)
 _P_WRAPPER_RE = re.compile(r"^\s*<p>(.*)</p>\s*$", re.DOTALL)
 
@@ -84,6 +90,24 @@ def _sanitize(html: str, *, opts: RichTextOptions) -> str:
     )
 
 
+def _cached(render):
+    """
+    lru_cache per renderer, timed in the "richtext" bucket outside the
+    cache so hits count too; cache_info/cache_clear stay available.
+    """
+    cached = functools.lru_cache(maxsize=RICHTEXT_CACHE_SIZE)(render)
+
+    @functools.wraps(render)
+    def wrapper(text: Optional[str]) -> str:
+        with observability.track("richtext"):
+            return cached(text)
+
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
+@_cached
 def render_md_block(text: Optional[str]) -> str:
     """
     Markdown -> sanitized HTML (block-friendly).
@@ -93,6 +117,7 @@ def render_md_block(text: Optional[str]) -> str:
     return _sanitize(html, opts=RichTextOptions(ALLOWED_TAGS_BLOCK, ALLOWED_ATTRIBUTES)).strip()
 
 
+@_cached
 def render_md_inline(text: Optional[str]) -> str:
     """
     Markdown -> sanitized HTML (inline-only).
@@ -109,6 +134,7 @@ def render_md_inline(text: Optional[str]) -> str:
     return clean.strip()
 
 
+@_cached
 def render_md_text(text: Optional[str]) -> str:
     """
     Markdown -> plain text (safe for truncation).
@@ -123,3 +149,13 @@ def render_md_text(text: Optional[str]) -> str:
         url_schemes=ALLOWED_URL_SCHEMES,
         strip_comments=True,
     ).strip()
+
+
+def _cache_stats():
+    for mode, func in (("block", render_md_block), ("inline", render_md_inline), ("text", render_md_text)):
+        info = func.cache_info()
+        yield "portal_richtext_cache_requests_total", {"mode": mode, "result": "hit"}, info.hits
+        yield "portal_richtext_cache_requests_total", {"mode": mode, "result": "miss"}, info.misses
+
+
+observability.register_collector(_cache_stats)
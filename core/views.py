@@ -1,21 +1,34 @@
 from django.shortcuts import render
+
 from catalogo.models import Area, Trabajo
+from catalogo.purge import HOME, tag_response, trabajo_key
 
 
-def home(request):
-    areas = Area.objects.all().order_by("order", "name")
+# Shared with the async twin (core/async_views.py)
+
+def home_areas():
+    return Area.objects.all().order_by("order", "name")
+
 
-    latest_trabajos = (
+def home_latest():
+    return (
         Trabajo.objects.filter(status=Trabajo.Status.PUBLISHED)
-        .order_by("-published_at", "-id")[:3]
+        .select_related("area")  # the carousel shows t.area.name
+        .order_by("-published_at", "-created_at", "-id")[:3]
     )
 
-    return render(
+
+def home(request):
+    areas = home_areas()
+    latest_trabajos = list(home_latest())
+
+    response = render(
         request,
         "core/home.html",
         {"areas": areas, "latest_trabajos": latest_trabajos},
     )
+    return tag_response(response, HOME, *(trabajo_key(t.pk) for t in latest_trabajos))
 
 
 def laboratorio(request):
-    return render(request, "core/laboratorio.html")
+    return tag_response(render(request, "core/laboratorio.html"))
@@ -0,0 +1,35 @@
+# gunicorn.conf.py
+"""
+gunicorn settings (picked up automatically from the working directory).
+
+    gunicorn portal.wsgi:application
+
+Preloading is on by default: the master imports Django and runs
+portal.preload.warm() once, then forks workers that share that memory.
+Set GUNICORN_PRELOAD=0 to load the app in every worker instead.
+"""
+
+import os
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1").strip().lower() in ("1", "true", "yes", "on")
+
+
+def when_ready(server):
+    # Runs in the master, after the (pre)loaded app and before any fork.
+    if not preload_app:
+        return
+    from portal.preload import warm
+
+    timings = warm()
+    server.log.info("preload: %s", ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
+
+
+def post_fork(server, worker):
+    # Never share a database socket with the master or a sibling.
+    if not preload_app:
+        return  # Django isn't loaded yet in this worker
+    from django.db import connections
+
+    connections.close_all()
@@ -0,0 +1,17 @@
+# portal/apps.py
+from django.apps import AppConfig
+
+
+class PortalConfig(AppConfig):
+    name = "portal"
+    verbose_name = "Portal"
+
+    def ready(self):
+        # The apps record timings/metrics through core.utils.observability;
+        # this plugs in the project's implementations.
+        from core.utils import observability
+
+        from .instrumentation import track
+        from .metrics import registry
+
+        observability.install(track, registry)
@@ -0,0 +1,174 @@
+# portal/cacheproxy.py
+"""
+Minimal caching reverse proxy with surrogate-key purges: a local stand-in for
+the CDN / Varnish in front of the site (tests, manual checks, benchmarks).
+
+    python manage.py cache_proxy --upstream http://127.0.0.1:8000 --port 8080
+    SURROGATE_PURGE_URL=http://127.0.0.1:8080/.purge python manage.py runserver
+
+Behaves like a shared cache:
+- GET/HEAD responses are stored when `Cache-Control: public` with a positive
+  s-maxage (or max-age) and no Set-Cookie; requests carrying cookies bypass it
+- entries are keyed by path and Accept-Encoding (the site compresses per
+  client, portal.middleware.CompressionMiddleware)
+- `X-Cache: HIT|MISS` on every response; the Surrogate-Key header is indexed
+  and stripped, as CDNs do
+- `POST <purge path>` with a `Surrogate-Key: k1 k2` header evicts every
+  entry tagged with any of the keys and answers {"purged": <n>}
+Everything else is passed through unchanged.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+SURROGATE_HEADER = "Surrogate-Key"
+HOP_BY_HOP = {"connection", "keep-alive", "transfer-encoding", "te", "trailer", "upgrade", "proxy-connection"}
+
+
+@dataclass
+class Entry:
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+    keys: frozenset[str]
+    expires: float
+
+
+def _ttl(cache_control: str) -> int:
+    directives = {}
+    for part in cache_control.split(","):
+        name, _, value = part.strip().partition("=")
+        directives[name.lower()] = value
+    if "public" not in directives or "private" in directives or "no-store" in directives:
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name, "").isdigit():
+            return int(directives[name])
+    return 0
+
+
+class SurrogateCache:
+    def __init__(self):
+        self._entries: dict[str, Entry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Entry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires < time.monotonic():
+                del self._entries[key]
+                entry = None
+            return entry
+
+    def put(self, key: str, entry: Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+
+    def purge(self, keys: set[str]) -> int:
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry.keys & keys]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheProxyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, upstream: str, purge_path: str = "/.purge"):
+        super().__init__(address, CacheProxyHandler)
+        parts = urlsplit(upstream)
+        self.upstream = (parts.hostname, parts.port or 80)
+        self.purge_path = purge_path
+        self.cache = SurrogateCache()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class CacheProxyHandler(BaseHTTPRequestHandler):
+    server: CacheProxyServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # quiet; the upstream logs requests
+        pass
+
+    def do_GET(self):
+        if "Cookie" in self.headers:
+            return self._pass()
+        key = f"{self.path} {self.headers.get('Accept-Encoding', '')}"
+        entry = self.server.cache.get(key)
+        if entry is not None:
+            return self._send(entry.status, entry.headers, entry.body, "HIT")
+
+        status, headers, body = self._forward()
+        names = {name.lower() for name, _ in headers}
+        keys = frozenset(
+            key for name, value in headers if name.lower() == SURROGATE_HEADER.lower() for key in value.split()
+        )
+        headers = [(name, value) for name, value in headers if name.lower() != SURROGATE_HEADER.lower()]
+        ttl = _ttl(", ".join(value for name, value in headers if name.lower() == "cache-control"))
+        if self.command == "GET" and status == 200 and ttl > 0 and "set-cookie" not in names:
+            self.server.cache.put(key, Entry(status, headers, body, keys, time.monotonic() + ttl))
+        self._send(status, headers, body, "MISS")
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        if self.path != self.server.purge_path:
+            return self._pass()
+        keys = set(self.headers.get(SURROGATE_HEADER, "").split())
+        purged = self.server.cache.purge(keys)
+        body = json.dumps({"purged": purged}).encode()
+        self._send(200, [("Content-Type", "application/json")], body, "PURGE")
+
+    def _pass(self):
+        status, headers, body = self._forward()
+        self._send(status, headers, body, "PASS")
+
+    def _forward(self) -> tuple[int, list[tuple[str, str]], bytes]:
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = self.rfile.read(length) if length else None
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_BY_HOP}
+        conn = http.client.HTTPConnection(*self.server.upstream, timeout=30)
+        try:
+            conn.request(self.command, self.path, body=payload, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+            out = [(name, value) for name, value in response.getheaders() if name.lower() not in HOP_BY_HOP]
+            return response.status, out, body
+        finally:
+            conn.close()
+
+    def _send(self, status: int, headers: list[tuple[str, str]], body: bytes, cache: str) -> None:
+        self.send_response(status)
+        for name, value in headers:
+            if name.lower() not in ("content-length", "date", "server"):  # set by send_response
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Cache", cache)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+def serve(upstream: str, host: str = "127.0.0.1", port: int = 0, purge_path: str = "/.purge") -> CacheProxyServer:
+    """
+    Starts the proxy in a daemon thread and returns the server
+    (`.url`, `.cache`, `.shutdown()`).
+    """
+    server = CacheProxyServer((host, port), upstream, purge_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,123 @@
+# portal/compression.py
+"""
+Content-Encoding negotiation and incremental compressors for
+portal.middleware.CompressionMiddleware.
+
+- br (brotli package) > zstd (zstandard package) > gzip (stdlib), in that
+  order of preference; the optional ones are used only when installed and
+  are imported on first use, not at startup
+- levels suit per-request work: brotli 5, zstd 3, gzip 6
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib.util
+import zlib
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+PREFERENCE = ("br", "zstd", "gzip")
+
+
+@functools.lru_cache(maxsize=None)
+def available_encodings() -> tuple[str, ...]:
+    # find_spec only locates the packages; Compressor imports them on first use.
+    found = [
+        encoding
+        for encoding, module in (("br", "brotli"), ("zstd", "zstandard"))
+        if importlib.util.find_spec(module) is not None
+    ]
+    found.append("gzip")
+    return tuple(found)
+
+
+def negotiate(accept_encoding: str, available: Iterable[str] | None = None) -> Optional[str]:
+    """
+    Best encoding for an Accept-Encoding header: highest q-value, ties broken
+    by PREFERENCE; None for identity.
+    """
+    available = tuple(available if available is not None else available_encodings())
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = (p.strip() for p in part.split(";"))
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name] = q
+    default = weights.get("*", 0.0)
+
+    best, best_q = None, 0.0
+    for encoding in PREFERENCE:
+        q = weights.get(encoding, default)
+        if encoding in available and q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class Compressor:
+    """
+    Incremental compressor: `compress(chunk)` returns bytes that can be sent
+    right away (flushed), `finish()` closes the stream.
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            import brotli
+
+            self._brotli = brotli.Compressor(quality=5)
+        elif encoding == "zstd":
+            import zstandard
+
+            self._zstd_flush = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            self._obj = zstandard.ZstdCompressor(level=3).compressobj()
+        elif encoding == "gzip":
+            self._obj = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        else:
+            raise ValueError(f"unsupported encoding {encoding!r}")
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + self._brotli.flush() if flush else out
+        out = self._obj.compress(data)
+        if flush:
+            out += self._obj.flush(self._zstd_flush if self.encoding == "zstd" else zlib.Z_SYNC_FLUSH)
+        return out
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._obj.flush()
+
+
+def compress(encoding: str, data: bytes) -> bytes:
+    compressor = Compressor(encoding)
+    return compressor.compress(data, flush=False) + compressor.finish()
+
+
+def compress_stream(encoding: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = Compressor(encoding)
+    for chunk in chunks:
+        if not chunk:
+            continue
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.finish()
+
+
+async def acompress_stream(encoding: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = Compressor(encoding)
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.finish()
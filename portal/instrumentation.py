@@ -0,0 +1,139 @@
+# portal/instrumentation.py
+"""
+Per-request timing buckets (db, richtext, storage, template).
+
+Code paths wrap work in `track("<bucket>")`; it only records while a request
+is being instrumented (see portal.middleware.InstrumentationMiddleware), so
+the cost outside sampled requests is a single ContextVar lookup.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Iterator, Optional
+
+from django.template.backends.django import DjangoTemplates
+
+
+@dataclass
+class Timing:
+    count: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class RequestStats:
+    timings: dict[str, Timing] = field(default_factory=dict)
+
+    def add(self, name: str, seconds: float) -> None:
+        timing = self.timings.setdefault(name, Timing())
+        timing.count += 1
+        timing.seconds += seconds
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("portal_request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@contextmanager
+def collecting() -> Iterator[RequestStats]:
+    """
+    Activates a fresh RequestStats for the duration of the block.
+    """
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def track(name: str) -> Iterator[None]:
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        stats.add(name, perf_counter() - start)
+
+
+@dataclass
+class QueryCount:
+    queries: int = 0
+
+
+_query_count: ContextVar[Optional[QueryCount]] = ContextVar("portal_query_count", default=None)
+
+
+@contextmanager
+def counting_queries() -> Iterator[QueryCount]:
+    """
+    Counts the queries run inside the block (see MetricsMiddleware).
+    """
+    count = QueryCount()
+    token = _query_count.set(count)
+    try:
+        yield count
+    finally:
+        _query_count.reset(token)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """
+    Installed on every DB connection (install_db_wrapper): counts queries
+    inside counting_queries() and times them in the "db" bucket.
+    """
+    count = _query_count.get()
+    if count is not None:
+        count.queries += 1
+    with track("db"):
+        return execute(sql, params, many, context)
+
+
+def install_db_wrapper(connection, **kwargs) -> None:
+    """
+    Permanent execute_wrapper (also a connection_created receiver). The
+    ContextVar travels into sync_to_async threads, so queries run by the
+    async ORM are attributed to the right request.
+    """
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
+
+
+# ------------------------------------------------------------
+# Template backend (times top-level template renders)
+# ------------------------------------------------------------
+
+class _TrackedTemplate:
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        with track("template"):
+            return self._template.render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    DjangoTemplates whose templates record their render time in "template".
+    Nested renders ({% include %}, rich-text filters) count inside it.
+    """
+
+    def from_string(self, template_code):
+        return _TrackedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TrackedTemplate(super().get_template(template_name))
@@ -0,0 +1,259 @@
+# portal/metrics.py
+"""
+In-process metrics registry with a Prometheus text endpoint.
+
+Each process keeps its own counters/histograms. When METRICS_DIR is set, every
+process periodically writes a snapshot to <METRICS_DIR>/<pid>-<start>.json
+(atomic replace) and the endpoint sums all snapshots, so the numbers cover
+every gunicorn worker, not just the one answering the scrape. Snapshots of
+exited processes are folded into <METRICS_DIR>/retired.json at scrape time,
+so counters stay monotonic and the directory doesn't grow with every
+recycled worker.
+"""
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import contextlib
+import ipaddress
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Registry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._histograms: dict[tuple[str, Labels], list] = {}
+        self._collectors: list[Callable[[], Iterable[tuple[str, dict, float]]]] = []
+        self._file: Optional[Path] = None
+        self._last_flush = 0.0
+
+    # -- recording ------------------------------------------------
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: tuple = LATENCY_BUCKETS, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                # [bucket bounds, per-bucket counts (+Inf last), sum, count]
+                hist = self._histograms[key] = [list(buckets), [0] * (len(buckets) + 1), 0.0, 0]
+            hist[1][bisect.bisect_left(hist[0], value)] += 1
+            hist[2] += value
+            hist[3] += 1
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple[str, dict, float]]]) -> None:
+        """
+        `collector()` yields (name, labels, value) counter totals kept elsewhere
+        (e.g. functools.lru_cache statistics); read at snapshot time.
+        """
+        self._collectors.append(collector)
+
+    # -- snapshots ------------------------------------------------
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: [v[0], list(v[1]), v[2], v[3]] for k, v in self._histograms.items()}
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                counters[(name, _labels(labels))] = value
+        return {
+            "counters": [[name, list(labels), value] for (name, labels), value in counters.items()],
+            "histograms": [[name, list(labels), *hist] for (name, labels), hist in histograms.items()],
+        }
+
+    def maybe_flush(self) -> None:
+        directory = getattr(settings, "METRICS_DIR", "")
+        if not directory:
+            return
+        now = time.monotonic()
+        if now - self._last_flush < getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0):
+            return
+        self._last_flush = now
+        self.flush()
+
+    def flush(self) -> None:
+        directory = getattr(settings, "METRICS_DIR", "")
+        if not directory:
+            return
+        if self._file is None or not self._file.name.startswith(f"{os.getpid()}-"):
+            # First flush in this process (or first after a fork)
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            self._file = Path(directory, f"{os.getpid()}-{time.time_ns()}.json")
+        tmp = self._file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+        os.replace(tmp, self._file)
+
+    def reset(self) -> None:
+        collectors = self._collectors
+        self.__init__()
+        self._collectors = collectors
+
+
+registry = Registry()
+atexit.register(registry.flush)
+# Forked workers (gunicorn --preload) must not inherit the master's numbers.
+os.register_at_fork(after_in_child=registry.reset)
+
+
+# ------------------------------------------------------------
+# Aggregation + Prometheus text format
+# ------------------------------------------------------------
+
+RETIRED_FILE = "retired.json"
+
+
+def _load(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None  # being replaced right now; picked up next scrape
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by someone else
+    return True
+
+
+def retire_exited(directory: Path) -> None:
+    """
+    Folds the snapshots of exited processes into RETIRED_FILE and deletes
+    them. POSIX only (liveness via signal 0); serialized with a lock file
+    since every worker may scrape.
+    """
+    if os.name != "posix":
+        return
+    exited = [p for p in directory.glob("*-*.json") if p.name.split("-")[0].isdigit() and not _alive(int(p.name.split("-")[0]))]
+    if not exited:
+        return
+
+    import fcntl
+
+    with open(directory / ".retire.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        retired = directory / RETIRED_FILE
+        snapshots = [snap for snap in map(_load, [retired, *exited]) if snap is not None]
+        tmp = retired.with_suffix(".tmp")
+        tmp.write_text(json.dumps(_as_snapshot(_sum(snapshots))), encoding="utf-8")
+        os.replace(tmp, retired)
+        for path in exited:
+            with contextlib.suppress(OSError):
+                path.unlink()
+
+
+def aggregate() -> dict:
+    """
+    Sums every process snapshot in METRICS_DIR (or just this process).
+    """
+    directory = getattr(settings, "METRICS_DIR", "")
+    if not directory:
+        return _sum([registry.snapshot()])
+    registry.flush()
+    retire_exited(Path(directory))
+    return _sum(snap for snap in map(_load, Path(directory).glob("*.json")) if snap is not None)
+
+
+def _sum(snapshots: Iterable[dict]) -> dict:
+    counters: dict[tuple, float] = {}
+    histograms: dict[tuple, list] = {}
+    for snap in snapshots:
+        for name, labels, value in snap["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, bounds, counts, total, count in snap["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            hist = histograms.setdefault(key, [bounds, [0] * len(counts), 0.0, 0])
+            hist[1] = [a + b for a, b in zip(hist[1], counts)]
+            hist[2] += total
+            hist[3] += count
+    return {"counters": counters, "histograms": histograms}
+
+
+def _as_snapshot(data: dict) -> dict:
+    # _sum() output back to the on-disk snapshot format
+    return {
+        "counters": [[name, list(labels), value] for (name, labels), value in data["counters"].items()],
+        "histograms": [[name, list(labels), *hist] for (name, labels), hist in data["histograms"].items()],
+    }
+
+
+def _fmt_labels(labels: Iterable[tuple[str, str]], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render_prometheus(data: dict) -> str:
+    lines: list[str] = []
+    typed: set[str] = set()
+
+    for (name, labels), value in sorted(data["counters"].items()):
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_fmt_labels(labels)} {value:g}")
+
+    for (name, labels), (bounds, counts, total, count) in sorted(data["histograms"].items()):
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, n in zip([*bounds, "+Inf"], counts):
+            cumulative += n
+            le = f'le="{bound}"'
+            lines.append(f"{name}_bucket{_fmt_labels(labels, le)} {cumulative}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {total:.6f}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _is_local(request) -> bool:
+    if "HTTP_X_FORWARDED_FOR" in request.META:
+        return False  # came through a proxy: REMOTE_ADDR is the proxy
+    try:
+        return ipaddress.ip_address(request.META.get("REMOTE_ADDR", "")).is_loopback
+    except ValueError:
+        return False
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint: localhost or staff only.
+    """
+    user = getattr(request, "user", None)
+    if not (_is_local(request) or (user and user.is_active and user.is_staff)):
+        return HttpResponseForbidden("Forbidden")
+    response = HttpResponse(render_prometheus(aggregate()), content_type="text/plain; version=0.0.4")
+    response["Cache-Control"] = "no-store"
+    return response
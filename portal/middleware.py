@@ -1,25 +1,411 @@
+import cProfile
+import hashlib
+import json
+import logging
+import marshal
+import random
+from abc import ABC, abstractmethod
+from importlib import import_module
+from time import perf_counter
+from types import SimpleNamespace
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib import auth
+from django.core import signing
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
 from django.utils import translation
+from django.utils.cache import has_vary_header, patch_cache_control, patch_vary_headers
+
+from .compression import acompress_stream, available_encodings, compress, compress_stream, negotiate
+from .instrumentation import collecting, counting_queries, install_db_wrapper
+from .metrics import COUNT_BUCKETS, registry
+from .routers import current_routing, routing
+
+logger = logging.getLogger("portal.instrumentation")
 
+# Query counting/timing hooks live on the connections themselves (see
+# portal.instrumentation.install_db_wrapper), so they also see the queries
+# the async ORM runs in sync_to_async threads.
+connection_created.connect(install_db_wrapper)
 
-class AdminEnglishMiddleware:
+
+class _HybridMiddleware(ABC):
     """
-    Forces Django Admin UI to English, independent of the public-site language.
+    Sync + async capable base: under ASGI with async views the chain stays
+    on the event loop (no thread hop per middleware).
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+        for conn in connections.all(initialized_only=True):
+            install_db_wrapper(conn)  # opened before this module was imported
 
     def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    @abstractmethod
+    def handle(self, request):
+        """The sync chain."""
+
+    @abstractmethod
+    async def __acall__(self, request):
+        """The async chain."""
+
+
+class AdminEnglishMiddleware(_HybridMiddleware):
+    """
+    Forces Django Admin UI to English, independent of the public-site language.
+    """
+
+    def _enter(self, request):
         previous_language = translation.get_language()
 
         if request.path.startswith("/admin"):
             translation.activate("en")
             request.LANGUAGE_CODE = "en"
 
-        response = self.get_response(request)
+        return previous_language
 
+    def _exit(self, previous_language) -> None:
         # Restore previous language for the rest of the site
         if previous_language:
             translation.activate(previous_language)
 
+    def handle(self, request):
+        previous_language = self._enter(request)
+        response = self.get_response(request)
+        self._exit(previous_language)
+        return response
+
+    async def __acall__(self, request):
+        previous_language = self._enter(request)
+        response = await self.get_response(request)
+        self._exit(previous_language)
+        return response
+
+
+class InstrumentationMiddleware(_HybridMiddleware):
+    """
+    Per-request timings for a sampled fraction of requests
+    (INSTRUMENTATION_SAMPLE_RATE, 0.0-1.0):
+    - wall time, DB queries, rich-text renders, document storage calls, templates
+    - emitted as a `Server-Timing` header and one JSON log line
+
+    Staff can also get a cProfile dump of a single request by appending
+    `?_profile=<token>` (see `manage.py profile_url`).
+    """
+
+    PROFILE_PARAM = "_profile"
+    PROFILE_SALT = "portal.middleware.profile"
+    PROFILE_MAX_AGE = 10 * 60
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sample_rate = float(getattr(settings, "INSTRUMENTATION_SAMPLE_RATE", 0.0))
+
+    @classmethod
+    def profile_token(cls, path: str) -> str:
+        return signing.TimestampSigner(salt=cls.PROFILE_SALT).sign(path)
+
+    def _profile_token_valid(self, request) -> bool:
+        token = request.GET.get(self.PROFILE_PARAM)
+        if not token:
+            return False
+        try:
+            path = signing.TimestampSigner(salt=self.PROFILE_SALT).unsign(token, max_age=self.PROFILE_MAX_AGE)
+        except signing.BadSignature:
+            return False
+        return path == request.path
+
+    @staticmethod
+    def _session(request):
+        # This middleware runs before SessionMiddleware/AuthenticationMiddleware:
+        # read the session (not attached to the request) to find the user.
+        engine = import_module(settings.SESSION_ENGINE)
+        return SimpleNamespace(session=engine.SessionStore(request.COOKIES.get(settings.SESSION_COOKIE_NAME)))
+
+    def _profile_requested(self, request) -> bool:
+        if not self._profile_token_valid(request):
+            return False
+        user = auth.get_user(self._session(request))
+        return user.is_active and user.is_staff
+
+    async def _aprofile_requested(self, request) -> bool:
+        if not self._profile_token_valid(request):
+            return False
+        user = await auth.aget_user(self._session(request))
+        return user.is_active and user.is_staff
+
+    def _sampled(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def handle(self, request):
+        if self._profile_requested(request):
+            profiler = cProfile.Profile()
+            response = profiler.runcall(self.get_response, request)
+            return self._profile_response(request, response, profiler)
+        if not self._sampled():
+            return self.get_response(request)
+
+        start = perf_counter()
+        with collecting() as stats:
+            response = self.get_response(request)
+        return self._report(request, response, stats, perf_counter() - start)
+
+    async def __acall__(self, request):
+        if await self._aprofile_requested(request):
+            # Profiles the event-loop thread (ORM/thread-pool work shows as waits)
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profiler.disable()
+            return self._profile_response(request, response, profiler)
+        if not self._sampled():
+            return await self.get_response(request)
+
+        start = perf_counter()
+        with collecting() as stats:
+            response = await self.get_response(request)
+        return self._report(request, response, stats, perf_counter() - start)
+
+    def _report(self, request, response, stats, total: float):
+        parts = [f"total;dur={total * 1000:.1f}"]
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 1),
+        }
+        for name, timing in sorted(stats.timings.items()):
+            parts.append(f'{name};dur={timing.seconds * 1000:.1f};desc="{timing.count}"')
+            record[f"{name}_count"] = timing.count
+            record[f"{name}_ms"] = round(timing.seconds * 1000, 1)
+
+        response["Server-Timing"] = ", ".join(parts)
+        logger.info(json.dumps(record))
+        return response
+
+    def _profile_response(self, request, response, profiler):
+        profiler.create_stats()
+        dump = HttpResponse(marshal.dumps(profiler.stats), content_type="application/octet-stream")
+        dump["Content-Disposition"] = 'attachment; filename="request.prof"'
+        dump["Cache-Control"] = "private, no-store"
+        return dump
+
+
+class MetricsMiddleware(_HybridMiddleware):
+    """
+    Feeds portal.metrics for every request: latency histogram and request
+    count per URL name (e.g. "home", "catalogo:trabajo_detail"), plus DB
+    queries per request. Exposed by portal.metrics.metrics_view.
+    """
+
+    def handle(self, request):
+        start = perf_counter()
+        with counting_queries() as count:
+            response = self.get_response(request)
+        self._record(request, response, perf_counter() - start, count.queries)
+        return response
+
+    async def __acall__(self, request):
+        start = perf_counter()
+        with counting_queries() as count:
+            response = await self.get_response(request)
+        self._record(request, response, perf_counter() - start, count.queries)
         return response
+
+    def _record(self, request, response, elapsed: float, queries: int) -> None:
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+        registry.observe("portal_http_request_duration_seconds", elapsed, view=view)
+        registry.inc("portal_http_requests_total", view=view, status=f"{response.status_code // 100}xx")
+        registry.inc("portal_db_queries_total", queries, view=view)
+        registry.observe("portal_db_queries_per_request", queries, buckets=COUNT_BUCKETS, view=view)
+        registry.maybe_flush()
+
+
+class ReplicaRoutingMiddleware(_HybridMiddleware):
+    """
+    Sends the reads of public GET/HEAD views (REPLICA_VIEW_MODULES) to the
+    read replica, see portal.routers.
+
+    A request that writes sets a short-lived cookie (REPLICA_PIN_SECONDS):
+    until it expires that browser reads from the primary, so editors see their
+    own changes despite replication lag.
+    """
+
+    PIN_COOKIE = "db_primary"
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.view_modules = frozenset(getattr(settings, "REPLICA_VIEW_MODULES", ()))
+        self.pin_seconds = int(getattr(settings, "REPLICA_PIN_SECONDS", 15))
+        if self._async:
+            # No thread hop for process_view under ASGI
+            self.process_view = self._aprocess_view
+
+    def handle(self, request):
+        with routing() as state:
+            response = self.get_response(request)
+        return self._pin(response, state)
+
+    async def __acall__(self, request):
+        with routing() as state:
+            response = await self.get_response(request)
+        return self._pin(response, state)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = current_routing()
+        if (
+            state is not None
+            and request.method in ("GET", "HEAD")
+            and self.PIN_COOKIE not in request.COOKIES
+            and view_func.__module__ in self.view_modules
+        ):
+            state.replica = True
+        return None
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return self.process_view(request, view_func, view_args, view_kwargs)
+
+    def _pin(self, response, state):
+        if state.wrote:
+            response.set_cookie(self.PIN_COOKIE, "1", max_age=self.pin_seconds, httponly=True, samesite="Lax")
+        return response
+
+
+class PublicCacheMiddleware(_HybridMiddleware):
+    """
+    Marks successful GET/HEAD responses of the public views
+    (PUBLIC_VIEW_MODULES) as `Cache-Control: public`, so browsers and a CDN
+    can share them:
+    - max-age=PUBLIC_CACHE_MAX_AGE, s-maxage=PUBLIC_CACHE_S_MAXAGE
+    - never when the response sets a cookie, varies on Cookie or already
+      has a Cache-Control of its own (those stay private)
+    """
+
+    CACHEABLE_STATUS = (200, 304)
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.view_modules = frozenset(getattr(settings, "PUBLIC_VIEW_MODULES", ()))
+        self.max_age = int(getattr(settings, "PUBLIC_CACHE_MAX_AGE", 60))
+        self.s_maxage = int(getattr(settings, "PUBLIC_CACHE_S_MAXAGE", 600))
+
+    def handle(self, request):
+        return self._mark(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._mark(request, await self.get_response(request))
+
+    def is_public(self, request, response) -> bool:
+        match = getattr(request, "resolver_match", None)
+        return (
+            match is not None
+            and request.method in ("GET", "HEAD")
+            and response.status_code in self.CACHEABLE_STATUS
+            and match.func.__module__ in self.view_modules
+            and not response.cookies
+            and not response.has_header("Cache-Control")
+            and not has_vary_header(response, "Cookie")
+        )
+
+    def _mark(self, request, response):
+        if self.is_public(request, response):
+            patch_cache_control(response, public=True, max_age=self.max_age, s_maxage=self.s_maxage)
+        return response
+
+
+class CompressionMiddleware(_HybridMiddleware):
+    """
+    Compresses dynamic responses (WhiteNoise already serves static files
+    precompressed):
+    - br / zstd / gzip negotiated from Accept-Encoding (portal.compression)
+    - text-like content types only (COMPRESSION_TYPES), bodies of at least
+      COMPRESSION_MIN_LENGTH bytes, never twice (existing Content-Encoding)
+    - streaming responses are compressed chunk by chunk, sync or async
+    - responses with an ETag (the catalog page cache) keep their compressed
+      variants in the cache under that ETag, so a cached page is compressed
+      once per catalog version and encoding
+    """
+
+    SKIP_STATUS = (204, 206, 304)
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_length = int(getattr(settings, "COMPRESSION_MIN_LENGTH", 512))
+        self.types = tuple(getattr(settings, "COMPRESSION_TYPES", ("text/",)))
+        self.encodings = available_encodings()
+
+    def handle(self, request):
+        return self._compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._compress(request, await self.get_response(request))
+
+    def _eligible(self, response) -> bool:
+        if response.status_code in self.SKIP_STATUS or response.has_header("Content-Encoding"):
+            return False
+        if response.has_header("Accept-Ranges"):
+            return False  # ranges address the stored bytes (catalogo.downloads)
+        if "no-transform" in response.get("Cache-Control", ""):
+            return False
+        if not response.streaming and len(response.content) < self.min_length:
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        return content_type.startswith(self.types)
+
+    def _compress(self, request, response):
+        if not self._eligible(response):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""), self.encodings)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(encoding, response.streaming_content)
+            else:
+                response.streaming_content = compress_stream(encoding, response.streaming_content)
+            del response.headers["Content-Length"]  # unknown until streamed
+        else:
+            compressed = self._compressed_content(request, response, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            # Same resource, different bytes: no longer a strong validator
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
+
+    def _compressed_content(self, request, response, encoding: str) -> bytes:
+        etag = response.get("ETag")
+        if not etag:
+            return compress(encoding, response.content)
+        raw = f"{encoding}:{etag}:{request.get_full_path()}"
+        key = f"compressed:{hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()}"
+        compressed = cache.get(key)
+        registry.inc("portal_compression_cache_total", result="miss" if compressed is None else "hit")
+        if compressed is None:
+            compressed = compress(encoding, response.content)
+            cache.set(key, compressed, getattr(settings, "CATALOG_CACHE_TIMEOUT", 60 * 60 * 24))
+        return compressed
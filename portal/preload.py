@@ -0,0 +1,92 @@
+# portal/preload.py
+"""
+Explicit warm-up for `gunicorn --preload` (see gunicorn.conf.py).
+
+Heavy optional modules (markdown, nh3, PIL, cloudinary) are imported lazily
+so a plain `import portal.wsgi` stays cheap. Under --preload the master calls
+warm() once before forking: URLconf, templates, rich text and the storage
+backends are loaded there, and every worker shares those pages copy-on-write
+instead of paying for them on its first request.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rendered on (almost) every public page
+TEMPLATES = (
+    "base.html",
+    "core/home.html",
+    "core/laboratorio.html",
+    "catalogo/area_detail.html",
+    "catalogo/trabajo_detail.html",
+    "catalogo/trabajo_documentos.html",
+)
+
+
+def _urls() -> None:
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns  # imports every views module
+
+
+def _templates() -> None:
+    from django.template.loader import get_template
+
+    for name in TEMPLATES:
+        get_template(name)  # compiled once by the cached loader (not DEBUG)
+
+
+def _richtext() -> None:
+    # Also used by the feed and the admin preview when ENABLE_RICHTEXT is off
+    from core.utils.richtext import render_md_block
+
+    render_md_block("*warm-up*")  # builds the Markdown instance / nh3 policy
+    render_md_block.cache_clear()
+
+
+def _storage() -> None:
+    from django.core.files.storage import default_storage
+
+    from catalogo.models import Documento, Trabajo
+
+    default_storage._setup()
+    Documento._meta.get_field("file").storage._get_backend()
+    Trabajo._meta.get_field("image").storage  # cloudinary_storage when enabled
+
+    import PIL.Image  # noqa: F401 (ImageField validation in the admin)
+
+
+STEPS = (("urls", _urls), ("templates", _templates), ("richtext", _richtext), ("storage", _storage))
+
+
+def warm() -> dict[str, float]:
+    """
+    Runs every warm-up step; returns seconds per step.
+    """
+    from django.db import connections
+
+    timings = {}
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:  # a cold subsystem is slower, never fatal
+            logger.exception("preload step %r failed", name)
+        timings[name] = time.perf_counter() - start
+
+    # Workers must open their own connections after the fork; a psycopg pool
+    # (background threads + sockets) can't be inherited either.
+    connections.close_all()
+    for conn in connections.all(initialized_only=True):
+        if hasattr(conn, "close_pool"):  # postgresql backend
+            conn.close_pool()
+    # Move everything allocated so far out of the GC's generations: collections
+    # in the workers won't touch (and copy) these pages.
+    gc.collect()
+    gc.freeze()
+    return timings
@@ -0,0 +1,68 @@
+# portal/routers.py
+"""
+Primary/replica routing (enabled when REPLICA_DATABASE_URL is set).
+
+Writes always go to "default". Reads go to "replica" only while a request
+has opted in (portal.middleware.ReplicaRoutingMiddleware does that for GET/HEAD
+on the public views) and nothing has been written in it yet; everything
+else — admin, management commands, shell — reads from the primary.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+PRIMARY = "default"
+REPLICA = "replica"
+
+
+@dataclass
+class Routing:
+    replica: bool = False
+    wrote: bool = False
+
+
+_current: ContextVar[Optional[Routing]] = ContextVar("portal_db_routing", default=None)
+
+
+@contextmanager
+def routing() -> Iterator[Routing]:
+    """
+    Fresh per-request routing state; reads stay on the primary until
+    `state.replica` is set.
+    """
+    state = Routing()
+    token = _current.set(state)
+    try:
+        yield state
+    finally:
+        _current.reset(token)
+
+
+def current_routing() -> Optional[Routing]:
+    return _current.get()
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is not None and state.replica and not state.wrote:
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True  # read-your-writes for the rest of the request
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases
+        return obj1._state.db in (PRIMARY, REPLICA) and obj2._state.db in (PRIMARY, REPLICA)
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica gets its schema from the primary (replication or a copy)
+        return db != REPLICA
@@ -67,6 +67,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.sitemaps",
 ]
 
 # Insert Cloudinary apps in a typical order (right after staticfiles)
@@ -80,6 +81,8 @@ if USE_CLOUDINARY:
 INSTALLED_APPS += [
     "core",
     "catalogo.apps.CatalogoConfig",
+    # Project wiring: installs the timing/metrics hooks the apps call
+    "portal.apps.PortalConfig",
 ]
 
 # Optional dev-only utilities (avoid breaking production if not installed)
@@ -91,11 +94,21 @@ if DEBUG and env_bool("DJANGO_EXTENSIONS", False):
 # Middleware
 # -----------------------------
 MIDDLEWARE = [
+    # First, so its timings cover the whole stack (Server-Timing + JSON logs)
+    "portal.middleware.InstrumentationMiddleware",
+    "portal.middleware.MetricsMiddleware",
+
+    # Outside sessions/CSRF/locale, so it sees every cookie and Vary they add
+    "portal.middleware.PublicCacheMiddleware",
+
     "django.middleware.security.SecurityMiddleware",
 
     # WhiteNoise: serve static files in production without extra services
     "whitenoise.middleware.WhiteNoiseMiddleware",
 
+    # br/zstd/gzip for dynamic responses (static files are precompressed)
+    "portal.middleware.CompressionMiddleware",
+
     "django.contrib.sessions.middleware.SessionMiddleware",
 
     # i18n must be enabled here
@@ -111,14 +124,56 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Public pages: language in the URL, no cookies, so responses get
+# `Cache-Control: public` (portal.middleware.PublicCacheMiddleware).
+# Sessions and CSRF are only exercised by the admin and the rich-text preview.
+PUBLIC_VIEW_MODULES = (
+    "core.views",
+    "core.async_views",
+    "catalogo.views",
+    "catalogo.async_views",
+)
+PUBLIC_CACHE_MAX_AGE = int(os.environ.get("PUBLIC_CACHE_MAX_AGE", "60"))  # browsers
+PUBLIC_CACHE_S_MAXAGE = int(os.environ.get("PUBLIC_CACHE_S_MAXAGE", "600"))  # CDN / shared caches
+
+# Surrogate-key purges sent to the CDN / HTTP cache on catalog edits
+# (catalogo/purge.py). Locally: `manage.py cache_proxy` and
+# SURROGATE_PURGE_URL=http://127.0.0.1:8080/.purge
+SURROGATE_PURGE_URL = os.environ.get("SURROGATE_PURGE_URL", "").strip()
+SURROGATE_PURGE_TOKEN = os.environ.get("SURROGATE_PURGE_TOKEN", "").strip()
+SURROGATE_PURGE_DELAY = float(os.environ.get("SURROGATE_PURGE_DELAY", "0.5"))  # seconds per batch
+SURROGATE_PURGE_BATCH = 256  # keys per request
+
+# portal.middleware.CompressionMiddleware
+COMPRESSION_MIN_LENGTH = 512  # bytes; smaller bodies aren't worth it
+COMPRESSION_TYPES = (
+    "text/",
+    "application/json",
+    "application/xml",
+    "application/atom+xml",
+    "application/javascript",
+    "image/svg+xml",
+)
+
 ROOT_URLCONF = "portal.urls"
 
+# Explicit loaders (APP_DIRS off): in production every template is read and
+# compiled once per process by the cached loader; in DEBUG edits show up
+# without a restart.
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+if not DEBUG:
+    TEMPLATE_LOADERS = [("django.template.loaders.cached.Loader", TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates + render timing for InstrumentationMiddleware
+        "BACKEND": "portal.instrumentation.InstrumentedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            "loaders": TEMPLATE_LOADERS,
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
@@ -136,24 +191,94 @@ WSGI_APPLICATION = "portal.wsgi.application"
 # -----------------------------
 # Database
 # -----------------------------
+# Persistent connections are re-validated before reuse (CONN_HEALTH_CHECKS),
+# so a server-side restart or idle timeout costs one reconnect, not a 500.
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+
+# Postgres only: a psycopg_pool per worker process. With gunicorn sync workers
+# one request runs at a time, so a small pool is enough; raise DB_POOL_MAX_SIZE
+# for threaded/ASGI workers.
+DB_POOL = env_bool("DB_POOL", True)
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", "4"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+
+# Applied on every new SQLite connection:
+# - WAL: readers don't block the writer (and vice versa)
+# - synchronous=NORMAL is durable enough with WAL and avoids an fsync per commit
+# - busy_timeout waits for the write lock instead of failing with "database is locked"
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA busy_timeout=5000;"
+    "PRAGMA temp_store=MEMORY;"
+    "PRAGMA cache_size=-20000;"  # KiB, i.e. ~20 MB page cache
+    "PRAGMA mmap_size=134217728;"
+)
+
+SQLITE_OPTIONS = {
+    "init_command": SQLITE_PRAGMAS,
+    # Take the write lock at BEGIN: no deadlock-style SQLITE_BUSY when
+    # two transactions try to upgrade from read to write.
+    "transaction_mode": "IMMEDIATE",
+}
+
+
+def _database_from_url(url: str) -> dict:
+    import dj_database_url
+
+    db = dj_database_url.parse(
+        url,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=True,
+        ssl_require=not DEBUG,
+    )
+    if db["ENGINE"] == "django.db.backends.sqlite3":
+        db["OPTIONS"] = dict(SQLITE_OPTIONS)  # no sslmode
+    elif DB_POOL and db["ENGINE"] == "django.db.backends.postgresql":
+        db.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": DB_POOL_TIMEOUT,
+        }
+        # Django requires CONN_MAX_AGE=0 with a pool: "closing" returns the
+        # connection to the pool instead.
+        db["CONN_MAX_AGE"] = 0
+    return db
+
+
 # Default: SQLite for local dev
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": dict(SQLITE_OPTIONS),
     }
 }
 
 # Optional: use Postgres in production if DATABASE_URL is provided
 DATABASE_URL = os.environ.get("DATABASE_URL", "").strip()
 if DATABASE_URL:
-    import dj_database_url
-
-    DATABASES["default"] = dj_database_url.parse(
-        DATABASE_URL,
-        conn_max_age=600,
-        ssl_require=not DEBUG,
-    )
+    DATABASES["default"] = _database_from_url(DATABASE_URL)
+
+# Optional read replica (portal.routers): public GET pages read from it, admin
+# and every write use the primary. Locally: a copy of the SQLite file, e.g.
+#   cp db.sqlite3 replica.sqlite3
+#   REPLICA_DATABASE_URL=sqlite:///$PWD/replica.sqlite3 python manage.py runserver
+REPLICA_DATABASE_URL = os.environ.get("REPLICA_DATABASE_URL", "").strip()
+# Views whose GET/HEAD reads may be served by the replica
+REPLICA_VIEW_MODULES = PUBLIC_VIEW_MODULES
+# After a write, that browser reads from the primary for this long
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", "15"))
+if REPLICA_DATABASE_URL:
+    DATABASES["replica"] = {
+        **_database_from_url(REPLICA_DATABASE_URL),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_ROUTERS = ["portal.routers.PrimaryReplicaRouter"]
+    MIDDLEWARE.append("portal.middleware.ReplicaRoutingMiddleware")
 
 
 # -----------------------------
@@ -202,10 +327,16 @@ STORAGES = {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
     },
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+        # WhiteNoise manifest + gzip/brotli, plus the core CSS/JS bundles and
+        # critical CSS (core/staticbuild.py)
+        "BACKEND": "core.staticbuild.BundledStaticFilesStorage",
     },
 }
 
+# Templates reference the bundles instead of the source files (needs a
+# collectstatic with the storage above); off in DEBUG so edits show up live.
+STATIC_BUNDLES = env_bool("STATIC_BUNDLES", not DEBUG)
+
 # Compatibility for legacy code/packages that still read DEFAULT_FILE_STORAGE
 DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
 
@@ -216,6 +347,14 @@ DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Local Documento downloads (catalogo.downloads): "" streams with sendfile from
+# the worker, "x-accel-redirect" (nginx) / "x-sendfile" (Apache, lighttpd) hand
+# the transfer to the front proxy. For nginx:
+#   location /_protected/ { internal; alias <MEDIA_ROOT>/; }
+DOCUMENT_SENDFILE = os.environ.get("DOCUMENT_SENDFILE", "").strip().lower()
+DOCUMENT_ACCEL_PREFIX = os.environ.get("DOCUMENT_ACCEL_PREFIX", "/_protected/")
+DOCUMENT_CACHE_MAX_AGE = int(os.environ.get("DOCUMENT_CACHE_MAX_AGE", "3600"))
+
 if USE_CLOUDINARY:
     # Default storage for ImageField/media uploads
     STORAGES["default"] = {
@@ -254,3 +393,79 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # -----------------------------
 # Feature flag: turn on only after Phase 2 templates are in place.
 ENABLE_RICHTEXT = env_bool("ENABLE_RICHTEXT", False)
+
+# -----------------------------
+# Async views
+# -----------------------------
+# Public catalog pages use the async views (core/async_views.py,
+# catalogo/async_views.py). portal/asgi.py turns this on; under WSGI the
+# sync views avoid an event loop per request.
+ASYNC_VIEWS = env_bool("ASYNC_VIEWS", False)
+
+# -----------------------------
+# Instrumentation / logging
+# -----------------------------
+# Fraction of requests (0.0-1.0) that get Server-Timing headers + a JSON log line.
+INSTRUMENTATION_SAMPLE_RATE = float(
+    os.environ.get("INSTRUMENTATION_SAMPLE_RATE", "1.0" if DEBUG else "0.0")
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "portal.instrumentation": {
+            "handlers": ["console"],
+            "level": os.environ.get("INSTRUMENTATION_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# -----------------------------
+# Metrics (/metrics, Prometheus text format)
+# -----------------------------
+# Set METRICS_DIR to a directory shared by all gunicorn workers of this host
+# (e.g. /tmp/portal-metrics) so the endpoint aggregates every worker.
+METRICS_DIR = os.environ.get("METRICS_DIR", "").strip()
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "1.0"))
+
+# -----------------------------
+# Sitemap / feed
+# -----------------------------
+# URLs per sitemap page (the index links every page as ?p=N)
+CATALOG_SITEMAP_LIMIT = int(os.environ.get("CATALOG_SITEMAP_LIMIT", "1000"))
+# Cached sitemap/feed documents are keyed by catalog version; this only bounds memory.
+CATALOG_CACHE_TIMEOUT = int(os.environ.get("CATALOG_CACHE_TIMEOUT", str(60 * 60 * 24)))
+
+# -----------------------------
+# Area pages
+# -----------------------------
+# Trabajo cards per page (keyset-paginated; further pages load on scroll)
+CATALOG_PAGE_SIZE = int(os.environ.get("CATALOG_PAGE_SIZE", "24"))
+
+# -----------------------------
+# Caches
+# -----------------------------
+# "template_fragments" holds the {% cache %} blocks of base.html (navbar,
+# footer). Per-process memory by default; set CACHE_DIR to share one
+# file-based cache between the workers of a host.
+CACHE_DIR = os.environ.get("CACHE_DIR", "").strip()
+
+
+def _cache(name: str) -> dict:
+    if CACHE_DIR:
+        return {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.path.join(CACHE_DIR, name),
+        }
+    return {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": name}
+
+
+CACHES = {
+    "default": _cache("default"),
+    "template_fragments": _cache("template_fragments"),
+}
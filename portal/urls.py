@@ -2,26 +2,58 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
+from django.conf.urls.i18n import i18n_patterns
 from django.conf.urls.static import static
+from django.contrib.sitemaps import views as sitemap_views
 
+from catalogo.caching import cache_by_catalog_version
+from catalogo.downloads import document_download
+from catalogo.feeds import LatestTrabajosFeed
+from catalogo.sitemaps import SITEMAPS
 from core.richtext_views import richtext_preview
+from portal.metrics import metrics_view
 
 urlpatterns = [
-    # Language switch endpoint (required)
-    path("i18n/", include("django.conf.urls.i18n")),
-
     # Admin-only richtext preview (Phase 3)
     path("_richtext/preview/", richtext_preview, name="richtext_preview"),
 
     # Admin
     path("admin/", admin.site.urls),
 
-    # Public site
+    # Prometheus scrape endpoint (localhost or staff only)
+    path("metrics", metrics_view, name="metrics"),
+
+    # Read-only JSON API for external dashboards
+    path("api/catalogo/", include("catalogo.api_urls")),
+
+    # Crawlers: sitemap index (paged per section) + Atom feed, cached per catalog version
+    path(
+        "sitemap.xml",
+        cache_by_catalog_version("sitemap")(sitemap_views.index),
+        {"sitemaps": SITEMAPS, "sitemap_url_name": "sitemap_section"},
+        name="sitemap_index",
+    ),
+    path(
+        "sitemap-<section>.xml",
+        cache_by_catalog_version("sitemap")(sitemap_views.sitemap),
+        {"sitemaps": SITEMAPS},
+        name="sitemap_section",
+    ),
+    path("feed.atom", cache_by_catalog_version("feed")(LatestTrabajosFeed()), name="feed"),
+
+    # Local document files (ranges, conditional requests, X-Accel-Redirect / sendfile)
+    path("documentos/<int:pk>/descarga/", document_download, name="documento_download"),
+]
+
+# Public site: the language is part of the URL (/es/..., /en/...), so pages need
+# no language cookie or session and can be cached by a CDN. Unprefixed URLs
+# redirect to the visitor's language (LocaleMiddleware).
+urlpatterns += i18n_patterns(
     path("", include("core.urls")),
 
     # Namespaced include so `{% url 'catalogo:...' %}` works
     path("", include(("catalogo.urls", "catalogo"), namespace="catalogo")),
-]
+)
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)